@@ -0,0 +1,11 @@
+from 读取配置文件模块 import load_config
+from 表格读写模块 import export_issue_xlsx
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+
+# 运行入口：把数据库中的整期数据导出为带样式的 xlsx
+if __name__ == "__main__":
+    parse_stage_args(build_stage_parser("把数据库中的整期数据导出为带样式的 xlsx"))
+    issue, date_str = load_config()
+    print("当前期号:", issue)
+    excel_path = export_issue_xlsx(issue)
+    print(f"✅ 表格已导出：{excel_path}")
@@ -2,6 +2,11 @@ import os
 import json
 import pandas as pd
 from 读取配置文件模块 import load_config
+from 赛事数据存储模块 import issue_store_exists, load_issue_frame
+from 表格读写模块 import get_issue_excel_path
+from 仪表盘渲染模块 import render_dashboard
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+from 追踪模块 import traced
 
 def load_config(config_path="配置.json"):
     if not os.path.exists(config_path):
@@ -24,154 +29,38 @@ def load_config(config_path="配置.json"):
     
     return excel_path, output_html, issue
 
-def compute_analysis_fields(row):
-    try:
-        sp_win = float(row.get("临盘主胜赔率", "0") or row.get("中盘主胜赔率", "0") or "0")
-        sp_draw = float(row.get("临盘平局赔率", "0") or row.get("中盘平局赔率", "0") or "0")
-        sp_lose = float(row.get("临盘客胜赔率", "0") or row.get("中盘客胜赔率", "0") or "0")
-        k_win = float(row.get("临盘主凯利", "0") or row.get("中盘主凯利", "0") or "0")
-        k_draw = float(row.get("临盘平凯利", "0") or row.get("中盘平凯利", "0") or "0")
-        k_lose = float(row.get("临盘客凯利", "0") or row.get("中盘客凯利", "0") or "0")
-        handicap = float(row.get("临盘盘口", "0") or row.get("中盘盘口", "0") or "0")
-
-        # 冷热评分（赔率总和 * 5）
-        cold_score = round((sp_win + sp_draw + sp_lose) * 5, 2)
-
-        # 凯利异常（差值超过0.1）
-        k_list = [k_win, k_draw, k_lose]
-        k_max = max(k_list)
-        k_min = min(k_list)
-        kelly_warning = "⚠️ 是" if (k_max - k_min) >= 0.1 else "正常"
-
-        # 冷门信号判断
-        cold_flag = False
-        if (sp_win > 3 and k_win > 0.95) or (sp_lose > 3 and k_lose > 0.95):
-            cold_flag = True
-        cold_signal = "🔴 有" if cold_flag else "无"
-
-        # 庄家策略判断
-        if abs(handicap) >= 1.5:
-            strategy = "深盘造热"
-        elif abs(handicap) <= 0.25:
-            strategy = "低盘防冷"
-        else:
-            strategy = "中庸博弈"
-
-        # 投注倾向建议
-        if cold_flag:
-            tip = "防平局" if sp_draw < 3.5 else "防冷门"
-        else:
-            tip = "支持主胜" if sp_win < sp_lose else "倾向客胜"
-
-        return cold_score, kelly_warning, cold_signal, strategy, tip
-
-    except:
-        return "-", "-", "-", "-", "-"
-
+# excel_path 也可以直接传入 DataFrame（例如从数据库读取的整期数据）
+@traced
 def render_dashboard_with_analysis(excel_path, output_path="智能雷达仪表盘.html"):
-    df = pd.read_excel(excel_path).fillna("").astype(str)
-
-    base_cols = ["场次", "联赛", "主队", "客队"]
-    initial_cols = [col for col in df.columns if col.startswith("初盘")]
-    middle_cols = [col for col in df.columns if col.startswith("中盘")]
-    final_cols = [col for col in df.columns if col.startswith("临盘")]
-    end_cols = [col for col in df.columns if col.startswith("封盘")]
-
-    # 添加智能分析字段（运行时计算，不修改原Excel）
-    analysis_fields = ["冷热评分", "凯利异常", "冷门信号", "庄家策略", "投注倾向"]
-    for field in analysis_fields:
-        df[field] = ""
-
-    for i, row in df.iterrows():
-        results = compute_analysis_fields(row)
-        for j, field in enumerate(analysis_fields):
-            df.at[i, field] = results[j]
-
-    # 构建主表和详情
-    html_rows = ""
-    for _, row in df.iterrows():
-        row_html = "<tr class='main-row'>"
-        for col in base_cols + analysis_fields:
-            row_html += f"<td>{row.get(col, '')}</td>"
-        row_html += "<td><button class='expand-btn'>＋</button></td></tr>"
-
-        def block(title, cols):
-            print(cols)
-            if not cols: return ""
-            header = "".join([f"<th>{c}</th>" for c in cols])
-            values = "".join([f"<td>{row.get(c, '')}</td>" for c in cols])
-            return f"<div><b>{title}</b><table class='inner'><tr>{header}</tr><tr>{values}</tr></table></div>"
-        
-        if row.get("封盘主凯利"):
-            detail_html = (
-                "<div style='padding:10px'>"
-                + block("📊 初盘数据", initial_cols)
-                + block("⏱️ 中盘数据", middle_cols)
-                + block("⏳ 临盘数据", final_cols)
-                + block("🔚 封盘数据", end_cols)
-                + "</div>"
-            )
-        elif row.get("临盘主凯利"):
-            detail_html = (
-                "<div style='padding:10px'>"
-                + block("📊 初盘数据", initial_cols)
-                + block("⏱️ 中盘数据", middle_cols)
-                + block("⏳ 临盘数据", final_cols)
-                + "</div>"
-            )
-        else:
-            detail_html = (
-                "<div style='padding:10px'>"
-                + block("📊 初盘数据", initial_cols)
-                + block("⏱️ 中盘数据", middle_cols)
-                + "</div>"
-            )
-
-        detail_row = f"<tr class='detail-row' style='display:none'><td colspan='{len(base_cols + analysis_fields) + 1}'>{detail_html}</td></tr>"
-        html_rows += row_html + detail_row
-
-    html = f"""
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>足彩智能雷达仪表盘</title>
-        <style>
-            body {{ font-family: "Microsoft YaHei"; padding: 20px; }}
-            table {{ border-collapse: collapse; width: 100%; }}
-            th, td {{ border: 1px solid #ccc; padding: 5px; text-align: center; }}
-            .expand-btn {{
-                background: #3498db; color: white; border: none; padding: 5px 10px;
-                border-radius: 3px; cursor: pointer;
-            }}
-            .detail-row td {{ background: #f9f9f9; }}
-            .inner {{ margin: 10px 0; width: 100%; border: 1px solid #ddd; }}
-        </style>
-    </head>
-    <body>
-        <h2>足彩盘口智能雷达仪表盘（分析主表 + 展开三盘详情）</h2>
-        <table>
-            <thead><tr>{"".join([f"<th>{c}</th>" for c in base_cols + analysis_fields])}<th>更多</th></tr></thead>
-            <tbody>{html_rows}</tbody>
-        </table>
-        <script>
-            document.querySelectorAll('.expand-btn').forEach(btn => {{
-                btn.addEventListener('click', () => {{
-                    const detailRow = btn.parentElement.parentElement.nextElementSibling;
-                    const expanded = detailRow.style.display === 'table-row';
-                    detailRow.style.display = expanded ? 'none' : 'table-row';
-                    btn.textContent = expanded ? '＋' : '－';
-                }});
-            }});
-        </script>
-    </body>
-    </html>
-    """
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    source = excel_path if isinstance(excel_path, pd.DataFrame) else pd.read_excel(excel_path)
+    render_dashboard([(None, source)], output_path)
     print(f"✅ 页面生成成功：{output_path}")
 
+# 读取一期数据：优先数据库，没有数据库时读取导出的 xlsx
+def load_issue_source(issue, excel_path):
+    if issue_store_exists(issue):
+        return load_issue_frame(issue)
+    return pd.read_excel(excel_path)
+
+# 多期渲染到同一个页面，逐期读取
+def render_issues_dashboard(issues, output_path):
+    frames = (
+        (f"第 {issue} 期", load_issue_source(issue, get_issue_excel_path(issue)))
+        for issue in issues
+    )
+    render_dashboard(frames, output_path)
+    print(f"✅ 页面生成成功：{output_path}（共 {len(issues)} 期）")
+
 # 示例执行（你可以传入任意足彩Excel）
 if __name__ == "__main__":
+    parser = build_stage_parser("生成智能雷达仪表盘页面")
+    parser.add_argument("--issues", nargs="+", help="把多期渲染到同一个页面")
+    parser.add_argument("--output", help="多期页面的输出路径")
+    args = parse_stage_args(parser)
+
     excel_path, output_html, issue = load_config()
-    render_dashboard_with_analysis(excel_path, output_html)
+    if args.issues:
+        output = args.output or os.path.join(os.path.dirname(os.path.dirname(output_html)), "智能雷达仪表盘.html")
+        render_issues_dashboard(args.issues, output)
+    else:
+        render_dashboard_with_analysis(load_issue_source(issue, excel_path), output_html)
@@ -0,0 +1,107 @@
+import os
+
+from 读取配置文件模块 import load_config, load_setting
+from 命令行参数模块 import build_harvest_parser, parse_stage_args
+from 流水线调度模块 import Stage, run_stages
+from 浏览器池模块 import DriverPool
+from 页面解析模块 import SNAPSHOTS
+from 体彩赛事模块 import fetch_14_match_structured
+from 赛程匹配模块 import assign_match_ids
+from 盘口赔率采集模块 import KINDS, ENGINES, resolve_engine, add_harvest_columns, harvest_frame
+from 赛事数据存储模块 import issue_store_exists, load_issue_frame, save_issue_frame, load_journal, save_issue_cells
+from 表格读写模块 import match_links, export_issue_xlsx
+from 仪表盘渲染模块 import render_dashboard
+from 全公司赔率模块 import live_label, capture_issue_market
+from 重试熔断模块 import FetchGuard
+from 追踪模块 import span
+
+# 仪表盘页面路径（与 00-01 相同的配置项）
+def output_html_path(issue):
+    template = load_setting("output_html", "../足彩分析/{issue}/传统足彩{issue}期盘口数据补充.html")
+    return os.path.abspath(os.path.join(os.getcwd(), template.replace("{issue}", issue)))
+
+# 组装一期的流水线：01 赛事信息 → 02 比赛ID → 盘口/赔率（并发）→ 保存与导出
+# 各阶段共用内存中的同一份整期数据与同一个浏览器池，数据库、xlsx、页面只在最后写一次
+# all_companies 为真时，盘口/赔率阶段之后再从已缓存的页面解析全部公司
+def build_pipeline(issue, date_str, snapshots, kinds, engine, force=False, rebuild=False, pool=None,
+                   all_companies=False):
+    issue_dir = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", issue)
+    state = {"df": None, "links": {}, "journal": {}, "entries": [], "guard": None}
+    from_store = issue_store_exists(issue) and not rebuild
+
+    def fetch_issue():
+        if from_store:
+            state["df"] = load_issue_frame(issue)
+            print(f"📂 已有数据库，直接读取第 {issue} 期（--rebuild 重新获取赛事与比赛ID）")
+        else:
+            state["df"] = fetch_14_match_structured(issue).reset_index(drop=True)
+
+    def match_ids():
+        if not from_store:
+            os.makedirs(issue_dir, exist_ok=True)
+            state["df"] = assign_match_ids(state["df"], date_str, report_dir=issue_dir, pool=pool)
+        add_harvest_columns(state["df"], snapshots, kinds)
+        state["links"] = match_links(state["df"])
+        state["journal"] = load_journal(issue)
+        # 盘口与赔率两个阶段共用一个时间预算与熔断状态，预算从开始采集时计起
+        state["guard"] = FetchGuard()
+
+    def harvest(kind):
+        def run():
+            entries = harvest_frame(
+                state["df"], state["links"], state["journal"], snapshots, [kind], engine, force, pool=pool,
+                guard=state["guard"],
+            )
+            state["entries"].extend(entries)
+        return run
+
+    def write_outputs():
+        # 重新获取了赛事与比赛ID 时，旧的采集日志作废，只保留本次运行的记录
+        save_issue_frame(issue, state["df"], reset_journal=not from_store)
+        save_issue_cells(issue, {}, state["entries"])
+        print(f"✅ 数据库已保存（{len(state['entries'])} 个单元格）")
+        print(f"✅ 表格已导出：{export_issue_xlsx(issue, df=state['df'])}")
+        print(f"✅ 页面生成成功：{render_dashboard([(None, state['df'])], output_html_path(issue))}")
+
+    stages = [
+        Stage("01赛事信息", fetch_issue, []),
+        Stage("02比赛ID", match_ids, ["01赛事信息"]),
+    ]
+    # 盘口（亚盘页面）与赔率（欧赔列表页面）互不依赖，并发执行；每类内容的页面只加载一次，填好全部时间点
+    harvest_names = []
+    for kind in kinds:
+        name = f"{'03' if kind == '盘口' else '04'}{'/'.join(snapshots)}{kind}"
+        stages.append(Stage(name, harvest(kind), ["02比赛ID"]))
+        harvest_names.append(name)
+    stages.append(Stage("00保存与导出", write_outputs, harvest_names))
+    if all_companies:
+        # 全公司数据按期号读取比赛表，需要等数据库写好
+        label = live_label(snapshots)
+        stages.append(Stage("03全公司数据", lambda: capture_issue_market(issue, label), ["00保存与导出"]))
+    return stages
+
+# 运行入口：例如 python 00一键运行全部流程.py 初盘 中盘 --jobs 4
+if __name__ == "__main__":
+    parser = build_harvest_parser("按依赖关系一次跑完整期流程：01 → 02 → 03/04 → 00")
+    parser.add_argument("snapshots", nargs="*", default=["初盘"], choices=SNAPSHOTS, help="要填写的时间点")
+    parser.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS, help="只抓盘口或只抓赔率")
+    parser.add_argument("--engine", choices=ENGINES, help="抓取方式（默认读取配置 fetch_engine，未配置为 auto）")
+    parser.add_argument("--jobs", type=int, default=4, help="同时运行的阶段数")
+    parser.add_argument("--rebuild", action="store_true", help="已有数据库时也重新获取赛事信息与比赛ID")
+    parser.add_argument("--all-companies", action="store_true", help="另外保存页面上全部公司的盘口与赔率")
+    args = parse_stage_args(parser)
+
+    issue, date_str = load_config()
+    print("当前期号:", issue)
+    engine = resolve_engine(args.snapshots, args.engine)
+
+    with DriverPool() as pool:
+        stages = build_pipeline(
+            issue, date_str, args.snapshots, args.kinds, engine, args.force, args.rebuild, pool, args.all_companies
+        )
+        with span("pipeline", issue=issue):
+            results = run_stages(stages, jobs=args.jobs)
+
+    print("\n📊 各阶段耗时：")
+    for name, (status, seconds, _) in results.items():
+        print(f"   {name:<12} {status} {seconds:6.1f}s")
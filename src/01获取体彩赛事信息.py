@@ -1,110 +1,95 @@
-import requests
-import pandas as pd
-import time
 import os
+import sys
 from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
 
-# 获取最近几期的期号列表
-def get_recent_issue_list():
-    url = "https://webapi.sporttery.cn/gateway/lottery/getFootBallMatchV1.qry?param=90,0&lotteryDrawNum=&sellStatus=0&termLimits=10"
-    response = requests.get(url)
-    data = response.json()
-    return data["value"]["sfclist"]
+from 体彩赛事模块 import META_COLUMNS, get_recent_issue_list, fetch_issues_structured, merge_issue_metadata
+from 赛事数据存储模块 import issue_store_exists, load_issue_frame, save_issue_frame
+from 表格读写模块 import write_styled_xlsx
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+from 指标模块 import timed
+from 追踪模块 import traced
 
-# 获取某一期的赛事数据并生成结构分析DataFrame
-def fetch_14_match_structured(lottery_draw_num):
-    url = f"https://webapi.sporttery.cn/gateway/lottery/getFootBallMatchV1.qry?param=90,0&lotteryDrawNum={lottery_draw_num}&sellStatus=0&termLimits=10"
-    response = requests.get(url)
-    data = response.json()
+# 构造保存路径：当前运行目录的上一级 + “足彩分析/期号”
+def issue_input_path(issue):
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    return os.path.join(parent_path, "足彩分析", issue, f"传统足彩{issue}期盘口数据.xlsx")
 
-    matches = data["value"]["sfcMatch"]["matchList"]
-    result = []
+# 在原表格上逐格写入变化（保留手工填写的内容、格式与列宽），新增的场次追加到末尾
+@traced
+@timed("xlsx_write_seconds", file="赛事表格")
+def update_excel_in_place(file_path, df_new):
+    wb = load_workbook(file_path)
+    ws = wb.active
+    header = {cell.value: cell.column for cell in ws[1]}
+    rows = {str(ws.cell(row=r, column=header["场次"]).value): r for r in range(2, ws.max_row + 1)}
 
-    for m in matches:
-        match_info = {
-            "期号": lottery_draw_num,
-            "场次": m.get("matchNum"),
-            "比赛时间": m.get("startTime"),
-            "联赛": m.get("matchName"),
-            "主队": m.get("masterTeamAllName"),
-            "客队": m.get("guestTeamAllName"),
-            # 分析字段占位
-            "初盘盘口": "",
-            "初盘主胜赔率": "",
-            "初盘平局赔率": "",
-            "初盘客胜赔率": "",
-            "初盘主凯利": "",
-            "初盘平凯利": "",
-            "初盘客凯利": "",
-            "中盘盘口": "",
-            "中盘主胜赔率": "",
-            "中盘平局赔率": "",
-            "中盘客胜赔率": "",
-            "中盘主凯利": "",
-            "中盘平凯利": "",
-            "中盘客凯利": "",
-            "临盘盘口": "",
-            "临盘主胜赔率": "",
-            "临盘平局赔率": "",
-            "临盘客胜赔率": "",
-            "临盘主凯利": "",
-            "临盘平凯利": "",
-            "临盘客凯利": "",
-            "封盘盘口": "",
-            "封盘主胜赔率": "",
-            "封盘平局赔率": "",
-            "封盘客胜赔率": "",
-            "封盘主凯利": "",
-            "封盘平凯利": "",
-            "封盘客凯利": "",
-            "盘口趋势观察": "",
-            "凯利变化结论": "",
-            "冷门信号感知（有/无）": "",
-            "投注倾向（主/平/防冷/混包）": "",
-            "比赛结果": ""
-        }
-        result.append(match_info)
+    changes = []
+    for _, record in df_new.iterrows():
+        no = str(record["场次"])
+        if no not in rows:
+            ws.append([record.get(name, "") for name in header])
+            changes.append((no, "场次", None, no))
+            continue
+        for column, value in record.items():
+            if column not in header or column not in META_COLUMNS or value is None:
+                continue
+            cell = ws.cell(row=rows[no], column=header[column])
+            if str(cell.value) != str(value):
+                changes.append((no, column, cell.value, str(value)))
+                cell.value = str(value)
 
-    df = pd.DataFrame(result)
-    df.sort_values("场次", inplace=True)
-    return df
+    if changes:
+        wb.save(file_path)
+    return changes
 
-# 设置列宽
-def adjust_excel_column_width(file_path):
-    wb = load_workbook(file_path)
-    ws = wb.active
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = max_length + 10
-        ws.column_dimensions[col_letter].width = adjusted_width
-    wb.save(file_path)
+def print_changes(issue, changes):
+    for no, column, old, new in changes:
+        if old is None:
+            print(f"   ➕ 第 {issue} 期新增第 {no} 场")
+        else:
+            print(f"   ✏️ 第 {issue} 期第 {no} 场 {column}：{old} → {new}")
+
+# 处理一期：新期号生成表格；已有数据库或表格的只合并有变化的赛事信息，不覆盖其余内容
+# 返回 新建 / 更新 / 无变化
+def update_issue(issue, df_new):
+    full_path = issue_input_path(issue)
+    if not issue_store_exists(issue) and not os.path.exists(full_path):
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with timed("xlsx_write_seconds", file="赛事表格"):
+            write_styled_xlsx(full_path, df_new, padding=10)
+        print(f"已生成：{full_path}")
+        return "新建"
 
-# 主函数
+    changes = []
+    if issue_store_exists(issue):
+        merged, changes = merge_issue_metadata(load_issue_frame(issue), df_new)
+        if changes:
+            save_issue_frame(issue, merged)
+            if any(column in ("主队", "客队") for _, column, old, _ in changes if old is not None):
+                print(f"⚠️ 第 {issue} 期对阵有变化，请重新运行 02 匹配比赛ID")
+    # 02 以该表格为输入，同步更新（数据库已有时，变化以数据库为准打印）
+    if os.path.exists(full_path):
+        excel_changes = update_excel_in_place(full_path, df_new)
+        changes = changes or excel_changes
+
+    print_changes(issue, changes)
+    return "更新" if changes else "无变化"
+
+# 主函数：并发获取最近几期，可放进 crontab 每天运行
 if __name__ == "__main__":
+    parse_stage_args(build_stage_parser("获取体彩最近几期的赛事信息（已有的期号只合并变化）"))
     issues = get_recent_issue_list()
     print("获取到的期号列表：", issues)
 
-    for issue in issues:
-        df = fetch_14_match_structured(issue)
-
-        # 构造保存路径：当前运行目录的上一级 + “足彩分析/期号”
-        parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
-        save_dir = os.path.join(parent_path, "足彩分析", issue)
-        os.makedirs(save_dir, exist_ok=True)
+    summary = {}
+    for issue, result in fetch_issues_structured(issues).items():
+        if isinstance(result, Exception):
+            print(f"❌ 获取第 {issue} 期失败：{result!r}")
+            summary[issue] = "失败"
+        else:
+            summary[issue] = update_issue(issue, result)
 
-        # 文件名和完整路径
-        filename = f"传统足彩{issue}期盘口数据.xlsx"
-        full_path = os.path.join(save_dir, filename)
-
-        # 保存并调整样式
-        df.to_excel(full_path, index=False)
-        adjust_excel_column_width(full_path)
-        print(f"已生成：{full_path}")
-        time.sleep(1)
+    counts = {status: list(summary.values()).count(status) for status in ("新建", "更新", "无变化", "失败")}
+    print("✅ 完成：" + "，".join(f"{status} {count} 期" for status, count in counts.items()))
+    if counts["失败"]:
+        sys.exit(1)
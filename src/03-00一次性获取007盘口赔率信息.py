@@ -0,0 +1,20 @@
+from 读取配置文件模块 import load_config
+from 命令行参数模块 import build_harvest_parser, parse_stage_args
+from 页面解析模块 import SNAPSHOTS
+from 盘口赔率采集模块 import KINDS, ENGINES, harvest_issue
+from 全公司赔率模块 import live_label, capture_issue_market
+
+# 运行入口：例如 python 03-00一次性获取007盘口赔率信息.py 初盘 中盘
+if __name__ == "__main__":
+    parser = build_harvest_parser("一次加载页面，填好指定时间点的盘口与赔率")
+    parser.add_argument("snapshots", nargs="*", default=["初盘"], choices=SNAPSHOTS, help="要填写的时间点")
+    parser.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS, help="只抓盘口或只抓赔率")
+    parser.add_argument("--engine", choices=ENGINES, help="抓取方式（默认读取配置 fetch_engine，未配置为 auto）")
+    parser.add_argument("--all-companies", action="store_true", help="另外保存页面上全部公司的盘口与赔率（复用本次已缓存的页面）")
+    args = parse_stage_args(parser)
+
+    issue, date_str = load_config()
+    print("当前期号:", issue)
+    harvest_issue(issue, args.snapshots, args.kinds, args.engine, force=args.force)
+    if args.all_companies:
+        capture_issue_market(issue, live_label(args.snapshots))
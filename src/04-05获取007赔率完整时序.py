@@ -0,0 +1,31 @@
+from 读取配置文件模块 import load_config
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+from 页面解析模块 import SNAPSHOTS
+from 表格读写模块 import load_issue_table, save_issue_table
+from 盘口赔率采集模块 import add_harvest_columns
+from 赛事数据存储模块 import save_issue_cells
+from 赔率时序模块 import OddsSeriesStore, capture_issue_series, derive_snapshot_cells, series_path
+
+# 主函数：抓取目标公司完整的赔率变化记录；derive 不为空时，再由时序推出这些时间点的赔率字段写回数据库
+def capture_odds_series(issue="25048", derive=(), skip_fetch=False):
+    series_store = OddsSeriesStore.load(series_path(issue)) if skip_fetch else capture_issue_series(issue)
+    if not derive:
+        return
+
+    df, hyperlink_map = load_issue_table(issue)
+    if add_harvest_columns(df, derive, ["赔率"]):
+        save_issue_table(df, issue)
+    cells, entries = derive_snapshot_cells(df, hyperlink_map, series_store, derive)
+    save_issue_cells(issue, cells, entries)
+    print(f"✅ 已由时序推出 {'/'.join(derive)} 赔率：{len(cells)} 场")
+
+# 运行入口：例如 python 04-05获取007赔率完整时序.py --derive 中盘 临盘 封盘
+if __name__ == "__main__":
+    parser = build_stage_parser("抓取目标公司完整的欧赔变化记录，可事后推出任意时间点的赔率")
+    parser.add_argument("--derive", nargs="+", default=[], choices=SNAPSHOTS, help="由时序推出这些时间点的赔率字段")
+    parser.add_argument("--skip-fetch", action="store_true", help="不抓取，直接用已保存的时序推出字段")
+    args = parse_stage_args(parser)
+
+    issue, date_str = load_config()
+    print("当前期号:", issue)
+    capture_odds_series(issue, args.derive, args.skip_fetch)
@@ -0,0 +1,14 @@
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+from 历史赔率仓库模块 import ingest_all, ingest_issue
+
+# 运行入口：不带参数时导入「足彩分析」下的全部期号
+if __name__ == "__main__":
+    parser = build_stage_parser("把各期盘口/赔率数据导入历史赔率仓库")
+    parser.add_argument("issues", nargs="*", help="只导入指定期号")
+    args = parse_stage_args(parser)
+
+    if args.issues:
+        for issue in args.issues:
+            ingest_issue(issue)
+    else:
+        ingest_all()
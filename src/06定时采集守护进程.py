@@ -0,0 +1,33 @@
+from 读取配置文件模块 import load_config
+from 命令行参数模块 import build_stage_parser, parse_stage_args
+from 定时采集模块 import SnapshotScheduler, list_jobs
+
+# 打印队列中的任务
+def print_jobs(issues):
+    rows = list_jobs(issues)
+    if not rows:
+        print("📭 队列为空")
+        return
+    for issue, match_id, snap, kickoff, due, status, attempts in rows:
+        print(f"   {issue} {match_id:<10} {snap} 开赛 {kickoff[5:16]} 采集 {due[5:16]} {status:<8} {attempts}")
+
+# 运行入口：例如 python 06定时采集守护进程.py 25048 25049，--once 只执行当前到期的任务
+if __name__ == "__main__":
+    parser = build_stage_parser("按开赛时间在初盘/中盘/临盘/封盘各时刻自动采集盘口与赔率")
+    parser.add_argument("issues", nargs="*", help="要跟踪的期号（默认配置中的当前期号）")
+    parser.add_argument("--once", action="store_true", help="只执行当前到期的任务后退出（适合放进 crontab）")
+    parser.add_argument("--list", action="store_true", help="只打印队列中的任务")
+    parser.add_argument("--workers", type=int, help="同时采集的任务组数（默认读取配置 scheduler_workers）")
+    args = parse_stage_args(parser)
+
+    issues = args.issues or [load_config()[0]]
+    print("跟踪期号:", ", ".join(issues))
+
+    if args.list:
+        print_jobs(issues)
+    else:
+        scheduler = SnapshotScheduler(issues, workers=args.workers)
+        if args.once:
+            scheduler.run_once()
+        else:
+            scheduler.run_forever()
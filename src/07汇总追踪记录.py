@@ -0,0 +1,33 @@
+import argparse
+import json
+
+from 追踪模块 import get_trace_path, load_spans, print_summary
+
+# 追踪文件中最后一次运行的 trace_id
+def last_trace_id(path):
+    last = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = line
+    if last is None:
+        return None
+    return json.loads(last)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
+
+# 运行入口：例如 python 07汇总追踪记录.py --issue 25048 --top 20
+if __name__ == "__main__":
+    # 只读追踪文件，不用各阶段共用的 --replay/--trace/--profile，也不导出运行指标
+    parser = argparse.ArgumentParser(description="汇总追踪记录：每场比赛的关键路径与最慢的步骤（先用 --trace 运行各阶段）")
+    parser.add_argument("--path", help="追踪文件（默认读取配置 trace_path）")
+    parser.add_argument("--issue", help="只看这一期")
+    parser.add_argument("--trace-id", help="只看这一次运行（默认最后一次）")
+    parser.add_argument("--all-runs", action="store_true", help="汇总文件中的全部运行")
+    parser.add_argument("--top", type=int, default=10, help="列出最慢的 span 数")
+    parser.add_argument("--matches", type=int, help="只列出总耗时最长的几场比赛")
+    args = parser.parse_args()
+
+    path = args.path or get_trace_path()
+    trace_id = None if args.all_runs else (args.trace_id or last_trace_id(path))
+    spans = load_spans(path, trace_id)
+    print(f"🧭 {path}：{len(spans)} 个 span" + (f"（trace {trace_id}）" if trace_id else ""))
+    print_summary(spans, args.issue, args.top, args.matches)
@@ -0,0 +1,117 @@
+# 仪表盘渲染模块 ✅ 逐行写入输出文件，模板与表头按期只生成一次，可把多期渲染到同一个页面
+
+from html import escape
+
+from 智能分析模块 import ANALYSIS_FIELDS, compute_analysis_frame
+from 追踪模块 import traced
+
+BASE_COLS = ["场次", "联赛", "主队", "客队"]
+
+# 详情中的四个时间点：(标题, 列名前缀)
+DETAIL_BLOCKS = [
+    ("📊 初盘数据", "初盘"),
+    ("⏱️ 中盘数据", "中盘"),
+    ("⏳ 临盘数据", "临盘"),
+    ("🔚 封盘数据", "封盘"),
+]
+
+PAGE_HEAD = """
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>足彩智能雷达仪表盘</title>
+        <style>
+            body { font-family: "Microsoft YaHei"; padding: 20px; }
+            table { border-collapse: collapse; width: 100%; }
+            th, td { border: 1px solid #ccc; padding: 5px; text-align: center; }
+            .expand-btn {
+                background: #3498db; color: white; border: none; padding: 5px 10px;
+                border-radius: 3px; cursor: pointer;
+            }
+            .detail-row td { background: #f9f9f9; }
+            .inner { margin: 10px 0; width: 100%; border: 1px solid #ddd; }
+        </style>
+    </head>
+    <body>
+        <h2>足彩盘口智能雷达仪表盘（分析主表 + 展开三盘详情）</h2>
+"""
+
+PAGE_TAIL = """
+        <script>
+            document.querySelectorAll('.expand-btn').forEach(btn => {
+                btn.addEventListener('click', () => {
+                    const detailRow = btn.parentElement.parentElement.nextElementSibling;
+                    const expanded = detailRow.style.display === 'table-row';
+                    detailRow.style.display = expanded ? 'none' : 'table-row';
+                    btn.textContent = expanded ? '＋' : '－';
+                });
+            });
+        </script>
+    </body>
+    </html>
+"""
+
+TABLE_HEAD = "<table>\n<thead><tr>{header}<th>更多</th></tr></thead>\n<tbody>\n"
+TABLE_TAIL = "</tbody>\n</table>\n"
+MAIN_ROW = "<tr class='main-row'>{cells}<td><button class='expand-btn'>＋</button></td></tr>"
+DETAIL_ROW = "<tr class='detail-row' style='display:none'><td colspan='{colspan}'><div style='padding:10px'>{blocks}</div></td></tr>\n"
+BLOCK = "<div><b>{title}</b><table class='inner'><tr>{header}</tr><tr>{values}</tr></table></div>"
+
+def _cells(values, tag="td"):
+    return "".join(f"<{tag}>{escape(str(v), quote=False)}</{tag}>" for v in values)
+
+# 渲染一期：先按列算好分析字段，再逐行写入 out（任何带 write 的对象）
+def write_issue_rows(out, df, title=None):
+    df = df.fillna("").astype(str)
+    df[ANALYSIS_FIELDS] = compute_analysis_frame(df)
+    main_cols = BASE_COLS + ANALYSIS_FIELDS
+    for col in main_cols:
+        if col not in df.columns:
+            df[col] = ""
+
+    # 每个时间点的列与表头只生成一次
+    blocks = []
+    for block_title, prefix in DETAIL_BLOCKS:
+        cols = [c for c in df.columns if c.startswith(prefix)]
+        if cols:
+            blocks.append((block_title, cols, _cells(cols, "th")))
+        else:
+            blocks.append((block_title, cols, None))
+
+    # 有封盘凯利显示四盘，有临盘凯利显示三盘，否则显示初盘与中盘
+    end_kelly = df["封盘主凯利"].to_numpy() if "封盘主凯利" in df.columns else None
+    final_kelly = df["临盘主凯利"].to_numpy() if "临盘主凯利" in df.columns else None
+
+    if title:
+        out.write(f"<h3>{escape(title)}</h3>\n")
+    out.write(TABLE_HEAD.format(header=_cells(main_cols, "th")))
+
+    main_values = df[main_cols].to_numpy()
+    colspan = len(main_cols) + 1
+    for i, record in enumerate(df.to_dict("records")):
+        if end_kelly is not None and end_kelly[i]:
+            shown = 4
+        elif final_kelly is not None and final_kelly[i]:
+            shown = 3
+        else:
+            shown = 2
+
+        detail = "".join(
+            BLOCK.format(title=block_title, header=header, values=_cells(record[c] for c in cols))
+            for block_title, cols, header in blocks[:shown]
+            if header is not None
+        )
+        out.write(MAIN_ROW.format(cells=_cells(main_values[i])))
+        out.write(DETAIL_ROW.format(colspan=colspan, blocks=detail))
+
+    out.write(TABLE_TAIL)
+
+# 渲染页面：issues 为 [(标题, DataFrame)] 的可迭代对象，逐期读取、逐行写出，内存只保留当前一期
+@traced
+def render_dashboard(issues, output_path):
+    with open(output_path, "w", encoding="utf-8") as out:
+        out.write(PAGE_HEAD)
+        for title, df in issues:
+            write_issue_rows(out, df, title)
+        out.write(PAGE_TAIL)
+    return output_path
@@ -0,0 +1,132 @@
+# 体彩赛事模块 ✅ 从体彩接口获取期号列表与每期 14 场赛事，生成整期基础表
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from 读取配置文件模块 import load_setting
+from 响应缓存模块 import cached_text
+from 限速模块 import limited_get
+
+# 体彩接口同时最多几个请求（配置 sporttery_workers）；请求频率由限速模块控制
+DEFAULT_WORKERS = 4
+
+# 赛事信息字段：01 重新获取后只更新这些列，其余列（盘口、赔率、手工填写的分析）保持不变
+META_COLUMNS = ["比赛时间", "联赛", "主队", "客队"]
+
+# 请求体彩接口（按站点限速）
+def _get(url):
+    response = limited_get(url)
+    response.raise_for_status()
+    return response.text
+
+# 获取最近几期的期号列表
+def get_recent_issue_list():
+    url = "https://webapi.sporttery.cn/gateway/lottery/getFootBallMatchV1.qry?param=90,0&lotteryDrawNum=&sellStatus=0&termLimits=10"
+    data = json.loads(cached_text(url, lambda: _get(url)))
+    return data["value"]["sfclist"]
+
+# 获取某一期的赛事数据并生成结构分析DataFrame
+def fetch_14_match_structured(lottery_draw_num):
+    url = f"https://webapi.sporttery.cn/gateway/lottery/getFootBallMatchV1.qry?param=90,0&lotteryDrawNum={lottery_draw_num}&sellStatus=0&termLimits=10"
+    data = json.loads(cached_text(url, lambda: _get(url)))
+    return build_issue_frame(lottery_draw_num, data)
+
+# 由体彩接口返回的 JSON 生成整期基础表（按场次排序，分析字段留空）
+def build_issue_frame(lottery_draw_num, data):
+    matches = data["value"]["sfcMatch"]["matchList"]
+    result = []
+
+    for m in matches:
+        match_info = {
+            "期号": lottery_draw_num,
+            "场次": m.get("matchNum"),
+            "比赛时间": m.get("startTime"),
+            "联赛": m.get("matchName"),
+            "主队": m.get("masterTeamAllName"),
+            "客队": m.get("guestTeamAllName"),
+            # 分析字段占位
+            "初盘盘口": "",
+            "初盘主胜赔率": "",
+            "初盘平局赔率": "",
+            "初盘客胜赔率": "",
+            "初盘主凯利": "",
+            "初盘平凯利": "",
+            "初盘客凯利": "",
+            "中盘盘口": "",
+            "中盘主胜赔率": "",
+            "中盘平局赔率": "",
+            "中盘客胜赔率": "",
+            "中盘主凯利": "",
+            "中盘平凯利": "",
+            "中盘客凯利": "",
+            "临盘盘口": "",
+            "临盘主胜赔率": "",
+            "临盘平局赔率": "",
+            "临盘客胜赔率": "",
+            "临盘主凯利": "",
+            "临盘平凯利": "",
+            "临盘客凯利": "",
+            "封盘盘口": "",
+            "封盘主胜赔率": "",
+            "封盘平局赔率": "",
+            "封盘客胜赔率": "",
+            "封盘主凯利": "",
+            "封盘平凯利": "",
+            "封盘客凯利": "",
+            "盘口趋势观察": "",
+            "凯利变化结论": "",
+            "冷门信号感知（有/无）": "",
+            "投注倾向（主/平/防冷/混包）": "",
+            "比赛结果": ""
+        }
+        result.append(match_info)
+
+    df = pd.DataFrame(result)
+    df.sort_values("场次", inplace=True)
+    return df
+
+# 并发获取多期赛事：返回 {期号: DataFrame 或异常}，某一期失败不影响其余期
+def fetch_issues_structured(issues, workers=None):
+    workers = workers or load_setting("sporttery_workers", DEFAULT_WORKERS)
+    results = {}
+
+    def fetch(issue):
+        try:
+            return fetch_14_match_structured(issue)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for issue, result in zip(issues, executor.map(fetch, issues)):
+            results[issue] = result
+    return results
+
+# 把新获取的赛事信息合并进已有数据：按场次对齐，只更新 META_COLUMNS 中有变化的值，新增的场次追加在末尾
+# 返回 (合并后的 DataFrame, 变化列表 [(场次, 列名, 原值, 新值)])；新增场次的原值记为 None
+def merge_issue_metadata(df_old, df_new):
+    merged = df_old.copy()
+    positions = {str(no): i for i, no in enumerate(merged["场次"])}
+    changes = []
+    appended = []
+    for _, row in df_new.iterrows():
+        no = str(row["场次"])
+        if no not in positions:
+            appended.append(row)
+            changes.append((no, "场次", None, no))
+            continue
+        i = positions[no]
+        for column in META_COLUMNS:
+            new = row.get(column)
+            if new is None or pd.isna(new) or column not in merged.columns:
+                continue
+            old = merged.iloc[i][column]
+            if pd.isna(old) or str(old) != str(new):
+                merged.iloc[i, merged.columns.get_loc(column)] = str(new)
+                changes.append((no, column, None if pd.isna(old) else str(old), str(new)))
+
+    if appended:
+        extra = pd.DataFrame(appended).astype(str)
+        merged = pd.concat([merged, extra.reindex(columns=merged.columns, fill_value="")], ignore_index=True)
+    return merged, changes
@@ -0,0 +1,182 @@
+# 全公司赔率模块 ✅ 亚盘页面与欧赔列表页面上的每一家公司都解析下来，存成 比赛 × 公司 × 字段 的矩阵
+#
+# 每期一个 全公司赔率.npz：match_ids / companies / fields 三个轴的名称，values 为 float32 三维数组，
+# 某家公司没有开出某场比赛（或某个字段）时为 NaN。一次页面请求就得到整个市场，供共识与离散度分析。
+
+import asyncio
+import os
+import warnings
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from 异步抓取模块 import AsyncFetcher, http_engine_available
+from 响应缓存模块 import store, is_replay
+from 页面解析模块 import SNAPSHOTS, ODDS_SUFFIXES, parse_asian_companies, parse_1x2_companies
+from 表格读写模块 import load_issue_table, extract_match_id
+from 盘口赔率采集模块 import asian_odds_url, odds_list_url, fetch_pages_cached, render_pages
+from 重试熔断模块 import FetchGuard
+
+# 矩阵的字段轴：(时间点, 字段)；亚盘页面有初盘与即时盘口，欧赔列表页面是即时赔率与凯利值
+MARKET_FIELDS = [("初盘", "盘口"), ("即时", "盘口")] + [("即时", suffix) for suffix in ODDS_SUFFIXES]
+
+# 即时数据默认的时间点名称；在某个时间点采集时可记为该时间点（如 临盘），导入仓库后与目标公司的数据对齐
+LIVE = "即时"
+
+# 即时数据对应的时间点：取本次采集中最晚的非初盘时间点，只抓初盘时记为即时
+def live_label(snapshots):
+    later = [snap for snap in SNAPSHOTS if snap in snapshots and snap != "初盘"]
+    return later[-1] if later else LIVE
+
+def market_path(issue):
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    return os.path.join(parent_path, "足彩分析", issue, "全公司赔率.npz")
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+class MarketMatrix:
+    """
+    一期的全公司数据：values[比赛, 公司, 字段]，字段顺序同 MARKET_FIELDS；label 为即时数据对应的时间点。
+    """
+
+    def __init__(self, match_ids, companies, values=None, label=LIVE):
+        self.match_ids = list(match_ids)
+        self.companies = list(companies)
+        self.fields = [snap + field for snap, field in MARKET_FIELDS]
+        shape = (len(self.match_ids), len(self.companies), len(self.fields))
+        self.values = np.full(shape, np.nan, dtype=np.float32) if values is None else np.asarray(values, dtype=np.float32)
+        self.label = label
+
+    # 由 {比赛ID: {公司: {字段名: 数值}}} 生成
+    @classmethod
+    def from_rows(cls, rows, label=LIVE):
+        companies = sorted({company for by_company in rows.values() for company in by_company})
+        matrix = cls(rows, companies, label=label)
+        company_pos = {company: k for k, company in enumerate(companies)}
+        field_pos = {field: k for k, field in enumerate(matrix.fields)}
+        for m, by_company in enumerate(rows.values()):
+            for company, fields in by_company.items():
+                for field, value in fields.items():
+                    matrix.values[m, company_pos[company], field_pos[field]] = value
+        return matrix
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                [str(v) for v in data["match_ids"]], [str(v) for v in data["companies"]],
+                data["values"], str(data["label"]),
+            )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            match_ids=np.array(self.match_ids, dtype=str),
+            companies=np.array(self.companies, dtype=str),
+            fields=np.array(self.fields, dtype=str),
+            values=self.values,
+            label=np.array(self.label),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    # 某个字段的 比赛 × 公司 二维表
+    def field_frame(self, field):
+        return pd.DataFrame(self.values[:, :, self.fields.index(field)], index=self.match_ids, columns=self.companies)
+
+    # 展开成 [(比赛ID, 时间点, 公司, 字段, 数值)]，跳过 NaN；即时数据的时间点记为 label
+    def records(self):
+        out = []
+        for m, c, f in zip(*np.nonzero(~np.isnan(self.values))):
+            snap, field = MARKET_FIELDS[f]
+            out.append((self.match_ids[m], self.label if snap == LIVE else snap, self.companies[c], field, float(self.values[m, c, f])))
+        return out
+
+# 各场比赛某个字段的市场共识与离散度：开出的公司数、均值、中位数、标准差、极差、离散系数
+def consensus(matrix, field):
+    data = matrix.values[:, :, matrix.fields.index(field)]
+    count = np.sum(~np.isnan(data), axis=1)
+    # 没有任何公司开出的比赛结果为 NaN，不提示“空切片”警告
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(data, axis=1)
+        std = np.nanstd(data, axis=1)
+        result = pd.DataFrame({
+            "公司数": count,
+            "均值": mean,
+            "中位数": np.nanmedian(data, axis=1),
+            "标准差": std,
+            "极差": np.nanmax(data, axis=1) - np.nanmin(data, axis=1),
+            "离散系数": std / np.abs(mean),
+        }, index=matrix.match_ids)
+    return result
+
+# 并发读取（缓存中没有时请求）各场比赛的亚盘页面与欧赔列表页面，解析全部公司：{比赛ID: {公司: {字段名: 数值}}}
+# 静态页面中没有公司数据的再用浏览器池加载
+async def fetch_market_rows(match_ids, guard=None):
+    async with (nullcontext() if is_replay() else AsyncFetcher()) as fetcher:
+        urls = [url for match_id in match_ids for url in (asian_odds_url(match_id), odds_list_url(match_id))]
+        pages, fetched = await fetch_pages_cached(fetcher, urls, guard=guard)
+
+    page_urls = {"盘口": asian_odds_url, "赔率": odds_list_url}
+    parsers = {"盘口": parse_asian_companies, "赔率": parse_1x2_companies}
+    companies = {}
+    for match_id in match_ids:
+        for kind, page_url in page_urls.items():
+            url = page_url(match_id)
+            html = pages.get(url)
+            if html is None or isinstance(html, Exception):
+                print(f"❌ 请求失败：{url}（{html!r}）")
+                continue
+            companies[(kind, match_id)] = parsers[kind](html) or []
+            if companies[(kind, match_id)] and url in fetched:
+                store(url, html)
+
+    # 静态页面中没有公司数据（需要 JS 渲染）的交给浏览器池加载
+    render = [key for key, found in companies.items() if not found]
+    if render:
+        for (kind, match_id), html in render_pages(render, guard).items():
+            companies[(kind, match_id)] = (parsers[kind](html) or []) if html else []
+            if not companies[(kind, match_id)]:
+                print(f"⚠️ 页面没有公司数据：{page_urls[kind](match_id)}")
+
+    rows = {}
+    for match_id in match_ids:
+        by_company = rows.setdefault(match_id, {})
+        for company, values in companies.get(("盘口", match_id), []):
+            fields = by_company.setdefault(company, {})
+            for snap, value in values.items():
+                fields.setdefault(snap + "盘口", _number(value))
+        for company, data, _ in companies.get(("赔率", match_id), []):
+            fields = by_company.setdefault(company, {})
+            for suffix, value in zip(ODDS_SUFFIXES, data):
+                fields.setdefault(LIVE + suffix, _number(value))
+    return rows
+
+# 主函数：抓取一期全部比赛的全公司数据并保存；label 为即时数据对应的时间点。返回 MarketMatrix
+# 先运行过 03-00 时页面已在响应缓存中，这里不会重复请求；一家公司都没有取到时报错，不保存
+def capture_issue_market(issue, label=LIVE, match_ids=None):
+    if label != LIVE and label not in SNAPSHOTS:
+        raise ValueError(f"未知的时间点：{label}（可选：{LIVE}/{'/'.join(SNAPSHOTS)}）")
+    if not is_replay() and not http_engine_available():
+        raise ImportError("全公司采集需要 aiohttp：pip install aiohttp")
+
+    _, hyperlink_map = load_issue_table(issue)
+    ids = [extract_match_id(link) for link in hyperlink_map.values()]
+    ids = [match_id for match_id in dict.fromkeys(ids) if match_id and (match_ids is None or match_id in match_ids)]
+
+    matrix = MarketMatrix.from_rows(asyncio.run(fetch_market_rows(ids, FetchGuard())), label)
+    if not matrix.companies:
+        raise RuntimeError(f"第 {issue} 期没有取到任何公司的数据，未保存全公司赔率")
+    path = matrix.save(market_path(issue))
+    print(f"✅ 第 {issue} 期全公司数据已保存：{len(matrix.match_ids)} 场 × {len(matrix.companies)} 家公司 → {path}")
+    return matrix
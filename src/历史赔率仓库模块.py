@@ -0,0 +1,215 @@
+# 历史赔率仓库模块 ✅ 把各期数据汇总到一个 SQLite 仓库（长表 + 索引），跨赛季查询不再需要逐个打开 xlsx
+
+import math
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from 读取配置文件模块 import load_setting
+from 页面解析模块 import SNAPSHOTS, ODDS_SUFFIXES
+from 赛事数据存储模块 import issue_store_exists, load_issue_frame
+from 表格读写模块 import get_issue_excel_path, read_issue_xlsx, extract_match_id
+from 全公司赔率模块 import MarketMatrix, market_path
+
+# 宽表列 → 长表字段：每个时间点一个盘口 + 六个赔率/凯利值
+FIELDS = ["盘口"] + ODDS_SUFFIXES
+
+# 宽表中的数据来自目标公司（36*/Crown/澳门）
+DEFAULT_COMPANY = "目标公司"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_key TEXT PRIMARY KEY,
+    issue TEXT NOT NULL,
+    match_no INTEGER,
+    match_id TEXT,
+    kickoff TEXT,
+    league TEXT,
+    home TEXT,
+    away TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS odds (
+    match_key TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    company TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (match_key, snapshot, company, field)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_match_id ON matches (match_id);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away);
+CREATE INDEX IF NOT EXISTS idx_matches_league ON matches (league);
+CREATE INDEX IF NOT EXISTS idx_odds_snapshot_field ON odds (snapshot, field, company);
+CREATE INDEX IF NOT EXISTS idx_odds_company ON odds (company);
+"""
+
+def analysis_root():
+    return os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析")
+
+def get_warehouse_path():
+    return load_setting("warehouse_path", os.path.join(analysis_root(), "历史赔率仓库.sqlite"))
+
+def connect(path=None):
+    conn = sqlite3.connect(path or get_warehouse_path())
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+def _text(value):
+    return None if pd.isna(value) else str(value)
+
+# 读取某一期的整表：优先数据库，其次导出的 xlsx
+def _issue_frame(issue):
+    if issue_store_exists(issue):
+        return load_issue_frame(issue)
+    excel_path = get_issue_excel_path(issue)
+    if os.path.exists(excel_path):
+        return read_issue_xlsx(excel_path)
+    return None
+
+# 写入一场比赛的长表数据；records 为 [(snapshot, company, field, value)]
+def upsert_odds(conn, match_key, records):
+    conn.executemany(
+        "INSERT OR REPLACE INTO odds (match_key, snapshot, company, field, value) VALUES (?, ?, ?, ?, ?)",
+        [(match_key, snap, company, field, value) for snap, company, field, value in records],
+    )
+
+# 导入一期：比赛信息 + 各时间点的盘口/赔率/凯利值（非数值的 "-" 与空值不入库）
+def ingest_issue(issue, conn=None):
+    df = _issue_frame(issue)
+    if df is None:
+        print(f"⏭️ 第 {issue} 期没有数据")
+        return 0
+
+    own_conn = conn is None
+    conn = conn or connect()
+    match_keys = {}
+    try:
+        with conn:
+            for _, row in df.iterrows():
+                match_key = f"{issue}-{_text(row.get('场次'))}"
+                match_id = extract_match_id(_text(row.get("比赛ID")))
+                match_keys[match_id] = match_key
+                conn.execute(
+                    "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        match_key, issue, _number(row.get("场次")), match_id,
+                        _text(row.get("比赛时间")), _text(row.get("联赛")),
+                        _text(row.get("主队")), _text(row.get("客队")), _text(row.get("比赛结果")),
+                    ),
+                )
+                conn.execute("DELETE FROM odds WHERE match_key = ? AND company = ?", (match_key, DEFAULT_COMPANY))
+                records = []
+                for snap in SNAPSHOTS:
+                    for field in FIELDS:
+                        value = _number(row.get(snap + field))
+                        if value is not None:
+                            records.append((snap, DEFAULT_COMPANY, field, value))
+                upsert_odds(conn, match_key, records)
+            ingest_market(conn, issue, match_keys)
+    finally:
+        if own_conn:
+            conn.close()
+
+    print(f"✅ 已导入第 {issue} 期：{len(df)} 场")
+    return len(df)
+
+# 导入全公司数据（03-00 --all-companies 保存的矩阵），公司名为页面上的真实名称；没有矩阵时跳过
+def ingest_market(conn, issue, match_keys):
+    matrix = MarketMatrix.load(market_path(issue))
+    if matrix is None:
+        return 0
+
+    by_match = {}
+    for match_id, snap, company, field, value in matrix.records():
+        if match_id in match_keys:
+            by_match.setdefault(match_keys[match_id], []).append((snap, company, field, value))
+    for match_key, records in by_match.items():
+        conn.execute("DELETE FROM odds WHERE match_key = ? AND company != ?", (match_key, DEFAULT_COMPANY))
+        upsert_odds(conn, match_key, records)
+    print(f"   📊 全公司数据：{len(matrix.companies)} 家公司，{sum(map(len, by_match.values()))} 条")
+    return len(by_match)
+
+# 导入「足彩分析」下的全部期号
+def ingest_all():
+    root = analysis_root()
+    issues = sorted(
+        name for name in os.listdir(root)
+        if os.path.isdir(os.path.join(root, name)) and name.isdigit()
+    ) if os.path.isdir(root) else []
+
+    with closing(connect()) as conn:
+        total = sum(ingest_issue(issue, conn) for issue in issues)
+    print(f"✅ 仓库导入完成：{len(issues)} 期，{total} 场")
+    return total
+
+# 按条件查询长表，返回 DataFrame；team 同时匹配主队与客队
+def query_odds(match_id=None, team=None, league=None, company=None, snapshot=None, field=None, issue=None):
+    clauses = []
+    params = []
+    for column, value in (
+        ("m.match_id", match_id), ("m.league", league), ("o.company", company),
+        ("o.snapshot", snapshot), ("o.field", field), ("m.issue", issue),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if team is not None:
+        clauses.append("(m.home = ? OR m.away = ?)")
+        params.extend([team, team])
+
+    sql = (
+        "SELECT m.issue, m.match_no, m.match_id, m.kickoff, m.league, m.home, m.away, m.result, "
+        "o.snapshot, o.company, o.field, o.value "
+        "FROM odds o JOIN matches m ON m.match_key = o.match_key"
+    )
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+
+    with closing(connect()) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+# 某个字段在各时间点的宽表（行：比赛，列：时间点）
+def snapshot_matrix(field="盘口", company=DEFAULT_COMPANY, snapshots=SNAPSHOTS):
+    df = query_odds(company=company, field=field)
+    matrix = df.pivot_table(
+        index=["issue", "match_no", "match_id", "home", "away"],
+        columns="snapshot", values="value", aggfunc="first",
+    )
+    return matrix.reindex(columns=list(snapshots))
+
+# 两个时间点之间盘口变化不小于 min_move 的比赛，例如中盘 → 临盘变动一个四分之一球以上
+def handicap_moves(from_snapshot="中盘", to_snapshot="临盘", min_move=0.25, company=DEFAULT_COMPANY):
+    sql = """
+        SELECT m.issue, m.match_no, m.match_id, m.kickoff, m.league, m.home, m.away, m.result,
+               a.value AS from_value, b.value AS to_value, b.value - a.value AS move
+        FROM odds a
+        JOIN odds b ON b.match_key = a.match_key AND b.company = a.company AND b.field = a.field
+        JOIN matches m ON m.match_key = a.match_key
+        WHERE a.field = '盘口' AND a.company = ? AND a.snapshot = ? AND b.snapshot = ?
+          AND ABS(b.value - a.value) >= ?
+        ORDER BY m.issue, m.match_no
+    """
+    with closing(connect()) as conn:
+        return pd.read_sql_query(sql, conn, params=[company, from_snapshot, to_snapshot, min_move - 1e-9])
+
+# 以 NumPy 数组返回某个时间点某个字段的全部取值：(比赛键数组, 数值数组)
+def odds_array(snapshot, field, company=DEFAULT_COMPANY):
+    sql = "SELECT match_key, value FROM odds WHERE snapshot = ? AND field = ? AND company = ? ORDER BY match_key"
+    with closing(connect()) as conn:
+        rows = conn.execute(sql, (snapshot, field, company)).fetchall()
+    keys = np.array([r[0] for r in rows], dtype=object)
+    values = np.array([r[1] for r in rows], dtype=np.float64)
+    return keys, values
@@ -0,0 +1,36 @@
+# 命令行参数模块 ✅ 各阶段脚本共用的命令行参数
+
+import argparse
+
+from 响应缓存模块 import set_replay
+from 指标模块 import export_on_exit
+from 追踪模块 import enable_tracing
+from 性能剖析模块 import start_profiling
+from 读取配置文件模块 import load_setting
+
+# 创建带公共参数的解析器，各脚本可在此基础上继续添加自己的参数
+def build_stage_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--replay", action="store_true", help="只用本地缓存的响应回放，不访问网络")
+    parser.add_argument("--trace", action="store_true", help="记录各步骤耗时到追踪文件（07 汇总）")
+    parser.add_argument("--profile", action="store_true", help="剖析 CPU、墙钟与内存，结果写到 足彩分析/{期号}/profile/")
+    return parser
+
+# 解析命令行并让公共参数生效；运行结束时导出本次的运行指标
+def parse_stage_args(parser):
+    args = parser.parse_args()
+    export_on_exit()
+    if args.replay:
+        set_replay(True)
+        print("📼 回放模式：只读取本地缓存，不访问网络")
+    if args.trace or load_setting("trace_enabled", False):
+        enable_tracing()
+    if args.profile:
+        start_profiling()
+    return args
+
+# 盘口/赔率采集脚本（03、04）的解析器：默认只抓取缺失或失败的单元格，--force 全部重抓
+def build_harvest_parser(description):
+    parser = build_stage_parser(description)
+    parser.add_argument("--force", action="store_true", help="忽略采集日志，重新抓取全部单元格")
+    return parser
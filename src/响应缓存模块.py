@@ -0,0 +1,138 @@
+# 响应缓存模块 ✅ 按 URL 缓存页面/接口响应到本地磁盘，按来源设置过期时间，支持完全离线的回放模式
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from 读取配置文件模块 import load_setting
+from 指标模块 import inc
+
+# 各来源的缓存有效期（秒），None 表示永不过期；可在配置 cache_ttl 中按来源名覆盖
+DEFAULT_TTLS = {
+    "赔率历史": None,        # OddsHistory：初盘记录不会再变
+    "亚盘": 5 * 60,          # AsianOdds：即时盘口
+    "欧赔": 5 * 60,          # oddslist：即时赔率
+    "赛程": 60 * 60,         # Next_{date}.htm
+    "体彩接口": 10 * 60,     # sporttery getFootBallMatchV1.qry
+    "其他": 5 * 60,
+}
+
+# URL → 来源
+SOURCE_PATTERNS = [
+    (re.compile(r"OddsHistory\.aspx"), "赔率历史"),
+    (re.compile(r"AsianOdds_n\.aspx"), "亚盘"),
+    (re.compile(r"/oddslist/"), "欧赔"),
+    (re.compile(r"/Next_\d+\.htm"), "赛程"),
+    (re.compile(r"getFootBallMatchV1\.qry"), "体彩接口"),
+]
+
+_replay = os.environ.get("FOOTBALL_REPLAY") == "1"
+
+class CacheMiss(Exception):
+    """回放模式下缓存中没有该 URL 的响应。"""
+
+# 开启/关闭回放模式：开启后只读缓存（忽略过期时间），不访问网络
+def set_replay(enabled=True):
+    global _replay
+    _replay = enabled
+
+def is_replay():
+    return _replay
+
+def cache_dir():
+    default = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", "缓存")
+    return load_setting("cache_dir", default)
+
+def url_source(url):
+    for pattern, source in SOURCE_PATTERNS:
+        if pattern.search(url):
+            return source
+    return "其他"
+
+def source_ttl(source):
+    overrides = load_setting("cache_ttl", {})
+    return overrides.get(source, DEFAULT_TTLS.get(source, DEFAULT_TTLS["其他"]))
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _index_path(url):
+    key = _sha256(url.encode("utf-8"))
+    return os.path.join(cache_dir(), "index", key[:2], key + ".json")
+
+def _blob_path(digest):
+    return os.path.join(cache_dir(), "blobs", digest[:2], digest)
+
+# 先写临时文件再替换，避免中途崩溃留下半个文件
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 临时文件名带进程与线程号：采集线程池中多个线程可能同时写同一份内容或同一个索引
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# 读取缓存：未过期（或回放模式下存在）则返回文本，否则返回 None
+def get_cached(url, ttl="auto"):
+    text = _read_cached(url, ttl)
+    inc("cache_lookups_total", result="miss" if text is None else "hit")
+    return text
+
+def _read_cached(url, ttl):
+    index_path = _index_path(url)
+    if not os.path.exists(index_path):
+        return None
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+
+    if ttl == "auto":
+        ttl = source_ttl(url_source(url))
+    if not _replay and ttl is not None and time.time() - entry["fetched_at"] > ttl:
+        return None
+
+    blob_path = _blob_path(entry["blob"])
+    if not os.path.exists(blob_path):
+        return None
+    with open(blob_path, "rb") as f:
+        return f.read().decode("utf-8")
+
+# 写入缓存：内容按 sha256 存放（相同内容只存一份），URL 索引指向内容
+def store(url, text):
+    data = text.encode("utf-8")
+    digest = _sha256(data)
+    blob_path = _blob_path(digest)
+    if not os.path.exists(blob_path):
+        _atomic_write(blob_path, data)
+
+    entry = {"url": url, "blob": digest, "fetched_at": time.time()}
+    _atomic_write(_index_path(url), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+# 带缓存获取：fetch() 返回页面文本；回放模式下缓存缺失直接报错
+def cached_text(url, fetch, ttl="auto"):
+    text = get_cached(url, ttl)
+    if text is not None:
+        return text
+    if _replay:
+        raise CacheMiss(url)
+
+    text = fetch()
+    if text is not None:
+        store(url, text)
+    return text
+
+# 异步版本：fetch 为返回协程的函数
+async def async_cached_text(url, fetch, ttl="auto"):
+    text = get_cached(url, ttl)
+    if text is not None:
+        return text
+    if _replay:
+        raise CacheMiss(url)
+
+    text = await fetch()
+    if text is not None:
+        store(url, text)
+    return text
@@ -0,0 +1,247 @@
+# 替身服务器 ✅ 用 样本/ 中的页面在本地模拟体彩接口与 007 各页面，可设置延迟、抖动、错误率与限流，压测时不去请求真实站点
+#
+# 一个端口同时提供全部路径，配置 base_urls 把各站点指向这里（启动时会打印可直接粘贴的配置）：
+#   /gateway/lottery/getFootBallMatchV1.qry   体彩接口：期号列表，以及每期 14 场（对阵取自赛程样本，02 能匹配上）
+#   /football/Next_{date}.htm                 赛程页面（任意日期都返回赛程样本）
+#   /AsianOdds_n.aspx?id=                     亚盘页面
+#   /oddslist/{id}.htm                        欧赔列表（历史页面链接中的比赛ID换成请求的 id）
+#   /OddsHistory.aspx                         赔率历史
+# 限流按站点（体彩 / bf / vip / 1x2）各一个令牌桶，超出时返回 429 并带 Retry-After；随机错误返回 503。
+# 用法（在 src 目录下）：python 基准测试/替身服务器.py --port 8800 --latency 80 --jitter 40 --error-rate 0.02 --rate 20
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 页面解析模块 import parse_match_list_html
+from 赛程匹配模块 import parse_page_kickoff
+from 球队匹配模块 import clean_team_name
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "样本")
+
+# 赛程样本的日期：体彩接口的比赛时间按这一天的赛程计算（配置 date 用这一天，02 只需要这一页）
+SAMPLE_DATE = "20250405"
+SAMPLE_MATCH_ID = "2600001"
+
+# 每期场次
+MATCHES_PER_ISSUE = 14
+
+# 真实站点 → 统计与限流用的站点名（各站点的路径互不冲突，共用一个端口）
+SITES = {
+    "webapi.sporttery.cn": "体彩",
+    "bf.titan007.com": "bf",
+    "vip.titan007.com": "vip",
+    "1x2.titan007.com": "1x2",
+}
+
+def read_sample(name):
+    with open(os.path.join(SAMPLE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+class TokenBucket:
+    """
+    每秒 rate 个令牌、容量 burst 的令牌桶；take 不等待，没有令牌时返回 False。
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class StandInServer:
+    """
+    本地替身服务器：start 后在后台线程中提供页面，stop 关闭；stats 为 {(站点, 状态码): 次数}。
+    latency / jitter 为秒；rate 为每个站点每秒允许的请求数，None 为不限流。
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, rate=None, burst=None,
+                 issues=10, first_issue="25048", seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.buckets = {site: TokenBucket(rate, burst or max(1, rate)) for site in SITES.values()} if rate else {}
+        self.issues = [str(int(first_issue) - k) for k in range(issues)]
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.sporttery = json.loads(read_sample("getFootBallMatchV1.qry.json"))
+        self.pages = {
+            "next": read_sample("Next_20250405.htm"),
+            "asian": read_sample("AsianOdds_n.aspx.html"),
+            "oddslist": read_sample("oddslist_2600001.htm"),
+            "history": read_sample("OddsHistory.aspx.html"),
+        }
+        # 赛程样本中有比赛ID 的比赛，按顺序分给各期（期数多时循环使用）
+        self.schedule = [row for row in parse_match_list_html(self.pages["next"]) if row["比赛ID"]]
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # 配置 base_urls：各站点都指向本服务器
+    def base_urls(self):
+        return {site: self.base_url for site in SITES}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stand-in-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # 在当前线程中运行（命令行启动时使用），Ctrl+C 结束
+    def serve_forever(self):
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # 某一期的 14 场：对阵与联赛取自赛程样本，比赛时间按样本日期换算
+    def issue_matches(self, issue):
+        k = self.issues.index(issue) if issue in self.issues else 0
+        matches = []
+        for n in range(MATCHES_PER_ISSUE):
+            row = self.schedule[(k * MATCHES_PER_ISSUE + n) % len(self.schedule)]
+            kickoff = parse_page_kickoff(row["时间"], SAMPLE_DATE)
+            matches.append({
+                "matchNum": n + 1,
+                "startTime": kickoff.strftime("%Y-%m-%d %H:%M"),
+                "matchName": row["联赛"],
+                "masterTeamAllName": clean_team_name(row["主队"]),
+                "guestTeamAllName": clean_team_name(row["客队"]),
+                "sellStatus": 1,
+            })
+        return matches
+
+    def sporttery_body(self, query):
+        issue = (query.get("lotteryDrawNum") or [""])[0]
+        data = json.loads(json.dumps(self.sporttery))
+        data["value"]["sfclist"] = self.issues
+        match = data["value"]["sfcMatch"]
+        match["lotteryDrawNum"] = issue or self.issues[0]
+        match["matchList"] = self.issue_matches(issue or self.issues[0])
+        return json.dumps(data, ensure_ascii=False), "application/json"
+
+    # 请求 → (站点, 状态码, 内容, Content-Type)；未知路径为 404
+    def respond(self, path, query):
+        if path.endswith("/getFootBallMatchV1.qry"):
+            site, body = "体彩", self.sporttery_body
+        elif re.fullmatch(r"/football/Next_\d{8}\.htm", path):
+            site, body = "bf", lambda q: (self.pages["next"], "text/html")
+        elif path == "/AsianOdds_n.aspx":
+            site, body = "vip", lambda q: (self.pages["asian"], "text/html")
+        elif re.fullmatch(r"/oddslist/\d+\.htm", path):
+            match_id = re.search(r"\d+", path).group()
+            site, body = "1x2", lambda q: (self.pages["oddslist"].replace(f"sid={SAMPLE_MATCH_ID}", f"sid={match_id}"), "text/html")
+        elif path == "/OddsHistory.aspx":
+            site, body = "1x2", lambda q: (self.pages["history"], "text/html")
+        else:
+            return "其他", 404, "not found", "text/plain"
+
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if site in self.buckets and not self.buckets[site].take():
+            return site, 429, "too many requests", "text/plain"
+        if failed:
+            return site, 503, "service unavailable", "text/plain"
+        text, content_type = body(query)
+        return site, 200, text, content_type
+
+    def record(self, site, status):
+        with self._lock:
+            self.stats[(site, status)] += 1
+
+    def print_stats(self):
+        print("📊 替身服务器请求统计：")
+        for (site, status), count in sorted(self.stats.items()):
+            print(f"   {site:<4} {status}  {count}")
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive：aiohttp / requests 复用连接
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        parts = urlsplit(self.path)
+        site, status, text, content_type = stand_in.respond(parts.path, parse_qs(parts.query))
+        stand_in.record(site, status)
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="本地替身服务器：用样本页面模拟体彩接口与 007")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0, help="响应延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟的随机浮动范围（± 毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 503 的比例（0~1）")
+    parser.add_argument("--rate", type=float, help="每个站点每秒允许的请求数，超出返回 429（默认不限）")
+    parser.add_argument("--burst", type=float, help="令牌桶容量（默认等于 --rate）")
+    parser.add_argument("--issues", type=int, default=10, help="期号列表中的期数")
+    parser.add_argument("--first-issue", default="25048", help="最新一期的期号")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.host, args.port, args.latency / 1000, args.jitter / 1000, args.error_rate, args.rate, args.burst,
+        args.issues, args.first_issue, args.seed,
+    )
+    print(f"🧪 替身服务器：{server.base_url}（期号 {server.issues[-1]}~{server.issues[0]}，赛程日期 {SAMPLE_DATE}）")
+    print("   在 配置.json 中加入：")
+    print("   " + json.dumps({"date": SAMPLE_DATE, "base_urls": server.base_urls()}, ensure_ascii=False))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.print_stats()
+
+if __name__ == "__main__":
+    main()
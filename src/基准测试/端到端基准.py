@@ -0,0 +1,234 @@
+# 端到端基准 ✅ 启动本地替身服务器，在临时目录中对 N 期依次跑 01 → 00，统计每秒处理的比赛数、各阶段耗时的 p50/p99 与进程峰值内存
+#
+# 每个 --workers 取值单独跑一轮（全新的临时目录，缓存、数据库、限速状态互不影响），worker 数同时用于
+# 体彩接口并发（sporttery_workers）、每站点并发请求（http_per_host）与浏览器池大小。
+# 客户端限速默认放宽到 --client-rate，测的是流水线本身；要连同限速一起测，用 --client-rate 设回真实速率。
+# 赛程页面（02）只能用浏览器加载，默认预先写入缓存；装有 Chrome 时加 --browser 让 02 也走替身服务器。
+# 用法（在 src 目录下）：
+#   python 基准测试/端到端基准.py --issues 3 --workers 1 4 8 --latency 80 --jitter 40
+#   python 基准测试/端到端基准.py --issues 5 --error-rate 0.05 --server-rate 30 --compare ../足彩分析/基准测试/端到端基准-xxx.json
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, SRC_DIR)
+
+from 读取配置文件模块 import reload_config
+from 响应缓存模块 import store
+from 赛程匹配模块 import schedule_url
+from 替身服务器 import StandInServer, SAMPLE_DATE, MATCHES_PER_ISSUE
+from 解析基准 import git_revision, REGRESSION_RATIO
+
+FETCH_SCRIPT = "01获取体彩赛事信息.py"
+PIPELINE_SCRIPT = "00一键运行全部流程.py"
+
+# 第 q 百分位（最近秩）
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))]
+
+def write_config(src_dir, issue, server, workers, client_rate):
+    config = {
+        "issue": issue,
+        "date": SAMPLE_DATE,
+        "base_urls": server.base_urls(),
+        "rate_limits": {"sporttery.cn": client_rate, "titan007.com": client_rate},
+        "sporttery_workers": workers,
+        "http_per_host": workers,
+        "driver_pool_size": workers,
+        "fetch_engine": "http",
+    }
+    with open(os.path.join(src_dir, "配置.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+    reload_config()
+
+# 运行一个入口脚本（工作目录为临时的 src），输出追加到 log；返回 (墙钟秒数, 峰值内存 MiB, 退出码)
+def run_script(src_dir, script, args, log):
+    log.write(f"\n$ {script} {' '.join(args)}\n")
+    log.flush()
+    env = dict(os.environ, PYTHONIOENCODING="utf-8", PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, script), *args], cwd=src_dir, stdout=log, stderr=subprocess.STDOUT, env=env)
+    if hasattr(os, "wait4"):
+        # wait4 返回这个子进程自己的资源用量；Linux 的 ru_maxrss 单位为 KiB，macOS 为字节
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = usage.ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    else:
+        proc.wait()
+        rss = None
+    return time.perf_counter() - start, rss, proc.returncode
+
+# 00 导出的运行指标：各阶段耗时 {阶段: 秒} 与各阶段的比赛数 {阶段: {ok, failed}}
+def read_pipeline_metrics(src_dir):
+    path = os.path.join(os.path.dirname(src_dir), "足彩分析", "指标", os.path.splitext(PIPELINE_SCRIPT)[0] + ".json")
+    with open(path, "r", encoding="utf-8") as f:
+        metrics = json.load(f)["metrics"]
+    stages = {row["stage"]: row["sum"] for row in metrics.get("stage_seconds", [])}
+    matches = {}
+    for row in metrics.get("matches_total", []):
+        matches.setdefault(row["stage"], {}).setdefault(row["result"], 0)
+        matches[row["stage"]][row["result"]] += row["value"]
+    return stages, matches
+
+# 一轮：某个 worker 数下，对替身服务器的 N 期跑 01 → 00
+def run_round(args, workers):
+    workdir = tempfile.mkdtemp(prefix=f"端到端基准-{workers}-")
+    src_dir = os.path.join(workdir, "src")
+    os.makedirs(src_dir)
+    server = StandInServer(
+        latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+        rate=args.server_rate, burst=args.burst, issues=args.issues, seed=args.seed,
+    ).start()
+    log_path = os.path.join(workdir, "运行日志.txt")
+    try:
+        write_config(src_dir, server.issues[0], server, workers, args.client_rate)
+        if not args.browser:
+            cwd = os.getcwd()
+            os.chdir(src_dir)
+            try:
+                store(schedule_url(SAMPLE_DATE), server.pages["next"])
+            finally:
+                os.chdir(cwd)
+
+        stage_times = {}
+        matches = {}
+        peak_rss = 0.0
+        failed_runs = 0
+        with open(log_path, "w", encoding="utf-8") as log:
+            seconds, rss, code = run_script(src_dir, FETCH_SCRIPT, [], log)
+            total = seconds
+            peak_rss = max(peak_rss, rss or 0)
+            stage_times.setdefault("01赛事信息（全部期）", []).append(seconds)
+            failed_runs += code != 0
+
+            for issue in server.issues:
+                write_config(src_dir, issue, server, workers, args.client_rate)
+                seconds, rss, code = run_script(
+                    src_dir, PIPELINE_SCRIPT, [*args.snapshots, "--engine", "http", "--jobs", str(args.jobs)], log
+                )
+                total += seconds
+                peak_rss = max(peak_rss, rss or 0)
+                if code != 0:
+                    failed_runs += 1
+                    print(f"❌ 第 {issue} 期 00 退出码 {code}，日志：{log_path}")
+                    continue
+                stages, counts = read_pipeline_metrics(src_dir)
+                stage_times.setdefault("00整期", []).append(seconds)
+                for name, value in stages.items():
+                    stage_times.setdefault(name, []).append(value)
+                for stage, results in counts.items():
+                    for result, value in results.items():
+                        matches.setdefault(stage, {}).setdefault(result, 0)
+                        matches[stage][result] += value
+    finally:
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    total_matches = args.issues * MATCHES_PER_ISSUE
+    return {
+        "workers": workers,
+        "issues": args.issues,
+        "matches": total_matches,
+        "seconds": round(total, 3),
+        "matches_per_second": round(total_matches / total, 3),
+        "peak_rss_mib": round(peak_rss, 1) if peak_rss else None,
+        "failed_runs": failed_runs,
+        "stages": {
+            name: {"p50": round(percentile(values, 50), 3), "p99": round(percentile(values, 99), 3), "samples": len(values)}
+            for name, values in stage_times.items()
+        },
+        "matches_by_stage": matches,
+        "server_requests": {f"{site} {status}": count for (site, status), count in sorted(server.stats.items())},
+        "workdir": workdir if args.keep else None,
+    }
+
+def print_round(result):
+    print(f"\n🏁 workers={result['workers']}：{result['matches']} 场 / {result['seconds']:.1f}s = "
+          f"{result['matches_per_second']:.2f} 场/秒，峰值内存 {result['peak_rss_mib']} MiB"
+          + (f"，{result['failed_runs']} 次运行失败" if result["failed_runs"] else ""))
+    for name, stats in result["stages"].items():
+        print(f"   {name:<18} p50 {stats['p50']:8.2f}s  p99 {stats['p99']:8.2f}s  （{stats['samples']} 次）")
+    for stage, counts in result["matches_by_stage"].items():
+        print(f"   ⚽ {stage:<10} 成功 {counts.get('ok', 0)}，失败 {counts.get('failed', 0)}")
+    print("   🌐 " + "，".join(f"{key}: {count}" for key, count in result["server_requests"].items()))
+
+def default_output(commit):
+    directory = os.path.join(os.path.dirname(SRC_DIR), "足彩分析", "基准测试")
+    return os.path.join(directory, f"端到端基准-{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+# 与之前的结果对比：按 worker 数比较每秒比赛数，返回变慢的轮数
+def compare(rounds, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {r["workers"]: r for r in baseline["rounds"]}
+    print(f"\n📊 对比 {baseline.get('commit') or '?'}（{os.path.basename(baseline_path)}）：")
+    slower = 0
+    for r in rounds:
+        old = before.get(r["workers"])
+        if not old:
+            continue
+        ratio = r["matches_per_second"] / old["matches_per_second"]
+        flag = "🐢" if ratio < 1 / REGRESSION_RATIO else ("🚀" if ratio > REGRESSION_RATIO else "  ")
+        slower += ratio < 1 / REGRESSION_RATIO
+        print(f"   {flag} workers={r['workers']:<3} {old['matches_per_second']:8.2f} → {r['matches_per_second']:8.2f} 场/秒  ({ratio:.2f}x)")
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端吞吐基准：本地替身服务器 + 01 → 00")
+    parser.add_argument("--issues", type=int, default=3, help="期数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4], help="worker 数，每个取值跑一轮")
+    parser.add_argument("--jobs", type=int, default=4, help="00 同时运行的阶段数")
+    parser.add_argument("--snapshots", nargs="+", default=["初盘", "中盘"], help="00 要填写的时间点")
+    parser.add_argument("--latency", type=float, default=50, help="替身服务器响应延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=20, help="延迟的随机浮动范围（± 毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="替身服务器返回 503 的比例")
+    parser.add_argument("--server-rate", type=float, help="替身服务器每个站点每秒允许的请求数（默认不限）")
+    parser.add_argument("--burst", type=float, help="替身服务器令牌桶容量")
+    parser.add_argument("--client-rate", type=float, default=1000, help="客户端限速（每站点每秒请求数）")
+    parser.add_argument("--browser", action="store_true", help="02 用浏览器从替身服务器加载赛程页面（需要 Chrome）")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="保留临时目录（含运行日志）")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比，每秒比赛数下降时退出码为 1")
+    args = parser.parse_args()
+
+    commit, dirty = git_revision()
+    print(f"🔧 提交 {commit or '?'}{'（有未提交修改）' if dirty else ''}：{args.issues} 期 × workers {args.workers}，"
+          f"延迟 {args.latency:.0f}±{args.jitter:.0f}ms，错误率 {args.error_rate:.0%}")
+
+    rounds = []
+    for workers in args.workers:
+        result = run_round(args, workers)
+        rounds.append(result)
+        print_round(result)
+
+    output = args.output or default_output(commit)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "commit": commit, "dirty": dirty, "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "rounds": rounds,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 结果已写入：{output}")
+
+    if args.compare and compare(rounds, args.compare):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
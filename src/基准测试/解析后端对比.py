@@ -0,0 +1,133 @@
+# 解析后端对比 ✅ 用生成的 007 页面（赛程 / 亚盘 / 欧赔列表 / 赔率历史）对比 lxml、selectolax 与 bs4
+#
+# bs4 后端即原来的整页解析方式，作为基准；其余后端的结果必须与之完全一致。
+# 用法（在 src 目录下）：python 基准测试/解析后端对比.py [--repeat 5] [--companies 60] [--matches 300]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 页面解析模块 import (
+    PARSERS, parse_match_list_html, parse_asian_odds_html, parse_1x2_html, parse_initial_1x2_history,
+)
+import 页面解析模块
+
+HANDICAPS = ["平手", "平手/半球", "半球", "半球/一球", "一球", "受让半球", "受让一球/球半", "球半"]
+COMPANIES = ["Bet365", "澳门", "Crown", "立博", "威廉希尔", "易胜博", "韦德", "明陞", "10BET", "金宝博"]
+
+# 页面外壳：导航、脚本、注释、无关表格，模拟真实页面的体积
+def _page(body, rnd, filler_rows):
+    nav = "".join(f"<tr><td><a href='/n/{i}'>导航{i}</a></td><td>广告</td></tr>" for i in range(filler_rows))
+    return (
+        "<html><head><meta charset='utf-8'><title>007</title>"
+        "<script>var data = '<table><tr><td>不是表格</td></tr></table>';</script>"
+        "<style>td { color: red; }</style></head><body>"
+        f"<table id='nav'>{nav}</table><!-- <table id='odds'></table> -->"
+        f"{body}"
+        f"<div id='footer'>{rnd.random()}</div></body></html>"
+    )
+
+def make_asian_page(rnd, companies):
+    rows = []
+    for i in range(companies):
+        name = COMPANIES[i % len(COMPANIES)] + ("" if i < len(COMPANIES) else str(i))
+        closed = rnd.random() < 0.3
+        cells = [f"<td><span>{name}</span><!-- id {i} --></td>", "<td>0.9</td>", "<td>1.0</td>"]
+        cells.append(f"<td>{rnd.choice(HANDICAPS)}</td>")
+        cells += ["<td>0.8</td>", "<td>1.1</td>"]
+        hidden = " style='display: none'" if closed else ""
+        cells.append(f"<td{hidden}>{'' if closed else rnd.choice(HANDICAPS)}</td>")
+        cells += ["<td>0.9</td>", "<td>0.9</td>", f"<td>{rnd.choice(HANDICAPS)}</td>", "<td>1.0</td>"]
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    inner = "<tr><td colspan='11'><table><tr><td>嵌套</td></tr></table></td></tr>"
+    return _page(f"<table id='odds' class='x'>{inner}{''.join(rows)}</table>", rnd, companies * 2)
+
+def make_1x2_page(rnd, companies):
+    rows = []
+    for i in range(companies):
+        name = COMPANIES[i % len(COMPANIES)] + ("" if i < len(COMPANIES) else str(i))
+        values = [f"{rnd.uniform(1.1, 9):.2f}" for _ in range(10)]
+        onclick = f"OddsHistory('/OddsHistory.aspx?id={1000 + i}&sid=2&cid={i}&l=0')"
+        cells = ["<td><input type='checkbox'></td>", f"<td><a>{name}</a></td>"]
+        cells += [f"<td onclick=\"{onclick}\">{v}</td>" for v in values[:7]]
+        cells += [f"<td>{v}</td>" for v in values[7:]]
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return _page(f"<table id=\"oddsList_tab\">{''.join(rows)}</table>", rnd, companies * 2)
+
+def make_history_page(rnd, changes):
+    rows = []
+    for i in range(changes):
+        label = "(初盘)" if i == changes - 1 else f"10-{i % 28 + 1:02d} 12:00"
+        cells = [f"<td>{rnd.uniform(1.1, 9):.2f}</td>" for _ in range(10)]
+        cells.append(f"<td>{label}</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return _page(f"<table class='history'>{''.join(rows)}</table>", rnd, changes)
+
+def make_match_list_page(rnd, matches):
+    rows = []
+    for i in range(matches):
+        asian = f"onclick='AsianOdds({2600000 + i})'" if rnd.random() < 0.9 else ""
+        rows.append(
+            f"<tr><td>{i}</td><td>联赛{i % 12}</td><td>10-18</td><td><a>主队{i}</a><font>[3]</font></td>"
+            f"<td>vs</td><td>客队{i}</td><td><a {asian}>亚</a></td><td>欧</td></tr>"
+        )
+    return _page(f"<table id='table_live'>{''.join(rows)}</table>", rnd, 20)
+
+PAGES = {
+    "赛程": (make_match_list_page, "matches", parse_match_list_html),
+    "亚盘": (make_asian_page, "companies", parse_asian_odds_html),
+    "欧赔列表": (make_1x2_page, "companies", parse_1x2_html),
+    "赔率历史": (make_history_page, "companies", parse_initial_1x2_history),
+}
+
+def available_parsers():
+    parsers = ["bs4"]
+    if 页面解析模块.lxml_html is not None:
+        parsers.insert(0, "lxml")
+    if 页面解析模块.LexborHTMLParser is not None:
+        parsers.insert(-1, "selectolax")
+    return [p for p in PARSERS if p in parsers]
+
+def main():
+    parser = argparse.ArgumentParser(description="对比各解析后端的速度与结果")
+    parser.add_argument("--repeat", type=int, default=5, help="每个页面解析的次数")
+    parser.add_argument("--companies", type=int, default=60, help="亚盘/欧赔/历史页面的行数")
+    parser.add_argument("--matches", type=int, default=300, help="赛程页面的比赛数")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    sizes = {"companies": args.companies, "matches": args.matches}
+    parsers = available_parsers()
+    print(f"🔧 可用后端：{', '.join(parsers)}")
+
+    mismatches = 0
+    for page_name, (make, size_key, parse) in PAGES.items():
+        html = make(rnd, sizes[size_key])
+        expected = parse(html, "bs4")
+        timings = {}
+        for name in parsers:
+            result = parse(html, name)
+            if result != expected:
+                mismatches += 1
+                print(f"❌ {page_name} / {name} 的结果与 bs4 不一致")
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                parse(html, name)
+            timings[name] = (time.perf_counter() - start) / args.repeat * 1000
+
+        base = timings["bs4"]
+        line = "  ".join(f"{name} {ms:8.2f} ms ({base / ms:5.1f}x)" for name, ms in timings.items())
+        print(f"📄 {page_name:<6} {len(html) / 1024:7.1f} KB  {line}")
+
+    if mismatches:
+        print(f"❌ 共 {mismatches} 处结果不一致")
+        sys.exit(1)
+    print("✅ 各后端结果与 bs4 一致")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# 解析基准 ✅ 用 样本/ 中录制并脱敏的页面与接口数据，按 1× / 100× / 10000× 规模计时各解析与整形函数，结果写成 JSON 供不同提交对比
+#
+# 样本保留真实页面的表格结构、属性与页面外壳；队名替换为“球队NNN”，比赛ID 与赔率均为虚构的值。
+# 规模的含义：页面类用例为解析的页面数（10000× 约等于几十期的全部请求）；表格类用例为输入行数的倍数。
+# 用法（在 src 目录下）：
+#   python 基准测试/解析基准.py                        # 全部用例，写出 ../足彩分析/基准测试/解析基准-{提交}-{时间}.json
+#   python 基准测试/解析基准.py --scales 1 100 --cases parse_1x2_html convert_handicap
+#   python 基准测试/解析基准.py --compare ../足彩分析/基准测试/解析基准-abc1234-20250405-120000.json
+
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+import pandas as pd
+
+from 页面解析模块 import default_parser, convert_handicap, parse_1x2_html, parse_1x2_history
+from 赛程匹配模块 import extract_matches_from_html
+from 盘口赔率采集模块 import get_initial_1x2_from_history
+from 体彩赛事模块 import build_issue_frame
+from 智能分析模块 import ANALYSIS_FIELDS, LIVE_FIELDS, compute_analysis_fields, compute_analysis_frame
+from 响应缓存模块 import set_replay, store
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "样本")
+
+DEFAULT_SCALES = [1, 100, 10000]
+
+# 达到该规模时只跑一次（单次已足够长，重复只会拖慢整轮）
+SINGLE_RUN_SCALE = 10000
+
+# 比较时超过该比例视为变慢
+REGRESSION_RATIO = 1.2
+
+def read_sample(name):
+    with open(os.path.join(SAMPLE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_samples():
+    return {
+        "next": read_sample("Next_20250405.htm"),
+        "asian": read_sample("AsianOdds_n.aspx.html"),
+        "oddslist": read_sample("oddslist_2600001.htm"),
+        "history": read_sample("OddsHistory.aspx.html"),
+        "sporttery": json.loads(read_sample("getFootBallMatchV1.qry.json")),
+    }
+
+# ---------- 用例：prepare(samples, scale) → (待计时的函数, 处理单位数, 单位) ----------
+
+def case_extract_matches(samples, scale):
+    html = samples["next"]
+    return lambda: [extract_matches_from_html(html, "20250405") for _ in range(scale)], scale, "页"
+
+def case_parse_1x2(samples, scale):
+    html = samples["oddslist"]
+    return lambda: [parse_1x2_html(html) for _ in range(scale)], scale, "页"
+
+# 初盘赔率：读响应缓存 + 解析历史页面。历史页面预先写入临时目录的缓存，回放模式下不会发出请求
+def case_initial_1x2(samples, scale):
+    urls = [url for _, url in parse_1x2_html(samples["oddslist"])["history_urls"]]
+    for url in urls:
+        store(url, samples["history"])
+    return lambda: [get_initial_1x2_from_history(urls[i % len(urls)]) for i in range(scale)], scale, "页"
+
+# 亚盘页面中的全部盘口文本
+def case_convert_handicap(samples, scale):
+    texts = re.findall(r"<td[^>]*>([^<>]*(?:球|平手)[^<>]*)</td>", samples["asian"]) * scale
+    return lambda: [convert_handicap(text) for text in texts], len(texts), "条"
+
+# fetch_14_match_structured 中 JSON → 整期基础表的部分；场次重新编号，保证排序有实际工作量
+def case_build_issue_frame(samples, scale):
+    template = samples["sporttery"]["value"]["sfcMatch"]["matchList"]
+    match_list = [dict(m, matchNum=len(template) * scale - i) for i, m in enumerate(template * scale)]
+    data = {"value": {"sfcMatch": {"matchList": match_list}}}
+    return lambda: build_issue_frame("25048", data), len(match_list), "行"
+
+# 填好临盘盘口与赔率的整期表：赔率取自赔率历史样本，盘口取自亚盘样本，按行循环
+def analysis_input(samples, scale):
+    df = build_issue_frame("25048", samples["sporttery"])
+    changes = parse_1x2_history(samples["history"])
+    handicaps = re.findall(r"<td[^>]*>([^<>]*(?:球|平手)[^<>]*)</td>", samples["asian"])
+    for i in range(len(df)):
+        _, values = changes[i % len(changes)]
+        for column, value in zip(("主胜赔率", "平局赔率", "客胜赔率", "主凯利", "平凯利", "客凯利"), values):
+            df.iloc[i, df.columns.get_loc("临盘" + column)] = value
+        df.iloc[i, df.columns.get_loc("临盘盘口")] = str(convert_handicap(handicaps[i % len(handicaps)]))
+    return pd.concat([df] * scale, ignore_index=True)
+
+def case_analysis_fields(samples, scale):
+    df = analysis_input(samples, scale)
+    return lambda: df.apply(compute_analysis_fields, axis=1), len(df), "行"
+
+# 按列计算的版本，与逐行版本对照
+def case_analysis_frame(samples, scale):
+    df = analysis_input(samples, scale)
+    return lambda: compute_analysis_frame(df), len(df), "行"
+
+# 按列计算与逐行计算的结果必须完全一致：在样本表上叠加边界输入（空、"-"、nan/inf、缺列、.xx5 舍入等）逐格比较，
+# 返回不一致的行数；计时前先检查，不一致时计时没有意义
+EDGE_VALUES = ["", "-", "nan", "inf", "-inf", " 1.9 ", "1.005", "2.675", "0.125", "1e3", "abc", "0", None, np.nan, 0.0, 1.9]
+
+def check_analysis_frame(samples):
+    df = analysis_input(samples, 1).astype(object)
+    for prefix in ("临盘", "中盘"):
+        for suffix in LIVE_FIELDS.values():
+            if prefix + suffix not in df.columns:
+                df[prefix + suffix] = ""
+    rows = [df]
+    for k, value in enumerate(EDGE_VALUES):
+        edge = df.copy()
+        for j, column in enumerate(c for c in df.columns if c[:2] in ("临盘", "中盘")):
+            if (j + k) % 3 == 0:
+                edge[column] = value
+        rows.append(edge)
+    edge = pd.concat(rows, ignore_index=True)
+
+    mismatched = 0
+    for frame in (edge, edge.drop(columns=["临盘盘口", "中盘盘口"])):
+        expected = pd.DataFrame(frame.apply(compute_analysis_fields, axis=1).tolist(), index=frame.index, columns=ANALYSIS_FIELDS)
+        actual = compute_analysis_frame(frame)
+        same = (expected == actual) | (expected.isna() & actual.isna())
+        mismatched += int((~same.all(axis=1)).sum())
+    return mismatched
+
+CASES = {
+    "extract_matches_from_html": case_extract_matches,
+    "parse_1x2_html": case_parse_1x2,
+    "get_initial_1x2_from_history": case_initial_1x2,
+    "convert_handicap": case_convert_handicap,
+    "build_issue_frame": case_build_issue_frame,
+    "compute_analysis_fields": case_analysis_fields,
+    "compute_analysis_frame": case_analysis_frame,
+}
+
+# ---------- 运行与对比 ----------
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=SRC_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(dirty)
+
+def environment():
+    versions = {"python": platform.python_version(), "pandas": pd.__version__}
+    for name in ("lxml", "selectolax", "bs4"):
+        try:
+            versions[name] = __import__(name).__version__
+        except (ImportError, AttributeError):
+            pass
+    return {"platform": platform.platform(), "machine": platform.machine(), "versions": versions, "html_parser": default_parser()}
+
+# 某个用例在某个规模下的结果：取 repeat 次中最快的一次
+def run_case(name, samples, scale, repeat):
+    func, units, unit = CASES[name](samples, scale)
+    runs = []
+    for _ in range(1 if scale >= SINGLE_RUN_SCALE else repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    return {
+        "case": name, "scale": scale, "units": units, "unit": unit,
+        "seconds": round(best, 6), "runs": [round(r, 6) for r in runs],
+        "per_unit_us": round(best / units * 1e6, 3),
+        "units_per_second": round(units / best, 1) if best else None,
+    }
+
+def default_output(commit):
+    directory = os.path.join(os.path.dirname(SRC_DIR), "足彩分析", "基准测试")
+    return os.path.join(directory, f"解析基准-{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+# 与之前的结果对比：按 (用例, 规模) 比较单位耗时，返回变慢的条数
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["case"], r["scale"]): r for r in baseline["results"]}
+    print(f"\n📊 对比 {baseline.get('commit') or '?'}（{os.path.basename(baseline_path)}）：")
+    slower = 0
+    for r in results:
+        old = before.get((r["case"], r["scale"]))
+        if not old:
+            continue
+        ratio = r["per_unit_us"] / old["per_unit_us"] if old["per_unit_us"] else float("inf")
+        flag = "🐢" if ratio > REGRESSION_RATIO else ("🚀" if ratio < 1 / REGRESSION_RATIO else "  ")
+        slower += ratio > REGRESSION_RATIO
+        print(f"   {flag} {r['case']:<30} {r['scale']:>6}×  {old['per_unit_us']:10.2f} → {r['per_unit_us']:10.2f} µs/{r['unit']}  ({ratio:.2f}x)")
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="解析与整形函数的基准测试（样本数据，不联网）")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="规模倍数")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), help="只跑这些用例")
+    parser.add_argument("--repeat", type=int, default=3, help=f"每个规模重复的次数，取最快一次（{SINGLE_RUN_SCALE}× 及以上只跑一次）")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比，有变慢的用例时退出码为 1")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    mismatched = check_analysis_frame(samples)
+    if mismatched:
+        print(f"❌ compute_analysis_frame 与 compute_analysis_fields 有 {mismatched} 行结果不一致")
+        sys.exit(1)
+    commit, dirty = git_revision()
+    env = environment()
+    print(f"🔧 提交 {commit or '?'}{'（有未提交修改）' if dirty else ''}，解析后端 {env['html_parser']}，Python {env['versions']['python']}")
+
+    # 响应缓存放在临时目录并开启回放，计时期间不会读写真实缓存，也不会发出请求
+    workdir = tempfile.mkdtemp(prefix="解析基准-")
+    os.makedirs(os.path.join(workdir, "src"))
+    cwd = os.getcwd()
+    os.chdir(os.path.join(workdir, "src"))
+    set_replay(True)
+    results = []
+    try:
+        for name in args.cases or CASES:
+            for scale in args.scales:
+                result = run_case(name, samples, scale, args.repeat)
+                results.append(result)
+                print(f"⏱️ {name:<30} {scale:>6}×  {result['units']:>9} {result['unit']}  "
+                      f"{result['seconds']:9.4f}s  {result['per_unit_us']:10.2f} µs/{result['unit']}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or default_output(commit)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "commit": commit, "dirty": dirty, "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": env, "repeat": args.repeat, "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 结果已写入：{output}")
+
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# 定时采集模块 ✅ 按开赛时间倒推初盘/中盘/临盘/封盘的采集时刻，用优先队列调度；队列存在 SQLite 中，重启后继续
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from 读取配置文件模块 import load_setting, reload_config
+from 页面解析模块 import SNAPSHOTS
+from 盘口赔率采集模块 import KINDS, harvest_issue
+from 赛事数据存储模块 import JOURNAL_OK
+from 表格读写模块 import load_issue_table, extract_match_id
+from 指标模块 import flush_metrics
+from 赛程匹配模块 import parse_kickoffs
+
+# 各时间点在开赛前多少分钟采集（配置 snapshot_offsets 可覆盖）
+DEFAULT_OFFSETS = {"初盘": 48 * 60, "中盘": 24 * 60, "临盘": 120, "封盘": 5}
+
+# 到期时间相差不超过该秒数的任务合并成一次采集
+DEFAULT_COALESCE_SECONDS = 60
+
+# 失败后隔多久重试、最多尝试几次；多久重新读取一次比赛表（开赛时间可能调整、可能新增比赛）
+RETRY_MINUTES = 5
+MAX_ATTEMPTS = 3
+RESCAN_MINUTES = 10
+
+# 任务状态
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+EXPIRED = "expired"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    issue TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    kickoff TEXT NOT NULL,
+    due_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (issue, match_id, snapshot)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_due ON jobs (status, due_at);
+"""
+
+def get_queue_path():
+    default = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", "定时采集队列.sqlite")
+    return load_setting("scheduler_queue_path", default)
+
+def snapshot_offsets():
+    offsets = dict(DEFAULT_OFFSETS)
+    offsets.update(load_setting("snapshot_offsets", {}))
+    return {snap: timedelta(minutes=offsets[snap]) for snap in SNAPSHOTS}
+
+# 任务的截止时间：初盘取自赔率历史，开赛后仍可补抓；其余时间点开赛后就没有意义了
+def job_deadline(snapshot, kickoff):
+    return None if snapshot == "初盘" else kickoff
+
+def _now_text():
+    return datetime.now().isoformat(timespec="seconds")
+
+# 由一期的比赛表生成任务：[(期号, 比赛ID, 时间点, 开赛时间, 到期时间)]；没有链接或开赛时间的比赛跳过
+def plan_jobs(issue, offsets=None):
+    offsets = offsets or snapshot_offsets()
+    df, hyperlink_map = load_issue_table(issue)
+    if "比赛时间" not in df.columns:
+        print(f"⚠️ 第 {issue} 期没有比赛时间，无法定时采集")
+        return []
+
+    jobs = []
+    for i, kickoff in enumerate(parse_kickoffs(df["比赛时间"])):
+        match_id = extract_match_id(hyperlink_map.get(i))
+        if not match_id or kickoff is None or kickoff != kickoff:
+            continue
+        kickoff = kickoff.to_pydatetime()
+        for snap in SNAPSHOTS:
+            jobs.append((issue, match_id, snap, kickoff, kickoff - offsets[snap]))
+    return jobs
+
+class SnapshotScheduler:
+    """
+    定时采集：任务按到期时间放在小顶堆里，到期（含合并窗口内）的任务按 (期号, 时间点) 合并，
+    交给采集线程执行一次 harvest_issue；任务状态写回 SQLite，重启后从队列继续。
+    堆与任务状态（_heap / _due / _running）由主循环和采集线程共用，读写都要持有 _lock。
+    """
+
+    def __init__(self, issues, workers=None, coalesce_seconds=None, queue_path=None):
+        self.issues = list(issues)
+        self.workers = workers or load_setting("scheduler_workers", 2)
+        self.coalesce = timedelta(seconds=coalesce_seconds if coalesce_seconds is not None
+                                  else load_setting("scheduler_coalesce_seconds", DEFAULT_COALESCE_SECONDS))
+        self.queue_path = queue_path or get_queue_path()
+        self._heap = []
+        self._due = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._issue_locks = {issue: threading.Lock() for issue in self.issues}
+        self._running = set()
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.queue_path)), exist_ok=True)
+        conn = sqlite3.connect(self.queue_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # 读取比赛表，新比赛入队；开赛时间调整过的待执行任务更新到期时间；然后按队列重建堆
+    # 常驻进程同时重新读取配置文件，运行中修改的配置在下一次同步时生效
+    def sync(self):
+        reload_config()
+        now = _now_text()
+        rows = []
+        for issue in self.issues:
+            try:
+                rows.extend(plan_jobs(issue))
+            except Exception as e:
+                print(f"❌ 读取第 {issue} 期比赛表失败：{e!r}")
+
+        with self._db_lock, closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO jobs (issue, match_id, snapshot, kickoff, due_at, status, attempts, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0, ?) "
+                    "ON CONFLICT (issue, match_id, snapshot) DO UPDATE SET "
+                    "kickoff = excluded.kickoff, due_at = excluded.due_at, updated_at = excluded.updated_at "
+                    "WHERE jobs.status = 'pending' AND jobs.attempts = 0 AND jobs.kickoff != excluded.kickoff",
+                    [
+                        (issue, match_id, snap, kickoff.isoformat(), due.isoformat(), PENDING, now)
+                        for issue, match_id, snap, kickoff, due in rows
+                    ],
+                )
+            pending = conn.execute(
+                "SELECT issue, match_id, snapshot, kickoff, due_at FROM jobs WHERE status = ? AND issue IN (%s)"
+                % ", ".join("?" for _ in self.issues),
+                [PENDING, *self.issues],
+            ).fetchall()
+
+        with self._lock:
+            self._heap = []
+            self._due = {}
+            for issue, match_id, snap, kickoff, due in pending:
+                self._push((issue, match_id, snap), datetime.fromisoformat(due), datetime.fromisoformat(kickoff))
+            print(f"🗓️ 队列中待执行任务 {len(self._heap)} 个")
+
+    # 入堆（调用方持有 _lock）；同一任务以最后一次入堆的到期时间为准，旧的堆元素出堆时丢弃
+    def _push(self, key, due, kickoff):
+        self._due[key] = (due, kickoff)
+        heapq.heappush(self._heap, (due, key))
+
+    def next_due(self):
+        with self._lock:
+            while self._heap:
+                due, key = self._heap[0]
+                if self._due.get(key, (None,))[0] == due and key not in self._running:
+                    return due
+                heapq.heappop(self._heap)
+            return None
+
+    # 取出 now + 合并窗口 内到期的任务，按 (期号, 时间点) 分组：{(期号, 时间点): {比赛ID: 开赛时间}}
+    def pop_due(self, now):
+        groups = {}
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now + self.coalesce:
+                due, key = heapq.heappop(self._heap)
+                if self._due.get(key, (None,))[0] != due or key in self._running:
+                    continue
+                issue, match_id, snap = key
+                groups.setdefault((issue, snap), {})[match_id] = self._due.pop(key)[1]
+                self._running.add(key)
+        return groups
+
+    def _update(self, issue, snap, match_id, status, due=None, attempt=False):
+        with self._db_lock, closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, due_at = COALESCE(?, due_at), "
+                    "attempts = attempts + ?, updated_at = ? WHERE issue = ? AND match_id = ? AND snapshot = ?",
+                    (status, due.isoformat() if due else None, 1 if attempt else 0, _now_text(), issue, match_id, snap),
+                )
+                row = conn.execute(
+                    "SELECT attempts FROM jobs WHERE issue = ? AND match_id = ? AND snapshot = ?",
+                    (issue, match_id, snap),
+                ).fetchone()
+        return row[0] if row else 0
+
+    # 执行一组合并后的任务：一次采集该期这些比赛的这个时间点（盘口 + 赔率，强制刷新）
+    def run_group(self, issue, snap, kickoffs):
+        now = datetime.now()
+        live = {}
+        for match_id, kickoff in kickoffs.items():
+            deadline = job_deadline(snap, kickoff)
+            if deadline is not None and now > deadline:
+                print(f"⌛ 已过期：第 {issue} 期 {match_id} {snap}（开赛 {kickoff:%m-%d %H:%M}）")
+                self._update(issue, snap, match_id, EXPIRED)
+                with self._lock:
+                    self._running.discard((issue, match_id, snap))
+            else:
+                live[match_id] = kickoff
+        if not live:
+            return
+
+        print(f"🚀 采集第 {issue} 期 {snap}：{len(live)} 场（{', '.join(live)}）")
+        try:
+            with self._issue_locks.setdefault(issue, threading.Lock()):
+                entries = harvest_issue(issue, [snap], KINDS, force=True, match_ids=set(live))
+        except Exception as e:
+            print(f"❌ 第 {issue} 期 {snap} 采集失败：{e!r}")
+            entries = []
+
+        outcome = {}
+        for match_id, entry_snap, _, status, _ in entries:
+            if entry_snap == snap:
+                outcome[match_id] = outcome.get(match_id, True) and status == JOURNAL_OK
+
+        retry_at = datetime.now().replace(microsecond=0) + timedelta(minutes=RETRY_MINUTES)
+        for match_id, kickoff in live.items():
+            key = (issue, match_id, snap)
+            retry = False
+            if outcome.get(match_id):
+                self._update(issue, snap, match_id, DONE, attempt=True)
+            else:
+                attempts = self._update(issue, snap, match_id, PENDING, due=retry_at, attempt=True)
+                deadline = job_deadline(snap, kickoff)
+                if attempts >= MAX_ATTEMPTS or (deadline is not None and retry_at > deadline):
+                    self._update(issue, snap, match_id, FAILED)
+                    print(f"❌ 放弃：第 {issue} 期 {match_id} {snap}（已尝试 {attempts} 次）")
+                else:
+                    retry = True
+                    print(f"🔁 {RETRY_MINUTES} 分钟后重试：第 {issue} 期 {match_id} {snap}")
+            with self._lock:
+                if retry:
+                    self._push(key, retry_at, kickoff)
+                self._running.discard(key)
+        # 常驻进程不会退出，每次采集后刷新导出的指标
+        flush_metrics()
+
+    # 执行当前到期的任务并等待完成（once 模式与常驻模式共用）
+    def run_due(self, executor):
+        groups = self.pop_due(datetime.now())
+        futures = [executor.submit(self.run_group, issue, snap, kickoffs) for (issue, snap), kickoffs in groups.items()]
+        return futures
+
+    def run_once(self):
+        self.sync()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in self.run_due(executor):
+                future.result()
+
+    # 常驻运行：睡到下一个任务到期（最长 1 分钟），定期重新读取比赛表
+    def run_forever(self):
+        self.sync()
+        next_sync = datetime.now() + timedelta(minutes=RESCAN_MINUTES)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                if datetime.now() >= next_sync:
+                    self.sync()
+                    next_sync = datetime.now() + timedelta(minutes=RESCAN_MINUTES)
+
+                self.run_due(executor)
+
+                due = self.next_due()
+                wait = 60.0 if due is None else (due - self.coalesce - datetime.now()).total_seconds()
+                if due is not None and wait > 0:
+                    print(f"⏰ 下一个任务：{due:%m-%d %H:%M}")
+                time.sleep(min(max(wait, 1.0), 60.0))
+
+# 队列概况：[(期号, 比赛ID, 时间点, 开赛时间, 到期时间, 状态, 尝试次数)]，按到期时间排序
+def list_jobs(issues=None, queue_path=None):
+    with closing(sqlite3.connect(queue_path or get_queue_path())) as conn:
+        conn.executescript(SCHEMA)
+        sql = "SELECT issue, match_id, snapshot, kickoff, due_at, status, attempts FROM jobs"
+        params = []
+        if issues:
+            sql += " WHERE issue IN (%s)" % ", ".join("?" for _ in issues)
+            params = list(issues)
+        return conn.execute(sql + " ORDER BY due_at", params).fetchall()
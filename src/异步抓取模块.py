@@ -0,0 +1,94 @@
+# 异步抓取模块 ✅ 不启动浏览器，用 asyncio + aiohttp 并发获取静态页面（连接池 + keep-alive + 单站并发上限）
+
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:  # 未安装 aiohttp 时只能使用 Selenium 抓取
+    aiohttp = None
+
+from 读取配置文件模块 import load_setting, site_url
+from 限速模块 import async_throttle, report_response
+from 指标模块 import record_fetch
+from 追踪模块 import span
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "zh-CN,zh;q=0.9",
+}
+
+# 当前环境能否使用异步抓取
+def http_engine_available():
+    return aiohttp is not None
+
+class AsyncFetcher:
+    """
+    异步页面抓取器：同一个会话内复用连接，每个站点同时最多 per_host 个请求。
+    """
+
+    def __init__(self, per_host=None, timeout=None):
+        if aiohttp is None:
+            raise ImportError("异步抓取需要 aiohttp：pip install aiohttp")
+        self.per_host = per_host or load_setting("http_per_host", 4)
+        self.timeout = timeout or load_setting("http_timeout", 15)
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=0, limit_per_host=self.per_host, keepalive_timeout=30, ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            # 排队等连接的时间不计入超时，只限制建连与读取
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+
+    # 获取单个页面文本；encoding 为空时按响应头/内容自动识别
+    # 请求前按站点限速，请求后把状态码/超时报告给限速器
+    async def fetch_text(self, url, encoding=None):
+        await async_throttle(url)
+        start = time.perf_counter()
+        try:
+            with span("http_get", url=url) as current:
+                async with self._session.get(site_url(url)) as response:
+                    if current is not None:
+                        current.set("http.status_code", response.status)
+                    await asyncio.to_thread(report_response, url, response.status, response.headers.get("Retry-After"))
+                    record_fetch(url, "http", response.status, time.perf_counter() - start)
+                    response.raise_for_status()
+                    body = await response.read()
+                    if encoding is None:
+                        encoding = response.get_encoding()
+                    return body.decode(encoding, errors="replace")
+        except asyncio.TimeoutError:
+            record_fetch(url, "http", "timeout", time.perf_counter() - start)
+            await asyncio.to_thread(report_response, url, None)
+            raise
+        except aiohttp.ClientConnectionError:
+            record_fetch(url, "http", "error", time.perf_counter() - start)
+            await asyncio.to_thread(report_response, url, None)
+            raise
+
+    # 并发获取多个页面，返回 {url: 文本}，失败的页面值为异常对象
+    async def fetch_many(self, urls, encoding=None):
+        urls = list(dict.fromkeys(urls))
+        texts = await asyncio.gather(
+            *(self.fetch_text(url, encoding) for url in urls), return_exceptions=True
+        )
+        return dict(zip(urls, texts))
+
+# 同步调用入口：fetch_pages(urls) → {url: 文本或异常}
+def fetch_pages(urls, encoding=None):
+    async def run():
+        async with AsyncFetcher() as fetcher:
+            return await fetcher.fetch_many(urls, encoding)
+    return asyncio.run(run())
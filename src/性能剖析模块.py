@@ -0,0 +1,196 @@
+# 性能剖析模块 ✅ --profile 运行时同时记录 CPU（cProfile）、墙钟采样（可画火焰图的折叠栈）与内存分配（tracemalloc）
+#
+# 进程退出时写到 ../足彩分析/{期号}/profile/ 下，文件名前缀为 {脚本名}-{时间}：
+#   .prof          cProfile 原始数据（snakeviz / python -m pstats 打开），主线程与各工作线程合并
+#   -cpu.txt       按累计耗时排序的前若干个函数
+#   -wall.folded   所有线程的墙钟采样，折叠栈格式（flamegraph.pl / speedscope 直接读取），
+#                  等待网络、浏览器与 sleep 的时间也在其中
+#   -memory.txt    tracemalloc 的内存峰值与分配最多的代码行
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from 读取配置文件模块 import load_config, load_setting
+
+# 墙钟采样间隔（秒）
+DEFAULT_INTERVAL = 0.005
+
+# 报告中列出的条数
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TOP_TRACEBACKS = 5
+
+# tracemalloc 每次分配保存的栈深度
+MEMORY_FRAMES = 10
+
+# 剖析结果目录：配置中的当前期号下的 profile/；没有配置时放在 足彩分析/profile/
+def profile_dir():
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    try:
+        issue, _ = load_config()
+    except (FileNotFoundError, KeyError):
+        return os.path.join(parent_path, "足彩分析", "profile")
+    return os.path.join(parent_path, "足彩分析", issue, "profile")
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class WallSampler:
+    """
+    后台线程定时读取所有线程的调用栈，按 线程;外层函数;...;内层函数 累计采样次数。
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wall-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """
+    一次运行的剖析：start 后同时开启 cProfile、墙钟采样与 tracemalloc，stop 时写出报告。
+    cProfile 只能剖析开启它的线程，所以之后新建的线程（线程池、浏览器池、流水线阶段）各开一个，报告时合并。
+    """
+
+    def __init__(self, script, interval=None):
+        self.script = script
+        self.sampler = WallSampler(interval or load_setting("profile_interval", DEFAULT_INTERVAL))
+        self.cpu = cProfile.Profile()
+        self.thread_profiles = []
+        self.started = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        tracemalloc.start(MEMORY_FRAMES)
+        self.sampler.start()
+        self.started = time.perf_counter()
+        threading.setprofile(self._profile_thread)
+        self.cpu.enable()
+        return self
+
+    # 新线程的第一个事件：换成该线程自己的 cProfile
+    def _profile_thread(self, frame, event, arg):
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+ 的 cProfile 已在进程范围内记录，不能再开
+            return
+        with self._lock:
+            self.thread_profiles.append(profile)
+
+    # 主线程与各工作线程的 cProfile 合并成一份
+    def cpu_stats(self, stream=None):
+        stats = pstats.Stats(self.cpu, stream=stream)
+        with self._lock:
+            profiles = list(self.thread_profiles)
+        for profile in profiles:
+            try:
+                stats.add(profile)
+            except TypeError:  # 线程里还没有任何调用记录
+                pass
+        return stats, len(profiles)
+
+    # 停止并写出报告，返回文件路径列表
+    def stop(self, directory=None):
+        threading.setprofile(None)
+        self.cpu.disable()
+        elapsed = time.perf_counter() - self.started
+        self.sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        directory = directory or profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.script}-{datetime.now():%Y%m%d-%H%M%S}")
+        paths = [base + ".prof", base + "-cpu.txt", base + "-wall.folded", base + "-memory.txt"]
+
+        with open(paths[1], "w", encoding="utf-8") as f:
+            stats, threads = self.cpu_stats(stream=f)
+            stats.dump_stats(paths[0])
+            f.write(f"# {self.script} 墙钟 {elapsed:.2f}s（cProfile 合并了主线程与 {threads} 个工作线程）\n\n")
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+        self.sampler.write_folded(paths[2])
+        with open(paths[3], "w", encoding="utf-8") as f:
+            f.write(memory_report(snapshot, current, peak))
+        return paths
+
+# tracemalloc 报告：峰值、分配最多的代码行、以及前几处的调用栈
+def memory_report(snapshot, current, peak):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    out = io.StringIO()
+    out.write(f"当前 {current / 2**20:.1f} MiB，峰值 {peak / 2**20:.1f} MiB\n\n")
+    out.write(f"分配最多的 {TOP_ALLOCATIONS} 行：\n")
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        out.write(f"  {stat.size / 1024:10.1f} KiB {stat.count:8d} 次  {stat.traceback[0]}\n")
+    out.write(f"\n分配最多的 {TOP_TRACEBACKS} 处调用栈：\n")
+    for stat in snapshot.statistics("traceback")[:TOP_TRACEBACKS]:
+        out.write(f"\n  {stat.size / 1024:.1f} KiB，{stat.count} 次\n")
+        for line in stat.traceback.format():
+            out.write(f"    {line}\n")
+    return out.getvalue()
+
+_profiler = None
+
+# 开启剖析，进程退出时写出报告（入口脚本的 --profile）
+def start_profiling(script=None):
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    script = script or os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+    _profiler = Profiler(script).start()
+    print(f"🔬 性能剖析已开启（采样间隔 {_profiler.sampler.interval * 1000:.0f}ms）")
+
+    def finish():
+        paths = _profiler.stop()
+        print(f"🔬 性能剖析已写出：{os.path.dirname(paths[0])}")
+        for path in paths:
+            print(f"   {os.path.basename(path)}")
+
+    atexit.register(finish)
+    return _profiler
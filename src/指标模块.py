@@ -0,0 +1,239 @@
+# 指标模块 ✅ 进程内的计数器、直方图与仪表（按标签区分），运行结束时导出为 Prometheus textfile 与 JSON 摘要
+#
+# 各模块在关键位置调用 inc / observe / timed 记录：页面请求数与耗时、缓存命中、解析耗时与行数、
+# 每个阶段的比赛成功数、浏览器启动耗时、xlsx 写入耗时、流水线各阶段耗时。
+# 入口脚本经 parse_stage_args 注册退出时导出：../足彩分析/指标/{脚本名}.prom（node_exporter textfile collector
+# 读取该目录）与同名 .json。各文件的指标都带 script 标签，多个脚本的文件放在同一目录也不会冲突。
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from 读取配置文件模块 import load_setting
+
+PREFIX = "football_"
+
+# 直方图的桶（秒）：覆盖毫秒级的解析到分钟级的阶段
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+# 指标定义：名称 → (类型, 说明)
+METRICS = {
+    "pages_fetched_total": ("counter", "请求的页面数，按站点、抓取方式与结果（状态码/timeout/error）"),
+    "fetch_seconds": ("histogram", "单个页面请求耗时（不含限速等待）"),
+    "cache_lookups_total": ("counter", "响应缓存查询次数，按结果（hit/miss）"),
+    "parse_seconds": ("histogram", "页面解析耗时，按解析函数"),
+    "rows_parsed_total": ("counter", "解析得到的行数，按解析函数"),
+    "matches_total": ("counter", "各阶段处理的比赛数，按结果（ok/failed）"),
+    "driver_start_seconds": ("histogram", "启动一个浏览器的耗时"),
+    "xlsx_write_seconds": ("histogram", "写入一个 xlsx 文件的耗时"),
+    "stage_seconds": ("histogram", "流水线各阶段耗时"),
+    "run_duration_seconds": ("gauge", "本次运行总耗时"),
+    "run_timestamp_seconds": ("gauge", "本次运行结束的时间戳"),
+}
+
+class MetricsRegistry:
+    """
+    线程安全的指标存储：每个指标按标签组合分别累计。
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def _check(self, name, kind):
+        if METRICS.get(name, (None,))[0] != kind:
+            raise ValueError(f"未定义的{kind}指标：{name}")
+
+    def inc(self, name, amount=1, **labels):
+        self._check(name, "counter")
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        self._check(name, "gauge")
+        with self._lock:
+            self._values.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        self._check(name, "histogram")
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            key = self._key(labels)
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0, "max": 0.0}
+            for k, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["counts"][k] += 1
+            hist["count"] += 1
+            hist["sum"] += value
+            hist["max"] = max(hist["max"], value)
+
+    # 某个指标全部标签组合的快照：{标签元组: 值}
+    def series(self, name):
+        with self._lock:
+            return {key: (dict(value, counts=list(value["counts"])) if isinstance(value, dict) else value)
+                    for key, value in self._values.get(name, {}).items()}
+
+    def names(self):
+        with self._lock:
+            return [name for name in METRICS if name in self._values]
+
+REGISTRY = MetricsRegistry()
+
+def inc(name, amount=1, **labels):
+    REGISTRY.inc(name, amount, **labels)
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+def set_gauge(name, value, **labels):
+    REGISTRY.set(name, value, **labels)
+
+# 记录 with 块的耗时到直方图
+@contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+# 记录一次页面请求：status 为 HTTP 状态码，或 timeout / error
+def record_fetch(url, engine, status, seconds):
+    host = urlparse(url).hostname or url
+    inc("pages_fetched_total", host=host, engine=engine, result=status)
+    observe("fetch_seconds", seconds, host=host, engine=engine)
+
+# 解析函数的装饰器：记录耗时与得到的行数（列表按长度，其余非空结果记 1 行）
+def instrument_parser(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        observe("parse_seconds", time.perf_counter() - start, parser=func.__name__)
+        rows = len(result) if isinstance(result, list) else (1 if result else 0)
+        inc("rows_parsed_total", rows, parser=func.__name__)
+        return result
+    return wrapper
+
+# ---------- 导出 ----------
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels_text(key, extra=()):
+    pairs = list(extra) + list(key)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Prometheus 文本格式；script 不为空时给每条指标加上 script 标签
+def render_prometheus(registry=REGISTRY, script=None):
+    extra = (("script", script),) if script else ()
+    lines = []
+    for name in registry.names():
+        kind, help_text = METRICS[name]
+        full = PREFIX + name
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for key, value in sorted(registry.series(name).items()):
+            if kind != "histogram":
+                lines.append(f"{full}{_labels_text(key, extra)} {_number(value)}")
+                continue
+            for bound, count in zip(registry.buckets, value["counts"]):
+                lines.append(f"{full}_bucket{_labels_text(key + (('le', _number(float(bound))),), extra)} {count}")
+            lines.append(f"{full}_bucket{_labels_text(key + (('le', '+Inf'),), extra)} {value['count']}")
+            lines.append(f"{full}_sum{_labels_text(key, extra)} {_number(value['sum'])}")
+            lines.append(f"{full}_count{_labels_text(key, extra)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+# JSON 摘要：计数器与仪表为 [{标签..., value}]，直方图为 [{标签..., count, sum, mean, max}]
+def summarize(registry=REGISTRY):
+    result = {}
+    for name in registry.names():
+        kind = METRICS[name][0]
+        rows = []
+        for key, value in sorted(registry.series(name).items()):
+            row = dict(key)
+            if kind == "histogram":
+                row.update(
+                    count=value["count"], sum=round(value["sum"], 6),
+                    mean=round(value["sum"] / value["count"], 6) if value["count"] else None,
+                    max=round(value["max"], 6),
+                )
+            else:
+                row["value"] = value
+            rows.append(row)
+        result[name] = rows
+    return result
+
+def metrics_dir():
+    default = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", "指标")
+    return load_setting("metrics_dir", default)
+
+def _atomic_write_text(path, text):
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# 导出本次运行的指标：{目录}/{script}.prom 与 {script}.json，返回两个路径
+def export_metrics(script, directory=None, registry=REGISTRY):
+    directory = directory or metrics_dir()
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    registry.set("run_duration_seconds", now - registry.started_at)
+    registry.set("run_timestamp_seconds", now)
+
+    prom_path = os.path.join(directory, f"{script}.prom")
+    json_path = os.path.join(directory, f"{script}.json")
+    # textfile collector 只读 *.prom，先写临时文件再改名，避免读到半个文件
+    _atomic_write_text(prom_path, render_prometheus(registry, script))
+    summary = {"script": script, "started_at": registry.started_at, "finished_at": now, "metrics": summarize(registry)}
+    _atomic_write_text(json_path, json.dumps(summary, ensure_ascii=False, indent=2))
+    return prom_path, json_path
+
+# export_on_exit 登记的脚本名；为 None 时不导出
+_export_script = None
+
+# 入口脚本在退出时导出指标（配置 metrics_enabled 为 false 时不导出）
+def export_on_exit(script=None):
+    global _export_script
+    if _export_script or not load_setting("metrics_enabled", True):
+        return
+    _export_script = script or os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+
+    def export():
+        prom_path = flush_metrics()
+        if prom_path:
+            print(f"📈 运行指标已导出：{prom_path}")
+
+    atexit.register(export)
+
+# 立即导出一次（常驻进程每轮结束时调用，指标为进程启动以来的累计值）；没有登记时什么也不做
+def flush_metrics():
+    if not _export_script:
+        return None
+    try:
+        return export_metrics(_export_script)[0]
+    except OSError as e:
+        print(f"⚠️ 运行指标导出失败：{e}")
+        return None
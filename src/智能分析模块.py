@@ -0,0 +1,135 @@
+# 智能分析模块 ✅ 冷热评分 / 凯利异常 / 冷门信号 / 庄家策略 / 投注倾向，整表按列计算，与页面渲染无关
+
+import numpy as np
+import pandas as pd
+
+ANALYSIS_FIELDS = ["冷热评分", "凯利异常", "冷门信号", "庄家策略", "投注倾向"]
+
+# 分析用到的字段：优先取临盘，临盘为空时取中盘
+LIVE_FIELDS = {
+    "sp_win": "主胜赔率",
+    "sp_draw": "平局赔率",
+    "sp_lose": "客胜赔率",
+    "k_win": "主凯利",
+    "k_draw": "平凯利",
+    "k_lose": "客凯利",
+    "handicap": "盘口",
+}
+
+# 单行计算（保留原有逻辑，便于核对按列计算的结果）
+def compute_analysis_fields(row):
+    try:
+        sp_win = float(row.get("临盘主胜赔率", "0") or row.get("中盘主胜赔率", "0") or "0")
+        sp_draw = float(row.get("临盘平局赔率", "0") or row.get("中盘平局赔率", "0") or "0")
+        sp_lose = float(row.get("临盘客胜赔率", "0") or row.get("中盘客胜赔率", "0") or "0")
+        k_win = float(row.get("临盘主凯利", "0") or row.get("中盘主凯利", "0") or "0")
+        k_draw = float(row.get("临盘平凯利", "0") or row.get("中盘平凯利", "0") or "0")
+        k_lose = float(row.get("临盘客凯利", "0") or row.get("中盘客凯利", "0") or "0")
+        handicap = float(row.get("临盘盘口", "0") or row.get("中盘盘口", "0") or "0")
+
+        # 冷热评分（赔率总和 * 5）
+        cold_score = round((sp_win + sp_draw + sp_lose) * 5, 2)
+
+        # 凯利异常（差值超过0.1）
+        k_list = [k_win, k_draw, k_lose]
+        k_max = max(k_list)
+        k_min = min(k_list)
+        kelly_warning = "⚠️ 是" if (k_max - k_min) >= 0.1 else "正常"
+
+        # 冷门信号判断
+        cold_flag = False
+        if (sp_win > 3 and k_win > 0.95) or (sp_lose > 3 and k_lose > 0.95):
+            cold_flag = True
+        cold_signal = "🔴 有" if cold_flag else "无"
+
+        # 庄家策略判断
+        if abs(handicap) >= 1.5:
+            strategy = "深盘造热"
+        elif abs(handicap) <= 0.25:
+            strategy = "低盘防冷"
+        else:
+            strategy = "中庸博弈"
+
+        # 投注倾向建议
+        if cold_flag:
+            tip = "防平局" if sp_draw < 3.5 else "防冷门"
+        else:
+            tip = "支持主胜" if sp_win < sp_lose else "倾向客胜"
+
+        return cold_score, kelly_warning, cold_signal, strategy, tip
+
+    except:
+        return "-", "-", "-", "-", "-"
+
+# 取某列的原始值，列不存在时视为 "0"（与 row.get(列名, "0") 一致）
+def _column_values(df, name):
+    if name not in df.columns:
+        return ["0"] * len(df)
+    return df[name].tolist()
+
+# 与逐行版本的 float(row.get(临盘, "0") or row.get(中盘, "0") or "0") 相同：临盘为空取中盘，都为空按 0；
+# 无法转成数字时返回 None（逐行版本此时整行为 "-"）
+def _live_value(late, middle):
+    try:
+        return float(late or middle or "0")
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+# 临盘 → 中盘 合并为数值列，无法转成数字的为 NaN；另返回每行七个输入是否都能转成数字
+def coalesce_live_columns(df):
+    values = {}
+    valid = np.ones(len(df), dtype=bool)
+    for key, suffix in LIVE_FIELDS.items():
+        late = _column_values(df, "临盘" + suffix)
+        middle = _column_values(df, "中盘" + suffix)
+        column = [_live_value(a, b) for a, b in zip(late, middle)]
+        valid &= np.array([x is not None for x in column], dtype=bool)
+        values[key] = [np.nan if x is None else x for x in column]
+    return pd.DataFrame(values, index=df.index, dtype=float), pd.Series(valid, index=df.index)
+
+# 数值信号：冷热评分、凯利差值、是否冷门、盘口深度、是否有效（七个输入都能转成数字）、是否都是有限值
+def compute_analysis_signals(df):
+    v, valid = coalesce_live_columns(df)
+    kelly = v[["k_win", "k_draw", "k_lose"]].to_numpy()
+    # 冷热评分用 Python 的 round，与逐行版本一致（Series.round 在 .xx5 附近的舍入结果不同）
+    cold_score = [round(x, 2) for x in ((v["sp_win"] + v["sp_draw"] + v["sp_lose"]) * 5).tolist()]
+    return pd.DataFrame({
+        "cold_score": pd.Series(cold_score, index=df.index, dtype=object),
+        "kelly_spread": kelly.max(axis=1) - kelly.min(axis=1),
+        "cold_flag": ((v["sp_win"] > 3) & (v["k_win"] > 0.95)) | ((v["sp_lose"] > 3) & (v["k_lose"] > 0.95)),
+        "handicap_depth": v["handicap"].abs(),
+        "sp_draw": v["sp_draw"],
+        "home_favoured": v["sp_win"] < v["sp_lose"],
+        "valid": valid,
+        "finite": valid & np.isfinite(v.to_numpy()).all(axis=1),
+    }, index=df.index)
+
+# 整表计算五个分析字段，返回与 df 同索引的 DataFrame，结果与逐行的 compute_analysis_fields 完全一致：
+# 数据无效的行全部为 "-"；含 nan/inf 的行（很少见）逐行计算，保持逐行版本的比较与 max/min 行为
+def compute_analysis_frame(df):
+    s = compute_analysis_signals(df)
+
+    kelly_warning = np.where(s["kelly_spread"] >= 0.1, "⚠️ 是", "正常")
+    cold_signal = np.where(s["cold_flag"], "🔴 有", "无")
+    strategy = np.select(
+        [s["handicap_depth"] >= 1.5, s["handicap_depth"] <= 0.25],
+        ["深盘造热", "低盘防冷"],
+        default="中庸博弈",
+    )
+    tip = np.where(
+        s["cold_flag"],
+        np.where(s["sp_draw"] < 3.5, "防平局", "防冷门"),
+        np.where(s["home_favoured"], "支持主胜", "倾向客胜"),
+    )
+
+    result = pd.DataFrame({
+        "冷热评分": s["cold_score"],
+        "凯利异常": kelly_warning,
+        "冷门信号": cold_signal,
+        "庄家策略": strategy,
+        "投注倾向": tip,
+    }, index=df.index).astype(object)
+    result.loc[~s["valid"], ANALYSIS_FIELDS] = "-"
+    for k in np.flatnonzero((s["valid"] & ~s["finite"]).to_numpy()):
+        result.iloc[k] = list(compute_analysis_fields(df.iloc[k]))
+    return result
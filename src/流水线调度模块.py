@@ -0,0 +1,82 @@
+# 流水线调度模块 ✅ 把各阶段按依赖关系组成有向无环图，依赖都完成的阶段并发执行
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from 指标模块 import observe
+from 追踪模块 import span, in_context
+
+# 一个阶段：名称、执行函数（无参数）、依赖的阶段名称
+Stage = namedtuple("Stage", ["name", "func", "deps"])
+
+# 检查依赖是否存在、是否有环，返回按依赖排好的阶段名称
+def check_stages(stages):
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"阶段 {stage.name} 依赖的 {dep} 不存在")
+
+    order = []
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"阶段存在循环依赖：{' → '.join(path + [name])}")
+        state[name] = "visiting"
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return order
+
+# 执行全部阶段：最多 jobs 个阶段同时运行；某阶段失败时，依赖它的阶段跳过
+# 返回 {阶段名称: (状态, 耗时秒数, 异常)}，状态为 成功/失败/跳过
+def run_stages(stages, jobs=4):
+    check_stages(stages)
+    by_name = {stage.name: stage for stage in stages}
+    waiting = {stage.name: set(stage.deps) for stage in stages}
+    results = {}
+    running = {}
+
+    def run(stage):
+        start = time.perf_counter()
+        print(f"▶️ 开始：{stage.name}")
+        with span("stage", stage=stage.name):
+            stage.func()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while waiting or running:
+            # 依赖失败/跳过的阶段直接跳过，依赖全部成功的阶段提交执行
+            for name in list(waiting):
+                deps = waiting[name]
+                if any(results.get(dep, ("",))[0] in ("失败", "跳过") for dep in deps):
+                    results[name] = ("跳过", 0.0, None)
+                    del waiting[name]
+                    print(f"⏭️ 跳过：{name}（依赖的阶段未成功）")
+                elif all(results.get(dep, ("",))[0] == "成功" for dep in deps):
+                    running[executor.submit(in_context(run), by_name[name])] = name
+                    del waiting[name]
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    seconds = future.result()
+                    results[name] = ("成功", seconds, None)
+                    observe("stage_seconds", seconds, stage=name)
+                    print(f"✅ 完成：{name}（{seconds:.1f}s）")
+                except Exception as e:
+                    results[name] = ("失败", 0.0, e)
+                    print(f"❌ 失败：{name}：{e!r}")
+
+    return results
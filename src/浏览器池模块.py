@@ -0,0 +1,125 @@
+# 浏览器池模块 ✅ 固定数量的常驻无头 Chrome，多场比赛并发复用，加载页面数达到上限后自动重建
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+from 读取配置文件模块 import load_setting
+from 指标模块 import timed
+from 追踪模块 import in_context
+
+# chromedriver 只安装/查找一次
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    return ChromeDriverManager().install()
+
+# 启动浏览器
+def get_driver():
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    with timed("driver_start_seconds"):
+        return webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+
+class DriverPool:
+    """
+    浏览器池：最多 size 个浏览器，每个浏览器累计加载 max_pages 个页面后退出并按需重建。
+    """
+
+    def __init__(self, size=None, max_pages=None, factory=get_driver):
+        self.size = size or load_setting("driver_pool_size", 3)
+        self.max_pages = max_pages or load_setting("driver_max_pages", 50)
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._pages = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # 借出一个浏览器：先占一个名额，再复用空闲的浏览器，没有就新建
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            driver = self._factory()
+        except Exception:
+            self._slots.release()
+            raise
+        self._pages[id(driver)] = 0
+        return driver
+
+    # 归还浏览器：出错或达到页面上限时退出，下次借用时重建
+    def _release(self, driver, pages, broken):
+        count = self._pages.get(id(driver), 0) + pages
+        if broken or self._closed or not self._is_alive(driver) or count >= self.max_pages:
+            self._discard(driver)
+        else:
+            self._pages[id(driver)] = count
+            self._idle.put(driver)
+        self._slots.release()
+
+    # 浏览器是否还能响应（崩溃的会话在归还时直接丢弃）
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # 借用一个浏览器，pages 为本次借用将加载的页面数
+    @contextmanager
+    def driver(self, pages=1):
+        driver = self._acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self._release(driver, pages, broken)
+
+    # 并发处理多个任务：func(driver, item)，结果按 items 的顺序返回；pages 可为函数 pages(item)
+    def map(self, func, items, pages=1):
+        def run(item):
+            with self.driver(pages(item) if callable(pages) else pages) as driver:
+                return func(driver, item)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(in_context(run), items))
+
+    # 退出所有空闲浏览器
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
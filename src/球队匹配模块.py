@@ -0,0 +1,197 @@
+# 球队匹配模块 ✅ 把体彩的对阵匹配到 007 赛程：精确匹配 → 映射表别名 → 字符 n-gram 模糊匹配，整期一次完成
+
+import os
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+import pandas as pd
+
+from 读取配置文件模块 import load_setting
+
+# 模糊匹配：两队平均得分达到阈值（或一方精确命中）才采用；其余不低于 NEAR_MISS_SCORE 的记为待确认
+DEFAULT_THRESHOLD = 0.75
+NEAR_MISS_SCORE = 0.3
+
+# 开赛时间相差不超过该分钟数的赛程才作为候选（两边都有时间时）
+DEFAULT_KICKOFF_TOLERANCE = 90
+
+# 匹配状态
+STATUS_EXACT = "成功"
+STATUS_FUZZY = "模糊匹配"
+STATUS_NONE = "未匹配"
+
+# 清洗队名
+def clean_team_name(name):
+    name = re.sub(r'\[.*?\]', '', str(name))
+    name = re.sub(r'\s+', '', name)
+    return name.strip()
+
+# 加载队名映射表：一个体彩队名可对应多个 007 队名，返回 {体彩队名: {007 队名, ...}}
+def load_team_aliases(csv_path="球队名称映射表.csv"):
+    aliases = defaultdict(set)
+    if os.path.exists(csv_path):
+        df_map = pd.read_csv(csv_path, dtype=str).dropna()
+        for k, v in zip(df_map['excel_team'], df_map['titan007_team']):
+            aliases[clean_team_name(k)].add(clean_team_name(v))
+    return dict(aliases)
+
+# 队名的字符 n-gram（单字 + 相邻两字），中文队名很短，单字能补上译名用字不同的情况
+def name_grams(name):
+    name = name.lower()
+    return set(name) | {name[i:i + 2] for i in range(len(name) - 1)}
+
+def gram_score(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+class TeamMatcher:
+    """
+    007 赛程的匹配索引：对阵表（精确/别名连接）+ 开赛时间有序表 + 队名 n-gram 倒排表，建一次后整期共用。
+    """
+
+    def __init__(self, df_html, aliases=None, tolerance=None):
+        self.aliases = aliases or {}
+        minutes = tolerance if tolerance is not None else load_setting("kickoff_tolerance_minutes", DEFAULT_KICKOFF_TOLERANCE)
+        self.tolerance = pd.Timedelta(minutes=minutes)
+        fixtures = df_html.copy()
+        for column in ("联赛", "开赛时间"):
+            if column not in fixtures.columns:
+                fixtures[column] = pd.NaT if column == "开赛时间" else ""
+        fixtures["开赛时间"] = pd.to_datetime(fixtures["开赛时间"], errors="coerce")
+        # 同一对阵同一开赛时间出现多次时取第一条（与原来 iloc[0] 一致）
+        self.fixtures = fixtures.drop_duplicates(["主队", "客队", "开赛时间"]).reset_index(drop=True)
+        self.grams = {}
+        self.gram_index = defaultdict(set)
+        for name in set(self.fixtures["主队"]) | set(self.fixtures["客队"]):
+            self.grams[name] = name_grams(name)
+            for gram in self.grams[name]:
+                self.gram_index[gram].add(name)
+        self.rows = list(zip(self.fixtures["比赛ID"], self.fixtures["主队"], self.fixtures["客队"], self.fixtures["联赛"]))
+        self.home_fixtures = defaultdict(list)
+        self.away_fixtures = defaultdict(list)
+        for pos, (_, home, away, _) in enumerate(self.rows):
+            self.home_fixtures[home].append(pos)
+            self.away_fixtures[away].append(pos)
+        timed = self.fixtures["开赛时间"].dropna().sort_values()
+        self.kickoff_times = list(timed)
+        self.kickoff_positions = list(timed.index)
+
+    # 开赛时间窗口内的赛程位置；没有时间信息时返回 None（不缩小候选）
+    def near(self, kickoff):
+        if pd.isna(kickoff) or not self.kickoff_times:
+            return None
+        lo = bisect_left(self.kickoff_times, kickoff - self.tolerance)
+        hi = bisect_right(self.kickoff_times, kickoff + self.tolerance)
+        return set(self.kickoff_positions[lo:hi])
+
+    # 体彩队名的全部候选写法：原名在前，映射表别名在后
+    def names(self, team):
+        return [team] + sorted(self.aliases.get(team, set()) - {team})
+
+    # 精确 + 别名：整期展开成候选对阵表，与赛程做一次连接；每行优先取开赛时间在窗口内、优先级最高的
+    def join(self, df_teams):
+        rows = []
+        kickoffs = _column(df_teams, "比赛时间", pd.NaT)
+        for i, home, away, kickoff in zip(df_teams.index, df_teams["主队"], df_teams["客队"], kickoffs):
+            for hp, h in enumerate(self.names(home)):
+                for ap, a in enumerate(self.names(away)):
+                    rows.append((i, h, a, hp + ap, kickoff))
+        candidates = pd.DataFrame(rows, columns=["行号", "主队", "客队", "优先级", "比赛时间"])
+        candidates["比赛时间"] = pd.to_datetime(candidates["比赛时间"], errors="coerce")
+        joined = candidates.merge(self.fixtures, on=["主队", "客队"], how="inner")
+        joined["窗口外"] = (joined["开赛时间"] - joined["比赛时间"]).abs() > self.tolerance
+        best = joined.sort_values(["行号", "窗口外", "优先级"], kind="stable").drop_duplicates("行号")
+        return {
+            i: (match_id, home, away)
+            for i, match_id, home, away in zip(best["行号"], best["比赛ID"], best["主队"], best["客队"])
+        }
+
+    # 某个体彩队名与赛程中各队名的相似度（取原名与别名中的最高分）
+    def similar(self, team):
+        scores = {}
+        for name in self.names(team):
+            if name in self.grams:
+                scores[name] = 1.0
+                continue
+            grams = name_grams(name)
+            for candidate in set().union(*(self.gram_index.get(g, ()) for g in grams)):
+                score = gram_score(grams, self.grams[candidate])
+                if score > scores.get(candidate, 0.0):
+                    scores[candidate] = score
+        return scores
+
+    # 模糊匹配一场：候选先按开赛时间缩小（窗口内没有候选时不缩小），得分相同时同联赛的优先
+    # 返回按得分排序的 [(得分, 比赛ID, 007主队, 007客队, 主队得分, 客队得分, 是否同联赛)]
+    def fuzzy(self, home, away, exclude=(), kickoff=None, league=None):
+        home_scores = self.similar(home)
+        away_scores = self.similar(away)
+        positions = set()
+        for name in home_scores:
+            positions.update(self.home_fixtures[name])
+        for name in away_scores:
+            positions.update(self.away_fixtures[name])
+
+        window = self.near(kickoff)
+        if window is not None and positions & window:
+            positions &= window
+
+        ranked = []
+        for pos in positions:
+            match_id, page_home, page_away, page_league = self.rows[pos]
+            if match_id in exclude:
+                continue
+            hs = home_scores.get(page_home, 0.0)
+            as_ = away_scores.get(page_away, 0.0)
+            same_league = bool(league) and league == page_league
+            ranked.append(((hs + as_) / 2, match_id, page_home, page_away, hs, as_, same_league))
+        ranked.sort(key=lambda item: (item[0], item[6]), reverse=True)
+        return ranked
+
+def _column(df, name, default):
+    return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
+# 整期匹配：df_teams 含 主队/客队（已清洗），可选 比赛时间/联赛；返回 (结果 DataFrame, 待确认列表)
+# 结果列：比赛ID、匹配状态、007主队、007客队、得分；待确认列表可直接补进映射表
+def match_issue(df_teams, df_html, aliases=None, threshold=None, tolerance=None):
+    threshold = threshold if threshold is not None else load_setting("team_match_threshold", DEFAULT_THRESHOLD)
+    matcher = TeamMatcher(df_html, aliases, tolerance)
+    kickoffs = pd.to_datetime(_column(df_teams, "比赛时间", pd.NaT), errors="coerce")
+    leagues = _column(df_teams, "联赛", "")
+
+    result = pd.DataFrame(index=df_teams.index, columns=["比赛ID", "匹配状态", "007主队", "007客队", "得分"], dtype=object)
+    result["比赛ID"] = ""
+    result["匹配状态"] = STATUS_NONE
+    result["得分"] = 0.0
+
+    joined = matcher.join(df_teams)
+    for i, (match_id, home, away) in joined.items():
+        result.loc[i, ["比赛ID", "匹配状态", "007主队", "007客队", "得分"]] = [match_id, STATUS_EXACT, home, away, 1.0]
+
+    used = set(result["比赛ID"]) - {""}
+    near_misses = []
+    for i in df_teams.index.difference(list(joined)):
+        home, away = df_teams.at[i, "主队"], df_teams.at[i, "客队"]
+        ranked = matcher.fuzzy(home, away, exclude=used, kickoff=kickoffs[i], league=leagues[i])
+        if not ranked:
+            continue
+        score, match_id, page_home, page_away, hs, as_, same_league = ranked[0]
+        # 一方精确命中时（同一天一支球队只踢一场），另一方只要达到待确认分数即可采用
+        anchored = max(hs, as_) == 1.0 and min(hs, as_) >= NEAR_MISS_SCORE
+        unique = len(ranked) == 1 or (ranked[1][0], ranked[1][6]) < (score, same_league)
+        if (score >= threshold or anchored) and unique:
+            result.loc[i, ["比赛ID", "匹配状态", "007主队", "007客队", "得分"]] = [match_id, STATUS_FUZZY, page_home, page_away, round(score, 3)]
+            used.add(match_id)
+        elif score < NEAR_MISS_SCORE:
+            continue
+        # 模糊采用的与接近阈值的都列出来，确认后补进映射表，下次即可精确匹配
+        for team, page_team, side_score in ((home, page_home, hs), (away, page_away, as_)):
+            if side_score < 1.0:
+                near_misses.append({
+                    "excel_team": team, "titan007_team": page_team,
+                    "得分": round(side_score, 3), "对阵得分": round(score, 3),
+                    "已采用": result.at[i, "匹配状态"] == STATUS_FUZZY,
+                })
+
+    return result, near_misses
@@ -0,0 +1,505 @@
+# 盘口赔率采集模块 ✅ 每场比赛的亚盘页面与欧赔列表页面只加载一次，一次性填好所需时间点的全部字段
+
+import asyncio
+import threading
+import time
+from contextlib import nullcontext
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from 读取配置文件模块 import load_setting, site_url
+from 浏览器池模块 import DriverPool
+from 异步抓取模块 import AsyncFetcher, http_engine_available
+from 响应缓存模块 import CacheMiss, cached_text, get_cached, store, is_replay
+from 限速模块 import throttle, report_response, limited_get
+from 指标模块 import inc, record_fetch
+from 追踪模块 import span, traced
+from 重试熔断模块 import FetchGuard, classify_error, NO_DATA, CACHE_MISS, NEEDS_BROWSER
+from 页面解析模块 import (
+    SNAPSHOTS, ODDS_SUFFIXES, odds_fields, parse_asian_odds_html, parse_1x2_html, parse_initial_1x2_history
+)
+from 表格读写模块 import load_issue_table, save_issue_table, extract_match_id
+from 赛事数据存储模块 import load_journal, save_issue_cells, JOURNAL_OK, JOURNAL_FAILED
+
+# 采集内容：盘口（亚盘页面）与赔率（欧赔列表页面）
+KINDS = ["盘口", "赔率"]
+
+# 抓取方式：auto 先直接请求页面，需要 JS 渲染的再交给浏览器；http 只直接请求；selenium 只用浏览器
+ENGINES = ["auto", "http", "selenium"]
+
+# 某类内容对应的字段后缀：盘口 → ["盘口"]，赔率 → ["主胜赔率", ...]
+def kind_suffixes(kind):
+    return ["盘口"] if kind == "盘口" else ODDS_SUFFIXES
+
+def asian_odds_url(match_id):
+    return f"https://vip.titan007.com/AsianOdds_n.aspx?id={match_id}"
+
+def odds_list_url(match_id):
+    return f"https://1x2.titan007.com/oddslist/{match_id}.htm"
+
+# 加载亚盘页面
+@traced
+def fetch_asian_odds_html(driver, match_id):
+    url = asian_odds_url(match_id)
+    throttle(url)
+    start = time.perf_counter()
+    try:
+        driver.get(site_url(url))
+        WebDriverWait(driver, 8).until(
+            EC.presence_of_element_located((By.ID, "odds"))
+        )
+    except TimeoutException:
+        record_fetch(url, "selenium", "timeout", time.perf_counter() - start)
+        report_response(url, None)
+        raise
+    record_fetch(url, "selenium", 200, time.perf_counter() - start)
+    report_response(url, 200)
+    return driver.page_source
+
+# 加载欧赔列表页面
+@traced
+def fetch_1x2_list_html(driver, match_id):
+    url = odds_list_url(match_id)
+    throttle(url)
+    start = time.perf_counter()
+    driver.set_page_load_timeout(20)
+    try:
+        driver.get(site_url(url))
+        WebDriverWait(driver, 20).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        WebDriverWait(driver, 20).until(
+            lambda d: len(d.find_elements(By.XPATH, '//table[@id="oddsList_tab"]/tbody/tr')) >= 5
+        )
+    except TimeoutException:
+        record_fetch(url, "selenium", "timeout", time.perf_counter() - start)
+        report_response(url, None)
+        raise
+    record_fetch(url, "selenium", 200, time.perf_counter() - start)
+    report_response(url, 200)
+    return driver.page_source
+
+# 有 guard 时经它重试/熔断后再请求
+def guarded(guard, url, fetch):
+    if guard is None:
+        return fetch
+    return lambda: guard.call(url, fetch)
+
+# 读缓存或请求一个页面；失败时打印并记录失败原因，返回 None
+def cached_page(url, fetch, guard=None, label="请求失败"):
+    try:
+        return cached_text(url, guarded(guard, url, fetch))
+    except Exception as e:
+        print(f"❌ {label}：{url}（{e}）")
+        if guard is not None:
+            guard.record(url, classify_error(e))
+        return None
+
+# ✅ 从初盘页面抓取初盘赔率 & 凯利值
+@traced
+def get_initial_1x2_from_history(url, guard=None):
+    def fetch():
+        response = limited_get(url)
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        return response.text
+
+    html = cached_page(url, fetch, guard, "请求初盘页面失败")
+    return parse_initial_1x2_history(html) if html else None
+
+# 页面是否需要浏览器渲染：静态 HTML 中没有可用的表格数据
+def handicap_needs_browser(parsed):
+    return not parsed or all(value is None for value in parsed.values())
+
+def odds_need_browser(parsed):
+    return not parsed or (parsed["即时"] is None and not parsed["history_urls"])
+
+# 由解析结果生成盘口字段：初盘取初盘列，中/临/封盘取即时列
+def handicap_result(parsed, snapshots):
+    result = {f"{snap}盘口": "-" for snap in snapshots}
+    if not parsed:
+        return result
+
+    for snap in snapshots:
+        value = parsed["初盘"] if snap == "初盘" else parsed["即时"]
+        if value is not None:
+            result[f"{snap}盘口"] = value
+    return result
+
+# 由解析结果生成赔率字段：初盘依次尝试目标公司的历史页面，其余时间点取即时赔率
+def odds_result(parsed, snapshots, get_history=get_initial_1x2_from_history):
+    result = {field: "-" for snap in snapshots for field in odds_fields(snap)}
+    if not parsed:
+        return result
+
+    for snap in snapshots:
+        if snap == "初盘":
+            for company, history_url in parsed["history_urls"]:
+                print(f"   🎯 公司：{company} → 抓取初盘：{history_url}")
+                values = get_history(history_url)
+                if values:
+                    result.update(zip(odds_fields(snap), values))
+                    break
+                print("   ❌ 页面无初盘数据")
+        elif parsed["即时"]:
+            result.update(zip(odds_fields(snap), parsed["即时"]))
+    return result
+
+# 抓取一场比赛的盘口：一次页面加载同时得到初盘与即时盘
+def harvest_handicap(driver, match_id, snapshots, guard=None):
+    html = cached_page(
+        asian_odds_url(match_id), lambda: fetch_asian_odds_html(driver, match_id), guard, f"报错 比赛ID {match_id}"
+    )
+    return handicap_result(parse_asian_odds_html(html) if html else None, snapshots)
+
+# 抓取一场比赛的赔率：一次页面加载同时得到即时赔率与初盘历史链接
+def harvest_odds(driver, match_id, snapshots, guard=None):
+    html = cached_page(
+        odds_list_url(match_id), lambda: fetch_1x2_list_html(driver, match_id), guard, f"报错 比赛ID {match_id}"
+    )
+
+    def get_history(url):
+        if guard is not None:
+            guard.link_history(match_id, url)
+        return get_initial_1x2_from_history(url, guard)
+
+    return odds_result(parse_1x2_html(html) if html else None, snapshots, get_history)
+
+# 抓取一场比赛所需的全部字段（浏览器方式）；plan 为 {内容: [时间点]}
+def harvest_match(driver, match_id, plan, guard=None):
+    result = {}
+    if "盘口" in plan:
+        result.update(harvest_handicap(driver, match_id, plan["盘口"], guard))
+    if "赔率" in plan:
+        result.update(harvest_odds(driver, match_id, plan["赔率"], guard))
+    return result
+
+# 先读缓存，缺失的再并发请求；回放模式下缺失记为 CacheMiss。返回 ({url: 文本或异常}, 新请求到的 url 集合)
+# 有 guard 时每个请求经它重试/熔断，失败的为 FetchError；match_of 为 {url: 比赛ID}，用于追踪记录
+# ttl_of 为 {url: 缓存有效期}，不在其中的按来源的默认有效期
+async def fetch_pages_cached(fetcher, urls, encoding=None, guard=None, match_of=None, ttl_of=None):
+    pages = {}
+    missing = []
+    for url in dict.fromkeys(urls):
+        text = get_cached(url, (ttl_of or {}).get(url, "auto"))
+        if text is not None:
+            pages[url] = text
+        elif fetcher is None:
+            pages[url] = CacheMiss(url)
+            if guard is not None:
+                guard.record(url, CACHE_MISS)
+        else:
+            missing.append(url)
+
+    async def fetch(url):
+        with span("fetch_page", match_id=(match_of or {}).get(url), url=url):
+            if guard is None:
+                return await fetcher.fetch_text(url, encoding)
+            return await guard.async_call(url, lambda: fetcher.fetch_text(url, encoding))
+
+    if missing:
+        texts = await asyncio.gather(*(fetch(url) for url in missing), return_exceptions=True)
+        pages.update(zip(missing, texts))
+    return pages, set(missing)
+
+# 不启动浏览器并发抓取全部比赛：tasks 为 [(行号, 比赛ID, {内容: [时间点]})]
+# 返回 ({行号: 字段}, [(行号, 比赛ID, 需要浏览器的 {内容: [时间点]})])
+async def harvest_matches_http(tasks, guard=None):
+    async with (nullcontext() if is_replay() else AsyncFetcher()) as fetcher:
+        match_of = {}
+        for _, match_id, plan in tasks:
+            if "盘口" in plan:
+                match_of[asian_odds_url(match_id)] = match_id
+            if "赔率" in plan:
+                match_of[odds_list_url(match_id)] = match_id
+        pages, fetched = await fetch_pages_cached(fetcher, list(match_of), guard=guard, match_of=match_of)
+
+        # 解析页面；新请求到且可用的页面才写入缓存（需要渲染的静态页不缓存）
+        def parse(url, parser, needs_browser):
+            html = pages.get(url)
+            if isinstance(html, Exception):
+                print(f"❌ 请求失败：{url}（{html!r}）")
+                return None
+            parsed = parser(html)
+            if url in fetched and not needs_browser(parsed):
+                store(url, html)
+            return parsed
+
+        results = {}
+        need_browser = []
+        parsed_odds = {}
+        for i, match_id, plan in tasks:
+            results[i] = {}
+            need = {}
+            with span("parse_match", match_id=match_id):
+                if "盘口" in plan:
+                    parsed = parse(asian_odds_url(match_id), parse_asian_odds_html, handicap_needs_browser)
+                    if handicap_needs_browser(parsed):
+                        need["盘口"] = plan["盘口"]
+                    else:
+                        results[i].update(handicap_result(parsed, plan["盘口"]))
+                if "赔率" in plan:
+                    parsed = parse(odds_list_url(match_id), parse_1x2_html, odds_need_browser)
+                    if odds_need_browser(parsed):
+                        need["赔率"] = plan["赔率"]
+                    else:
+                        parsed_odds[i] = (match_id, parsed, plan["赔率"])
+            if need:
+                need_browser.append((i, match_id, need))
+
+        # 初盘赔率的历史页面按公司优先级分轮并发请求：每轮每场只请求下一家公司，
+        # 取到初盘的比赛不再请求后面的公司
+        initial = {}
+        remaining = {
+            match_id: [url for _, url in parsed["history_urls"]]
+            for match_id, parsed, snaps in parsed_odds.values() if "初盘" in snaps and parsed["history_urls"]
+        }
+        while remaining:
+            history_match = {urls.pop(0): match_id for match_id, urls in remaining.items()}
+            for url, match_id in history_match.items():
+                if guard is not None:
+                    guard.link_history(match_id, url)
+            history, fetched = await fetch_pages_cached(
+                fetcher, list(history_match), encoding="utf-8", guard=guard, match_of=history_match
+            )
+            for url, match_id in history_match.items():
+                html = history[url]
+                if isinstance(html, Exception):
+                    continue
+                if url in fetched:
+                    store(url, html)
+                initial[url] = parse_initial_1x2_history(html)
+                if initial[url]:
+                    remaining.pop(match_id)
+            remaining = {match_id: urls for match_id, urls in remaining.items() if urls}
+
+    def get_history(url):
+        return initial.get(url)
+
+    for i, (match_id, parsed, snaps) in parsed_odds.items():
+        with span("odds_result", match_id=match_id):
+            results[i].update(odds_result(parsed, snaps, get_history))
+
+    return results, need_browser
+
+# 用浏览器池并发抓取：tasks 为 [(行号, 比赛ID, {内容: [时间点]})]，返回 {行号: 字段}
+# on_result(行号, 字段) 在每场抓完后立即调用（多线程下串行执行），用于逐场保存进度；pool 可传入共用的浏览器池
+def harvest_matches_selenium(tasks, on_result=None, pool=None, guard=None):
+    lock = threading.Lock()
+
+    def run(driver, task):
+        i, match_id, plan = task
+        wanted = " ".join(f"{'/'.join(snaps)}{kind}" for kind, snaps in plan.items())
+        print(f"➡️ 浏览器抓取 第{i+1}行 比赛ID：{match_id}（{wanted}）")
+        with span("harvest_match", match_id=match_id):
+            result = harvest_match(driver, match_id, plan, guard)
+        if on_result:
+            with lock:
+                on_result(i, result)
+        return result
+
+    if pool is not None:
+        results = pool.map(run, tasks, pages=lambda task: len(task[2]))
+    else:
+        with DriverPool() as own_pool:
+            results = own_pool.map(run, tasks, pages=lambda task: len(task[2]))
+    return {task[0]: result for task, result in zip(tasks, results)}
+
+# 用浏览器池加载直接请求拿不到数据（需要 JS 渲染）的页面：items 为 [(内容, 比赛ID)]，内容为 盘口/赔率
+# 经响应缓存与 guard 加载，返回 {(内容, 比赛ID): HTML 或 None}；回放模式下不启动浏览器，全部为 None
+def render_pages(items, guard=None, pool=None):
+    if not items or is_replay():
+        return {item: None for item in items}
+
+    def load(driver, item):
+        kind, match_id = item
+        if kind == "盘口":
+            url, fetch = asian_odds_url(match_id), fetch_asian_odds_html
+        else:
+            url, fetch = odds_list_url(match_id), fetch_1x2_list_html
+        print(f"➡️ 浏览器加载{kind}页面 比赛ID：{match_id}")
+        return cached_page(url, lambda: fetch(driver, match_id), guard, f"报错 比赛ID {match_id}")
+
+    if pool is not None:
+        return dict(zip(items, pool.map(load, items)))
+    with DriverPool(size=min(len(items), load_setting("driver_pool_size", 3))) as own_pool:
+        return dict(zip(items, own_pool.map(load, items)))
+
+# 某一行还需要抓取的字段 {列名: (内容, 时间点, 字段)}：已有数值且日志中不是失败的跳过；
+# 没有数值的（空或 "-"）不论日志怎么记都要抓，避免整表重建后因旧日志而漏抓；force 时全部重抓
+def pending_fields(row, match_id, snapshots, kinds, journal, force=False):
+    pending = {}
+    for kind in kinds:
+        for snap in snapshots:
+            for suffix in kind_suffixes(kind):
+                status = journal.get((match_id, snap, suffix))
+                value = row.get(snap + suffix)
+                filled = isinstance(value, str) and value not in ("", "-")
+                if force or status == JOURNAL_FAILED or not filled:
+                    pending[snap + suffix] = (kind, snap, suffix)
+    return pending
+
+# 确认时间点有效，并确定实际使用的抓取方式
+def resolve_engine(snapshots, engine=None):
+    for snap in snapshots:
+        if snap not in SNAPSHOTS:
+            raise ValueError(f"未知的时间点：{snap}（可选：{'/'.join(SNAPSHOTS)}）")
+
+    engine = engine or load_setting("fetch_engine", "auto")
+    if is_replay():
+        # 回放模式只读缓存（浏览器渲染过的页面也已缓存），不启动浏览器
+        return "http"
+    if engine != "selenium" and not http_engine_available():
+        print("⚠️ 未安装 aiohttp，改用浏览器抓取")
+        return "selenium"
+    return engine
+
+# 补字段列（如果没有），返回是否新增了列
+def add_harvest_columns(df, snapshots, kinds=KINDS):
+    added = False
+    for snap in snapshots:
+        for kind in kinds:
+            for suffix in kind_suffixes(kind):
+                if snap + suffix not in df.columns:
+                    df[snap + suffix] = "-"
+                    added = True
+    return added
+
+# 多个采集阶段并发写同一个 DataFrame 时串行化读写
+_frame_lock = threading.Lock()
+
+# 请求成功但需要浏览器渲染的页面（请求本身失败的保留原来的原因）
+def mark_needs_browser(guard, url):
+    if not guard.failure(url):
+        guard.record(url, NEEDS_BROWSER)
+
+# 某个字段抓取失败的原因：取对应页面的请求结果；初盘赔率还要看各家公司的历史页面
+# 页面请求成功（或读自缓存）但没有数据时为“无数据”
+def failure_reason(guard, match_id, kind, snap):
+    if kind == "盘口":
+        urls = [asian_odds_url(match_id)]
+    else:
+        urls = [odds_list_url(match_id)]
+        if snap == "初盘":
+            urls += guard.history_urls.get(match_id, [])
+    for url in urls:
+        reason = guard.failure(url)
+        if reason:
+            return reason
+    return NO_DATA
+
+# 在内存中的整期数据上填好指定时间点的盘口/赔率字段（字段列需已存在），
+# 返回日志记录 [(比赛ID, 时间点, 字段, 状态, 失败原因)]
+# on_checkpoint(单元格, 日志记录) 在每批结果写入 df 后调用；不传时只改内存，由调用方统一保存
+# match_ids 不为空时只抓取其中的比赛；guard 为共用的 FetchGuard（重试、时间预算、熔断），不传时新建一个
+def harvest_frame(df, hyperlink_map, journal, snapshots=("初盘",), kinds=KINDS, engine="auto",
+                  force=False, on_checkpoint=None, pool=None, match_ids=None, guard=None):
+    guard = guard or FetchGuard()
+    tasks = []
+    pending = {}
+    skipped = 0
+    with _frame_lock:
+        for i in range(len(df)):
+            match_id = extract_match_id(hyperlink_map.get(i))
+            if not match_id:
+                print(f"⏭️ 跳过第 {i+1} 行：无有效链接")
+                continue
+            if match_ids is not None and match_id not in match_ids:
+                continue
+            fields = pending_fields(df.iloc[i], match_id, snapshots, kinds, journal, force)
+            if not fields:
+                skipped += 1
+                continue
+            plan = {}
+            for kind, snap, _ in fields.values():
+                if snap not in plan.setdefault(kind, []):
+                    plan[kind].append(snap)
+            pending[i] = (match_id, fields)
+            tasks.append((i, match_id, plan))
+
+    if skipped:
+        print(f"⏭️ {skipped} 场已全部抓取成功，跳过（--force 可强制重抓）")
+    if not tasks:
+        return []
+
+    all_entries = []
+
+    # 只写回待抓取的单元格并记录成功/失败
+    def checkpoint(results):
+        cells = {}
+        entries = []
+        with _frame_lock:
+            for i, result in results.items():
+                match_id, fields = pending[i]
+                cells[i] = {}
+                for column, val in result.items():
+                    if column not in fields:
+                        continue
+                    kind, snap, suffix = fields[column]
+                    df.at[i, column] = val
+                    cells[i][column] = val
+                    if val == "-":
+                        entries.append((match_id, snap, suffix, JOURNAL_FAILED, failure_reason(guard, match_id, kind, snap)))
+                    else:
+                        entries.append((match_id, snap, suffix, JOURNAL_OK, None))
+                print(f"✅ 写入 第{i+1}行：", cells[i])
+                ok = all(val != "-" for val in cells[i].values())
+                inc("matches_total", stage="/".join(kinds), result="ok" if ok else "failed")
+        all_entries.extend(entries)
+        if on_checkpoint:
+            on_checkpoint(cells, entries)
+
+    if engine == "selenium":
+        need_browser = tasks
+    else:
+        results, need_browser = asyncio.run(harvest_matches_http(tasks, guard))
+        print(f"✅ 直接请求完成 {len(tasks) - len(need_browser)}/{len(tasks)} 场")
+        checkpoint({i: result for i, result in results.items() if result})
+
+    if need_browser and engine == "http":
+        # 只允许直接请求时，需要渲染的页面记为失败
+        failed = {}
+        for i, match_id, need in need_browser:
+            print(f"❌ 第{i+1}行 比赛ID：{match_id} 需要浏览器渲染：{'/'.join(need)}")
+            failed[i] = {}
+            if "盘口" in need:
+                mark_needs_browser(guard, asian_odds_url(match_id))
+                failed[i].update(handicap_result(None, need["盘口"]))
+            if "赔率" in need:
+                mark_needs_browser(guard, odds_list_url(match_id))
+                failed[i].update(odds_result(None, need["赔率"]))
+        checkpoint(failed)
+    elif need_browser:
+        harvest_matches_selenium(
+            need_browser, on_result=lambda i, result: checkpoint({i: result}), pool=pool, guard=guard
+        )
+
+    summary = guard.summary()
+    if summary:
+        print("📊 页面请求结果：" + "，".join(f"{kind} {count}" for kind, count in summary.items()))
+    return all_entries
+
+# 主函数：按期号一次性填好指定时间点的盘口/赔率字段；已抓取成功的单元格不再重复抓取
+# 每批结果立即落库（单元格与日志同一事务），中断后重跑从断点继续；返回本次的日志记录
+def harvest_issue(issue="25048", snapshots=("初盘",), kinds=KINDS, engine=None, force=False, match_ids=None, guard=None):
+    engine = resolve_engine(snapshots, engine)
+    df, hyperlink_map = load_issue_table(issue)
+
+    # 新增的列先保存一次，之后逐场写回单元格
+    if add_harvest_columns(df, snapshots, kinds):
+        save_issue_table(df, issue)
+
+    with span("harvest_issue", issue=issue, snapshots="/".join(snapshots), kinds="/".join(kinds), engine=engine):
+        entries = harvest_frame(
+            df, hyperlink_map, load_journal(issue), snapshots, kinds, engine, force,
+            on_checkpoint=lambda cells, entries: save_issue_cells(issue, cells, entries), match_ids=match_ids, guard=guard,
+        )
+    if not entries:
+        print(f"\n✅ 第 {issue} 期没有需要抓取的字段")
+    else:
+        print(f"\n✅ 第 {issue} 期数据已更新")
+    return entries
@@ -0,0 +1,122 @@
+# 表格读写模块 ✅ 各阶段通过 SQLite 数据库读写整期数据，「传统足彩{issue}期盘口数据补充.xlsx」只在最后导出
+
+import os
+import re
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+from openpyxl.utils import get_column_letter
+
+from 赛事数据存储模块 import issue_store_exists, load_issue_frame, save_issue_frame
+from 指标模块 import timed
+from 追踪模块 import traced
+
+# 表头样式：加粗 + 居中
+HEADER_FONT = Font(bold=True)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+# 期号对应的补充表格路径
+def get_issue_excel_path(issue):
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    return os.path.join(parent_path, "足彩分析", issue, f"传统足彩{issue}期盘口数据补充.xlsx")
+
+# 读取已有的 xlsx：“比赛ID”列显示为“查看盘口”，真实链接在超链接里，读出后写回该列
+@traced
+def read_issue_xlsx(excel_path):
+    df = pd.read_excel(excel_path, dtype=str)
+    wb = load_workbook(excel_path)
+    ws = wb.active
+
+    link_col_index = df.columns.get_loc("比赛ID") + 1
+    for i in range(len(df)):
+        cell = ws.cell(row=i + 2, column=link_col_index)
+        if cell.hyperlink:
+            df.at[i, "比赛ID"] = cell.hyperlink.target
+
+    return df
+
+# 整期数据中的比赛链接：{行号: 链接}
+def match_links(df):
+    return {
+        i: link for i, link in enumerate(df["比赛ID"])
+        if isinstance(link, str) and link.startswith("http")
+    }
+
+# 读取整期数据与比赛链接（行号 → 链接）；数据库不存在时从旧的 xlsx 导入一次
+def load_issue_table(issue):
+    if not issue_store_exists(issue):
+        excel_path = get_issue_excel_path(issue)
+        save_issue_frame(issue, read_issue_xlsx(excel_path))
+        print(f"📥 已从表格导入数据库：{excel_path}")
+
+    df = load_issue_frame(issue)
+    return df, match_links(df)
+
+# 保存整期数据（只写数据库）
+def save_issue_table(df, issue):
+    save_issue_frame(issue, df)
+
+# 从链接中提取比赛ID
+def extract_match_id(link):
+    if not link or not link.startswith("http"):
+        return None
+    match = re.search(r"id=(\d+)", link)
+    return match.group(1) if match else None
+
+def _cell_value(value):
+    return None if pd.isna(value) or value == "" else value
+
+# 一次写出带样式的 xlsx（write-only 流式写入，不再先写入再重新加载设置样式）：
+# 列宽为每列最长的文本（含表头）+ padding、不超过 max_width，与取值在同一遍中算出；
+# 表头加粗居中；links 为 {行号: 链接}，这些行的 link_column 设为超链接
+def write_styled_xlsx(path, df, padding, max_width=None, link_column=None, links=None):
+    rows = []
+    widths = [len(str(column)) for column in df.columns]
+    for values in df.itertuples(index=False, name=None):
+        row = [_cell_value(value) for value in values]
+        for k, value in enumerate(row):
+            if value is not None:
+                widths[k] = max(widths[k], len(str(value)))
+        rows.append(row)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    # write-only 模式下列宽必须在写入第一行之前设置
+    for index, width in enumerate(widths, start=1):
+        width += padding
+        ws.column_dimensions[get_column_letter(index)].width = min(width, max_width) if max_width else width
+
+    header = []
+    for column in df.columns:
+        cell = WriteOnlyCell(ws, str(column))
+        cell.font = HEADER_FONT
+        cell.alignment = HEADER_ALIGNMENT
+        header.append(cell)
+    ws.append(header)
+
+    links = links or {}
+    link_index = df.columns.get_loc(link_column) if link_column else None
+    for i, row in enumerate(rows):
+        if i in links:
+            cell = WriteOnlyCell(ws, row[link_index])
+            cell.hyperlink = links[i]
+            cell.style = "Hyperlink"
+            row[link_index] = cell
+        ws.append(row)
+    wb.save(path)
+    return path
+
+# 导出带样式的 xlsx：比赛ID 显示为“查看盘口”的超链接
+# df 不传时从数据库读取（流水线中直接传入内存中的整期数据）
+@traced
+@timed("xlsx_write_seconds", file="补充表格")
+def export_issue_xlsx(issue, excel_path=None, df=None):
+    excel_path = excel_path or get_issue_excel_path(issue)
+    if df is None:
+        df = load_issue_frame(issue)
+    hyperlink_map = match_links(df)
+
+    output = df.copy()
+    output.loc[list(hyperlink_map), "比赛ID"] = "查看盘口"
+    return write_styled_xlsx(excel_path, output, padding=12, max_width=30, link_column="比赛ID", links=hyperlink_map)
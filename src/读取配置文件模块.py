@@ -2,19 +2,58 @@
 
 import json
 import os
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+@lru_cache(maxsize=None)
+def _read_config(path):
+    """
+    读取并解析配置文件，每个进程对同一路径只读一次（site_url 等每次请求都会用到）；文件不存在时返回 None。
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def reload_config():
+    """
+    配置文件在运行中被修改后调用，下次读取时重新解析。
+    """
+    _read_config.cache_clear()
 
 def load_config(config_path="配置.json"):
     """
     从指定路径读取 JSON 配置文件，返回一个包含 issue 和 date 的字典。
     """
-    if not os.path.exists(config_path):
+    cfg = _read_config(os.path.abspath(config_path))
+    if cfg is None:
         raise FileNotFoundError(f"配置文件未找到：{config_path}")
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
-
     # 校验必填字段
     if "issue" not in cfg or "date" not in cfg:
         raise KeyError("配置文件缺少 issue 或 date 字段")
 
     return cfg["issue"], cfg["date"]
+
+def load_setting(key, default=None, config_path="配置.json"):
+    """
+    读取配置文件中的可选字段，配置文件或字段不存在时返回默认值。
+    """
+    cfg = _read_config(os.path.abspath(config_path))
+    if cfg is None:
+        return default
+    return cfg.get(key, default)
+
+def site_url(url, config_path="配置.json"):
+    """
+    按配置 base_urls 把请求地址换到别的站点（本地替身服务器、镜像），例如
+    {"vip.titan007.com": "http://127.0.0.1:8800"}；缓存、限速与日志仍使用原地址。
+    """
+    base_urls = load_setting("base_urls", None, config_path)
+    if not base_urls:
+        return url
+    parts = urlsplit(url)
+    base = base_urls.get(parts.hostname)
+    if not base:
+        return url
+    return base.rstrip("/") + url[len(f"{parts.scheme}://{parts.netloc}"):]
@@ -0,0 +1,264 @@
+# 赔率时序模块 ✅ 保存目标公司完整的欧赔变化记录（时间戳 + 赔率/凯利值数组），任意时刻的赔率都能事后查出
+#
+# 每期一个 赔率时序.npz：所有 (比赛, 公司) 的记录首尾相接存成几列数组，
+# 时间为 int64 秒级时间戳（北京时间按 UTC 计，只用于比较先后），赔率/凯利值为 float32，
+# offsets[k]:offsets[k + 1] 是第 k 条时序在 times / values 中的范围。
+
+import asyncio
+import os
+import re
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from 异步抓取模块 import AsyncFetcher, http_engine_available
+from 响应缓存模块 import store, is_replay
+from 页面解析模块 import TARGET_COMPANIES, ODDS_SUFFIXES, odds_fields, parse_1x2_html, parse_1x2_history
+from 表格读写模块 import load_issue_table, extract_match_id
+from 赛事数据存储模块 import JOURNAL_OK, JOURNAL_FAILED
+from 盘口赔率采集模块 import odds_list_url, fetch_pages_cached, odds_need_browser, render_pages
+from 赛程匹配模块 import parse_kickoffs
+from 定时采集模块 import snapshot_offsets
+from 重试熔断模块 import FetchGuard, NO_DATA
+from 读取配置文件模块 import load_setting
+
+# 变化时间：页面上是 "03-28 20:11"，有时带年份，初盘行可能只有 "(初盘)"
+_CHANGE_TIME = re.compile(r"(?:(\d{4})-)?(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})")
+
+# 未开赛比赛的赔率历史页面缓存有效期（秒），可在配置 series_history_ttl 中修改；
+# 赔率历史默认永不过期（初盘不会再变），但时序要的是完整变化，开赛前必须重新请求才能拿到新的变化
+SERIES_HISTORY_TTL = 60
+
+def series_path(issue):
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    return os.path.join(parent_path, "足彩分析", issue, "赔率时序.npz")
+
+def to_epoch(t):
+    return pd.Timestamp(t).value // 10 ** 9
+
+# 变化时间原文 → 时间戳；页面不写年份，按开赛时间补年份（变化不会晚于开赛，跨年时取上一年）
+def parse_change_time(text, kickoff=None):
+    match = _CHANGE_TIME.search(text)
+    if not match:
+        return None
+    year, month, day, hour, minute = match.groups()
+    reference = pd.Timestamp(kickoff) if kickoff is not None and not pd.isna(kickoff) else pd.Timestamp.now()
+    try:
+        t = pd.Timestamp(int(year or reference.year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+    if year is None and t > reference + pd.Timedelta(days=1):
+        t = t.replace(year=t.year - 1)
+    return to_epoch(t)
+
+class OddsSeries:
+    """
+    一场比赛一家公司的赔率时序：times 为升序时间戳，values 每行依次为 主胜/平/客胜 赔率与 主/平/客 凯利值。
+    """
+
+    def __init__(self, times, values):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32).reshape(len(self.times), len(ODDS_SUFFIXES))
+
+    def __len__(self):
+        return len(self.times)
+
+    # 由 parse_1x2_history 的结果生成：没有时间的行（通常是初盘行）取最早的已知时间
+    @classmethod
+    def from_changes(cls, changes, kickoff=None):
+        rows = []
+        for text, values in changes:
+            rows.append((parse_change_time(text, kickoff), [float(v) for v in values]))
+        known = [t for t, _ in rows if t is not None]
+        earliest = min(known) if known else 0
+        rows = [(earliest if t is None else t, values) for t, values in rows]
+        # 页面新 → 旧排列；稳定排序后同一时间的记录保持“旧的在前”
+        rows.reverse()
+        rows.sort(key=lambda row: row[0])
+        return cls([t for t, _ in rows], [values for _, values in rows])
+
+    # t 时刻生效的赔率（最后一次变化不晚于 t 的记录）；早于第一条记录时返回 None
+    def value_at(self, t):
+        i = np.searchsorted(self.times, to_epoch(t), side="right") - 1
+        return None if i < 0 else self.values[i]
+
+    # 一次查询多个时刻：返回 (时刻数, 6) 数组，早于第一条记录的行为 NaN
+    def values_at(self, ts):
+        idx = np.searchsorted(self.times, np.array([to_epoch(t) for t in ts], dtype=np.int64), side="right") - 1
+        out = self.values[np.clip(idx, 0, None)].copy() if len(self) else np.empty((len(idx), len(ODDS_SUFFIXES)), np.float32)
+        out[idx < 0] = np.nan
+        return out
+
+    def initial(self):
+        return self.values[0] if len(self) else None
+
+class OddsSeriesStore:
+    """
+    一期全部赔率时序：{(比赛ID, 公司): OddsSeries}，按 npz 列数组读写。
+    """
+
+    def __init__(self, series=None):
+        self.series = dict(series or {})
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            offsets = data["offsets"]
+            times, values = data["times"], data["values"]
+            return cls({
+                (str(match_id), str(company)): OddsSeries(times[offsets[k]:offsets[k + 1]], values[offsets[k]:offsets[k + 1]])
+                for k, (match_id, company) in enumerate(zip(data["match_ids"], data["companies"]))
+            })
+
+    def save(self, path):
+        keys = sorted(self.series)
+        lengths = [len(self.series[key]) for key in keys]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            match_ids=np.array([key[0] for key in keys], dtype=str),
+            companies=np.array([key[1] for key in keys], dtype=str),
+            offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            times=np.concatenate([self.series[key].times for key in keys] or [np.empty(0, np.int64)]),
+            values=np.concatenate([self.series[key].values for key in keys] or [np.empty((0, len(ODDS_SUFFIXES)), np.float32)]),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    def companies(self, match_id):
+        return [company for mid, company in self.series if mid == match_id]
+
+    # 取一场比赛的时序；不指定公司时按 TARGET_COMPANIES 的顺序取第一家
+    def get(self, match_id, company=None):
+        if company is not None:
+            return self.series.get((match_id, company))
+        names = self.companies(match_id)
+        for key in TARGET_COMPANIES:
+            for name in names:
+                if key in name:
+                    return self.series[(match_id, name)]
+        return self.series[(match_id, names[0])] if names else None
+
+    def value_at(self, match_id, t, company=None):
+        series = self.get(match_id, company)
+        return None if series is None else series.value_at(t)
+
+# 已开赛的比赛：赔率不会再变，赔率历史页面可以一直用缓存
+def match_closed(kickoff, now=None):
+    return kickoff is not None and not pd.isna(kickoff) and pd.Timestamp(kickoff) <= (now or pd.Timestamp.now())
+
+# 并发请求欧赔列表与目标公司的赔率历史页面，返回 {(比赛ID, 公司): [(变化时间原文, 数值)]}
+# closed 中的比赛已开赛，赔率历史沿用永不过期的缓存；其余比赛的历史页面缓存只用 series_history_ttl 秒
+async def fetch_issue_changes(match_ids, guard=None, closed=()):
+    async with (nullcontext() if is_replay() else AsyncFetcher()) as fetcher:
+        list_urls = {match_id: odds_list_url(match_id) for match_id in match_ids}
+        pages, fetched = await fetch_pages_cached(fetcher, list_urls.values(), guard=guard)
+
+        parsed_lists = {}
+        for match_id, url in list_urls.items():
+            html = pages.get(url)
+            if isinstance(html, Exception):
+                print(f"❌ 请求失败：{url}（{html!r}）")
+                continue
+            parsed_lists[match_id] = parse_1x2_html(html)
+            if url in fetched and not odds_need_browser(parsed_lists[match_id]):
+                store(url, html)
+
+        # 静态页面中没有数据（需要 JS 渲染）的欧赔列表交给浏览器池加载
+        render = [("赔率", match_id) for match_id, parsed in parsed_lists.items() if odds_need_browser(parsed)]
+        if render:
+            for (_, match_id), html in (await asyncio.to_thread(render_pages, render, guard)).items():
+                parsed_lists[match_id] = parse_1x2_html(html) if html else None
+
+        history_urls = {}
+        for match_id, parsed in parsed_lists.items():
+            if not parsed or not parsed["history_urls"]:
+                print(f"❌ {match_id} 页面没有目标公司的赔率历史链接")
+                continue
+            for company, history_url in parsed["history_urls"]:
+                history_urls[(match_id, company)] = history_url
+
+        ttl = load_setting("series_history_ttl", SERIES_HISTORY_TTL)
+        ttl_of = {url: ttl for (match_id, _), url in history_urls.items() if match_id not in closed}
+        history, fetched = await fetch_pages_cached(fetcher, history_urls.values(), encoding="utf-8", guard=guard, ttl_of=ttl_of)
+
+    changes = {}
+    for key, url in history_urls.items():
+        html = history.get(url)
+        if isinstance(html, Exception):
+            print(f"❌ 请求失败：{url}（{html!r}）")
+            continue
+        if url in fetched:
+            store(url, html)
+        changes[key] = parse_1x2_history(html)
+    return changes
+
+# 主函数：抓取一期各场比赛目标公司的完整赔率时序，与已有记录合并后保存；返回 OddsSeriesStore
+def capture_issue_series(issue, match_ids=None):
+    if not is_replay() and not http_engine_available():
+        raise ImportError("赔率时序采集需要 aiohttp：pip install aiohttp")
+
+    df, hyperlink_map = load_issue_table(issue)
+    kickoffs = parse_kickoffs(df["比赛时间"]) if "比赛时间" in df.columns else [None] * len(df)
+    kickoff_by_id = {}
+    for i, kickoff in enumerate(kickoffs):
+        match_id = extract_match_id(hyperlink_map.get(i))
+        if match_id and (match_ids is None or match_id in match_ids):
+            kickoff_by_id[match_id] = kickoff
+
+    closed = {match_id for match_id, kickoff in kickoff_by_id.items() if match_closed(kickoff)}
+    changes = asyncio.run(fetch_issue_changes(list(kickoff_by_id), FetchGuard(), closed))
+
+    path = series_path(issue)
+    series_store = OddsSeriesStore.load(path)
+    captured = {key: rows for key, rows in changes.items() if rows}
+    if not captured:
+        print(f"❌ 第 {issue} 期没有取到任何赔率变化记录，未保存")
+        return series_store
+    missing = sorted(set(kickoff_by_id) - {match_id for match_id, _ in captured})
+    if missing:
+        print(f"⚠️ 以下比赛没有取到赔率变化记录：{', '.join(missing)}")
+    for (match_id, company), rows in captured.items():
+        series_store.series[(match_id, company)] = OddsSeries.from_changes(rows, kickoff_by_id[match_id])
+    series_store.save(path)
+
+    total = sum(len(series) for series in series_store.series.values())
+    print(f"✅ 第 {issue} 期赔率时序已保存：{len(series_store.series)} 条，共 {total} 次变化 → {path}")
+    return series_store
+
+# 时序中的数值 → 单元格文本：按页面上的写法保留两位小数（1.90 不写成 1.9），与直接抓取的单元格一致
+def _cell(value):
+    return "-" if value is None or np.isnan(value) else f"{float(value):.2f}"
+
+# 由时序推出各时间点的赔率字段：初盘取第一条记录，其余取 开赛时间 - 提前量 时刻生效的赔率
+# 返回 ({行号: {字段: 值}}, [(比赛ID, 时间点, 字段后缀, 状态, 失败原因)])，可直接交给 save_issue_cells
+def derive_snapshot_cells(df, hyperlink_map, series_store, snapshots, offsets=None):
+    offsets = offsets or snapshot_offsets()
+    kickoffs = parse_kickoffs(df["比赛时间"]) if "比赛时间" in df.columns else [None] * len(df)
+    cells = {}
+    entries = []
+    for i, kickoff in enumerate(kickoffs):
+        match_id = extract_match_id(hyperlink_map.get(i))
+        series = series_store.get(match_id) if match_id else None
+        if series is None:
+            continue
+        cells[i] = {}
+        for snap in snapshots:
+            if snap == "初盘":
+                values = series.initial()
+            elif kickoff is None or pd.isna(kickoff):
+                values = None
+            else:
+                values = series.value_at(kickoff - offsets[snap])
+            texts = [_cell(v) for v in values] if values is not None else ["-"] * len(ODDS_SUFFIXES)
+            cells[i].update(zip(odds_fields(snap), texts))
+            for suffix, text in zip(ODDS_SUFFIXES, texts):
+                if text == "-":
+                    entries.append((match_id, snap, suffix, JOURNAL_FAILED, NO_DATA))
+                else:
+                    entries.append((match_id, snap, suffix, JOURNAL_OK, None))
+    return cells, entries
@@ -0,0 +1,139 @@
+# 赛事数据存储模块 ✅ 每期一个 SQLite 文件作为流水线的数据源，xlsx 只在最后导出
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+# 场次按整数存储；其余列（包括各时间点的盘口/赔率/凯利值）按 TEXT 原样存储，
+# 数值列若用 REAL，"1.90" 读回来会变成 "1.9"，与页面和 xlsx 中的写法不一致
+INTEGER_COLUMNS = ("场次",)
+
+# 期号对应的数据库路径
+def get_issue_store_path(issue):
+    parent_path = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    return os.path.join(parent_path, "足彩分析", issue, f"传统足彩{issue}期数据.sqlite")
+
+def issue_store_exists(issue):
+    return os.path.exists(get_issue_store_path(issue))
+
+def column_type(name):
+    return "INTEGER" if name in INTEGER_COLUMNS else "TEXT"
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+# 读取整期数据，返回与 pd.read_excel(dtype=str) 一致的文本 DataFrame（空值为 NaN）
+def load_issue_frame(issue):
+    path = get_issue_store_path(issue)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"数据库未找到：{path}")
+
+    with closing(_connect(path)) as conn:
+        cursor = conn.execute("SELECT * FROM matches ORDER BY rowid")
+        columns = [d[0] for d in cursor.description]
+        rows = [
+            tuple(float("nan") if v is None else str(v) for v in row)
+            for row in cursor.fetchall()
+        ]
+
+    return pd.DataFrame(rows, columns=columns, dtype=object)
+
+# 保存整期数据：在一个事务里整表替换，中途崩溃会回滚，不会留下写了一半的数据
+# reset_journal 为真时同时清空采集日志（重新获取赛事/比赛ID 后整表是空白的，旧日志已不对应）
+def save_issue_frame(issue, df, reset_journal=False):
+    path = get_issue_store_path(issue)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    columns = [str(c) for c in df.columns]
+    schema = ", ".join(f"{_quote(c)} {column_type(c)}" for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    rows = [
+        tuple(None if pd.isna(v) else v for v in row)
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+    with closing(_connect(path)) as conn:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS matches")
+            conn.execute(f"CREATE TABLE matches ({schema})")
+            conn.executemany(f"INSERT INTO matches VALUES ({placeholders})", rows)
+            if reset_journal:
+                _ensure_journal(conn)
+                conn.execute("DELETE FROM journal")
+
+# ---------- 采集日志：记录每个 (比赛ID, 时间点, 字段) 是否抓取成功，重跑时只抓缺失/失败的 ----------
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    match_id TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    field TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    reason TEXT,
+    PRIMARY KEY (match_id, snapshot, field)
+)
+"""
+
+JOURNAL_OK = "ok"
+JOURNAL_FAILED = "failed"
+
+# 建表；旧版本的日志没有 reason 列（失败原因）时补上
+def _ensure_journal(conn):
+    conn.execute(JOURNAL_SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(journal)")}
+    if "reason" not in columns:
+        conn.execute("ALTER TABLE journal ADD COLUMN reason TEXT")
+
+# 读取采集日志：{(比赛ID, 时间点, 字段): 状态}
+def load_journal(issue):
+    path = get_issue_store_path(issue)
+    if not os.path.exists(path):
+        return {}
+    with closing(_connect(path)) as conn:
+        _ensure_journal(conn)
+        rows = conn.execute("SELECT match_id, snapshot, field, status FROM journal").fetchall()
+    return {(match_id, snap, field): status for match_id, snap, field, status in rows}
+
+# 写回若干单元格并记录日志（同一事务）：cells 为 {行号: {列名: 值}}，
+# entries 为 [(比赛ID, 时间点, 字段, 状态, 失败原因)]，成功时失败原因为 None
+def save_issue_cells(issue, cells, entries=()):
+    now = datetime.now().isoformat(timespec="seconds")
+    with closing(_connect(get_issue_store_path(issue))) as conn:
+        _ensure_journal(conn)
+        with conn:
+            for i, values in cells.items():
+                if not values:
+                    continue
+                assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+                # matches 表每次保存都整表重建，rowid 与行号一一对应（从 1 开始）
+                conn.execute(f"UPDATE matches SET {assignments} WHERE rowid = ?", (*values.values(), i + 1))
+            conn.executemany(
+                "INSERT INTO journal (match_id, snapshot, field, status, attempts, updated_at, reason) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (match_id, snapshot, field) DO UPDATE SET "
+                "status = excluded.status, attempts = attempts + 1, updated_at = excluded.updated_at, "
+                "reason = excluded.reason",
+                [(match_id, snap, field, status, now, reason) for match_id, snap, field, status, reason in entries],
+            )
+
+# 失败单元格及原因：[(比赛ID, 时间点, 字段, 失败原因, 尝试次数)]
+def load_failures(issue):
+    path = get_issue_store_path(issue)
+    if not os.path.exists(path):
+        return []
+    with closing(_connect(path)) as conn:
+        _ensure_journal(conn)
+        return conn.execute(
+            "SELECT match_id, snapshot, field, reason, attempts FROM journal WHERE status = ? ORDER BY match_id, snapshot",
+            (JOURNAL_FAILED,),
+        ).fetchall()
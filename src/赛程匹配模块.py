@@ -0,0 +1,178 @@
+# 赛程匹配模块 ✅ 获取整期比赛所在各天的 007 赛程，把体彩对阵匹配到 007 比赛ID
+
+import os
+import re
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+import pandas as pd
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from 读取配置文件模块 import load_setting, site_url
+from 响应缓存模块 import CacheMiss, cached_text, get_cached, is_replay
+from 浏览器池模块 import DriverPool
+from 限速模块 import throttle, report_response
+from 指标模块 import inc, record_fetch
+from 追踪模块 import traced
+from 页面解析模块 import parse_match_list_html
+from 球队匹配模块 import clean_team_name, load_team_aliases, match_issue, STATUS_NONE
+
+# 赛程页面地址
+def schedule_url(date_str):
+    return f"https://bf.titan007.com/football/Next_{date_str}.htm"
+
+# 体彩的比赛时间 → datetime（逐个解析，格式不统一或无法识别的为 NaT）
+def parse_kickoffs(values):
+    return values.map(lambda v: pd.to_datetime(v, errors="coerce")).astype("datetime64[ns]")
+
+# 需要的赛程页面日期：比赛时间所在日；007 赛程按中午 12 点分日，中午前开球的还要查前一天
+def schedule_dates(kickoffs, fallback_date):
+    dates = set()
+    for kickoff in kickoffs.dropna():
+        dates.add(kickoff.strftime("%Y%m%d"))
+        if kickoff.hour < 12:
+            dates.add((kickoff - timedelta(days=1)).strftime("%Y%m%d"))
+    return sorted(dates) or [fallback_date]
+
+# 获取多天的赛程页面 HTML：缓存中有的直接读取，其余用浏览器池并发加载，返回 {日期: HTML}
+# 可传入已有的浏览器池（流水线中各阶段共用）
+def fetch_matches_html_by_dates(dates, pool=None):
+    pages = {}
+    missing = []
+    for date_str in dates:
+        text = get_cached(schedule_url(date_str))
+        if text is not None:
+            pages[date_str] = text
+        elif is_replay():
+            raise CacheMiss(schedule_url(date_str))
+        else:
+            missing.append(date_str)
+
+    if missing:
+        def load(driver, date_str):
+            url = schedule_url(date_str)
+            return cached_text(url, lambda: load_matches_page(driver, url))
+
+        own_pool = DriverPool(size=min(len(missing), load_setting("driver_pool_size", 3))) if pool is None else None
+        with own_pool or nullcontext():
+            pages.update(zip(missing, (pool or own_pool).map(load, missing)))
+    return pages
+
+# 用浏览器加载赛程页面
+@traced
+def load_matches_page(driver, url):
+    throttle(url)
+    start = time.perf_counter()
+    driver.get(site_url(url))
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "tr"))
+        )
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(2)
+    except:
+        print("⚠️ 页面加载等待超时或结构变化")
+        record_fetch(url, "selenium", "timeout", time.perf_counter() - start)
+        report_response(url, None)
+        return driver.page_source
+    record_fetch(url, "selenium", 200, time.perf_counter() - start)
+    report_response(url, 200)
+    return driver.page_source
+
+# 赛程页面上的开赛时间 → datetime：支持 “19:30”、“04-05 19:30”、“2025-04-05 19:30”
+# 只有时分时按页面日期计算，中午前的属于第二天（007 赛程按中午 12 点分日）
+def parse_page_kickoff(text, date_str):
+    match = re.search(r"(?:(\d{4})-)?(?:(\d{1,2})-(\d{1,2})\s*)?(\d{1,2}):(\d{2})", text or "")
+    if not match:
+        return pd.NaT
+    page_date = datetime.strptime(date_str, "%Y%m%d")
+    year, month, day, hour, minute = match.groups()
+    if month:
+        year = int(year) if year else page_date.year + (1 if int(month) < page_date.month - 6 else 0)
+        try:
+            return pd.Timestamp(datetime(year, int(month), int(day), int(hour), int(minute)))
+        except ValueError:
+            return pd.NaT
+    kickoff = page_date.replace(hour=int(hour), minute=int(minute))
+    if kickoff.hour < 12:
+        kickoff += timedelta(days=1)
+    return pd.Timestamp(kickoff)
+
+# 解析比赛数据；给出页面日期时同时解析开赛时间
+def extract_matches_from_html(html, date_str=None):
+    data = []
+    for row in parse_match_list_html(html):
+        home = clean_team_name(row["主队"])
+        away = clean_team_name(row["客队"])
+        if home and away and row["比赛ID"]:
+            data.append({
+                "联赛": row["联赛"],
+                "开赛时间": parse_page_kickoff(row["时间"], date_str) if date_str else pd.NaT,
+                "主队": home,
+                "客队": away,
+                "比赛ID": row["比赛ID"]
+            })
+
+    if not data:
+        print("❌ 页面中未成功提取任何比赛数据！")
+    return pd.DataFrame(data, columns=["联赛", "开赛时间", "主队", "客队", "比赛ID"])
+
+# 多天的赛程合并成一个表（跨日重复出现的比赛只保留一条）
+def extract_matches_from_pages(pages):
+    frames = [extract_matches_from_html(html, date_str) for date_str, html in sorted(pages.items())]
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return extract_matches_from_html("")
+    return pd.concat(frames, ignore_index=True).drop_duplicates("比赛ID").reset_index(drop=True)
+
+# 给整期数据填入比赛ID与匹配状态（在“场次”后插入这两列），返回新的 DataFrame
+# report_dir 为待确认队名报告的目录；pool 为可选的共用浏览器池
+def assign_match_ids(df_excel, date_str, report_dir=None, pool=None):
+    df_excel = df_excel.copy()
+    for column in ("比赛ID", "匹配状态"):
+        if column in df_excel.columns:
+            df_excel.pop(column)
+    match_index = df_excel.columns.get_loc("场次")
+    df_excel.insert(match_index + 1, "比赛ID", "")
+    df_excel.insert(match_index + 2, "匹配状态", "")
+
+    # 按比赛时间确定要抓的赛程日期，一次取齐整期比赛
+    kickoffs = parse_kickoffs(df_excel["比赛时间"]) if "比赛时间" in df_excel.columns else pd.Series(pd.NaT, index=df_excel.index)
+    dates = schedule_dates(kickoffs, date_str)
+    print(f"📅 赛程日期：{', '.join(dates)}")
+    df_html = extract_matches_from_pages(fetch_matches_html_by_dates(dates, pool))
+    print(f"📋 共解析到 {len(df_html)} 场比赛")
+
+    # 整期一次匹配：开赛时间缩小候选 → 精确 → 映射表别名 → 模糊
+    df_teams = pd.DataFrame({
+        "主队": df_excel["主队"].map(clean_team_name),
+        "客队": df_excel["客队"].map(clean_team_name),
+        "联赛": df_excel.get("联赛"),
+        "比赛时间": kickoffs,
+    }, index=df_excel.index)
+    matched, near_misses = match_issue(df_teams, df_html, load_team_aliases())
+
+    for i, row in matched.iterrows():
+        raw_home, raw_away = df_teams.at[i, "主队"], df_teams.at[i, "客队"]
+        if row["匹配状态"] != STATUS_NONE:
+            df_excel.at[i, "比赛ID"] = f"https://vip.titan007.com/AsianOdds_n.aspx?id={row['比赛ID']}"
+            df_excel.at[i, "匹配状态"] = row["匹配状态"]
+            print(f"✅ {row['匹配状态']}：{raw_home}({row['007主队']}) vs {raw_away}({row['007客队']})")
+        else:
+            df_excel.at[i, "比赛ID"] = "-"
+            df_excel.at[i, "匹配状态"] = row["匹配状态"]
+            print(f"❌ 未匹配：{raw_home} vs {raw_away}")
+        inc("matches_total", stage="02比赛ID", result="ok" if row["匹配状态"] != STATUS_NONE else "failed")
+
+    # 待确认的队名对照：确认无误后追加到 球队名称映射表.csv
+    if near_misses and report_dir:
+        report_path = os.path.join(report_dir, "球队名称待确认.csv")
+        pd.DataFrame(near_misses).to_csv(report_path, index=False, encoding="utf-8-sig")
+        print(f"📝 {len(near_misses)} 个队名需要确认，已写入：{report_path}")
+        for item in near_misses:
+            flag = "已采用" if item["已采用"] else "未采用"
+            print(f"   {item['excel_team']} → {item['titan007_team']}（得分 {item['得分']}，{flag}）")
+
+    return df_excel
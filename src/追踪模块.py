@@ -0,0 +1,243 @@
+# 追踪模块 ✅ 按期号与比赛ID记录各步骤的耗时区间（span），写成 OpenTelemetry 兼容的 JSON lines，并汇总每场比赛的关键路径
+#
+# 每行是一个 OTLP/JSON 的 ExportTraceServiceRequest（resourceSpans → scopeSpans → spans），
+# 可直接交给 OpenTelemetry Collector 的 otlpjsonfile receiver 导入 Jaeger/Tempo 等。
+# 一次运行是一条 trace；span 的 issue / match.id 属性从外层 span 继承（asyncio 任务自动继承，
+# 线程池需经 in_context 传递），汇总时按 (期号, 比赛ID) 分组。未开启追踪时 span() 几乎没有开销。
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from 读取配置文件模块 import load_setting
+
+SERVICE_NAME = "football-lottery"
+
+# 从外层 span 继承的属性
+INHERITED = ("issue", "match.id")
+
+# OTLP 的状态码
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# 缓冲的 span 数达到该值时写一次文件
+FLUSH_EVERY = 200
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+def get_trace_path():
+    default = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", "追踪.jsonl")
+    return load_setting("trace_path", default)
+
+class Span:
+    """
+    一个耗时区间：结束时交给 Tracer 写出。
+    """
+
+    __slots__ = ("name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = {key: parent.attributes[key] for key in INHERITED if parent and key in parent.attributes}
+        self.attributes.update((key, value) for key, value in attributes.items() if value is not None)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Tracer:
+    """
+    把结束的 span 按 OTLP/JSON 追加写入文件；一次运行共用一个 trace_id（环境变量 FOOTBALL_TRACE_ID 可指定，便于串起多个脚本）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.trace_id = os.environ.get("FOOTBALL_TRACE_ID") or os.urandom(16).hex()
+        self._buffer = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _record(self, span):
+        record = {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_OK},
+        }
+        if span.parent_id:
+            record["parentSpanId"] = span.parent_id
+        return record
+
+    def end(self, span):
+        with self._lock:
+            self._buffer.append(self._record(span))
+            if len(self._buffer) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": self._buffer}],
+        }]}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self._buffer = []
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+_tracer = None
+
+# 开启追踪（命令行 --trace 或配置 trace_enabled）；退出时写出剩余的 span
+def enable_tracing(path=None):
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path or get_trace_path())
+        atexit.register(_tracer.flush)
+        print(f"🧭 追踪已开启：{_tracer.path}（trace {_tracer.trace_id}）")
+    return _tracer
+
+def tracing_enabled():
+    return _tracer is not None
+
+# 记录 with 块为一个 span；attributes 中的 issue / match_id 会被内层 span 继承
+@contextmanager
+def span(name, issue=None, match_id=None, **attributes):
+    if _tracer is None:
+        yield None
+        return
+    current = Span(name, _current.get(), dict(attributes, issue=issue, **{"match.id": match_id}))
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        _tracer.end(current)
+
+# 函数装饰器：每次调用记录为一个以函数名命名的 span
+def traced(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return func(*args, **kwargs)
+        with span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+# 把 func 包装成在当前上下文中执行（提交到线程池前调用，线程里的 span 才能挂到当前 span 下）
+def in_context(func):
+    if _tracer is None:
+        return func
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # 同一个上下文不能被多个线程同时进入，每次调用复制一份
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+# ---------- 汇总 ----------
+
+def _value(attribute):
+    value = attribute["value"]
+    return next(iter(value.values()))
+
+# 读取追踪文件：[{name, span_id, parent_id, trace_id, start, end, attributes, error}]，时间为秒
+def load_spans(path=None, trace_id=None):
+    spans = []
+    with open(path or get_trace_path(), "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for record in scope.get("spans", []):
+                        if trace_id and record["traceId"] != trace_id:
+                            continue
+                        spans.append({
+                            "name": record["name"],
+                            "span_id": record["spanId"],
+                            "parent_id": record.get("parentSpanId"),
+                            "trace_id": record["traceId"],
+                            "start": int(record["startTimeUnixNano"]) / 1e9,
+                            "end": int(record["endTimeUnixNano"]) / 1e9,
+                            "attributes": {a["key"]: _value(a) for a in record.get("attributes", [])},
+                            "error": record.get("status", {}).get("message"),
+                        })
+    return spans
+
+# 一组 span 的关键路径：只看叶子 span（真正的请求/解析/等待），从最晚结束的开始，
+# 每次往前找在它开始之前最晚结束的一个；相邻两段之间的空隙即排队/等待时间
+def critical_path(spans):
+    parents = {s["parent_id"] for s in spans}
+    leaves = [s for s in spans if s["span_id"] not in parents]
+    path = []
+    current = max(leaves, key=lambda s: s["end"], default=None)
+    while current is not None:
+        path.append(current)
+        before = [s for s in leaves if s["end"] <= current["start"] + 1e-6 and s is not current]
+        current = max(before, key=lambda s: s["end"], default=None)
+    return path[::-1]
+
+# 按 (期号, 比赛ID) 分组：{(期号, 比赛ID): [span]}，没有比赛ID 的 span 不计入
+def spans_by_match(spans, issue=None):
+    groups = {}
+    for s in spans:
+        match_id = s["attributes"].get("match.id")
+        if not match_id or (issue and s["attributes"].get("issue") != issue):
+            continue
+        groups.setdefault((s["attributes"].get("issue"), match_id), []).append(s)
+    return groups
+
+def _describe(s):
+    detail = s["attributes"].get("url") or s["attributes"].get("stage") or ""
+    flag = f" ❌ {s['error']}" if s["error"] else ""
+    return f"{s['name']} {detail}".strip() + flag
+
+# 打印每场比赛的关键路径与全部 span 中最慢的 top 个
+def print_summary(spans, issue=None, top=10, matches=None):
+    groups = spans_by_match(spans, issue)
+    ranked = sorted(groups.items(), key=lambda item: max(s["end"] for s in item[1]) - min(s["start"] for s in item[1]), reverse=True)
+    for (group_issue, match_id), group in ranked[:matches] if matches else ranked:
+        start = min(s["start"] for s in group)
+        total = max(s["end"] for s in group) - start
+        print(f"\n🏟️ 第 {group_issue} 期 比赛ID {match_id}：总耗时 {total:.2f}s")
+        previous_end = None
+        for s in critical_path(group):
+            if previous_end is not None and s["start"] - previous_end > 0.001:
+                print(f"   ⏳ 等待 {s['start'] - previous_end:.2f}s")
+            print(f"   {s['start'] - start:7.2f}s +{s['end'] - s['start']:.2f}s  {_describe(s)}")
+            previous_end = s["end"]
+
+    print(f"\n🐢 最慢的 {top} 个 span：")
+    for s in sorted(spans, key=lambda s: s["end"] - s["start"], reverse=True)[:top]:
+        where = " ".join(str(s["attributes"][key]) for key in INHERITED if key in s["attributes"])
+        print(f"   {s['end'] - s['start']:7.2f}s  {_describe(s)}  {where}")
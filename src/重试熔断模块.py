@@ -0,0 +1,256 @@
+# 重试熔断模块 ✅ 页面请求的错误分类、指数退避重试（带随机抖动）、整期时间预算与按站点熔断，并记录每个页面的最终结果
+#
+# 一期采集共用一个 FetchGuard：
+#   - 可重试的错误（限流/服务端/超时/连接）按 base × 2^n 的上限随机退避，最多 fetch_retries 次；
+#   - 整期的时间预算用完后，剩余请求直接失败（记为“预算”），不再排队等待；
+#   - 同一站点连续失败 breaker_threshold 次后熔断 breaker_cooldown 秒，期间直接失败（记为“熔断”），
+#     冷却后放行一个试探请求，成功即恢复。熔断器按站点在进程内共用。
+
+import asyncio
+import random
+import threading
+import time
+
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+try:
+    import aiohttp
+except ImportError:  # 未安装 aiohttp
+    aiohttp = None
+
+from 读取配置文件模块 import load_setting
+from 响应缓存模块 import CacheMiss
+from 限速模块 import url_host
+from 追踪模块 import span
+
+# 错误类别
+SUCCESS = "成功"
+NO_DATA = "无数据"
+RATE_LIMITED = "限流"
+SERVER_ERROR = "服务端"
+TIMEOUT = "超时"
+CONNECTION = "连接"
+CLIENT_ERROR = "客户端"
+BROWSER = "浏览器"
+CACHE_MISS = "缓存缺失"
+NEEDS_BROWSER = "需渲染"
+CIRCUIT_OPEN = "熔断"
+BUDGET = "预算"
+OTHER = "其他"
+
+# 可以重试、并计入熔断的错误
+RETRYABLE = {RATE_LIMITED, SERVER_ERROR, TIMEOUT, CONNECTION}
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+DEFAULT_BUDGET_SECONDS = 900
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60
+
+class FetchError(Exception):
+    """
+    请求最终失败：kind 为错误类别，cause 为最后一次的原始异常。
+    """
+
+    def __init__(self, url, kind, cause=None):
+        super().__init__(f"{kind}：{url}" + (f"（{cause!r}）" if cause is not None else ""))
+        self.url = url
+        self.kind = kind
+        self.cause = cause
+
+def _status_kind(status):
+    if status == 429:
+        return RATE_LIMITED
+    if status >= 500:
+        return SERVER_ERROR
+    return CLIENT_ERROR
+
+# 异常 → 错误类别
+def classify_error(exc):
+    if isinstance(exc, FetchError):
+        return exc.kind
+    if isinstance(exc, CacheMiss):
+        return CACHE_MISS
+    if aiohttp is not None and isinstance(exc, aiohttp.ClientResponseError):
+        return _status_kind(exc.status)
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return _status_kind(exc.response.status_code)
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, requests.Timeout, TimeoutException)):
+        return TIMEOUT
+    if aiohttp is not None and isinstance(exc, aiohttp.ClientConnectionError):
+        return CONNECTION
+    if isinstance(exc, (requests.ConnectionError, ConnectionError)):
+        return CONNECTION
+    if isinstance(exc, WebDriverException):
+        # 浏览器报告的网络错误（net::ERR_CONNECTION_REFUSED、net::ERR_NAME_NOT_RESOLVED 等）是站点的问题，按连接错误重试并计入熔断
+        if "net::ERR_" in (exc.msg or ""):
+            return CONNECTION
+        # 其余为浏览器会话出错，由浏览器池丢弃重建，不在同一会话上重试
+        return BROWSER
+    return OTHER
+
+class CircuitBreaker:
+    """
+    单个站点的熔断器：连续失败达到阈值后打开，冷却后放行一个试探请求。
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    # 是否放行本次请求
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            self.probing = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return False
+            self.failures += 1
+            if self.failures >= self.threshold:
+                newly_open = self.opened_at is None
+                self.opened_at = time.monotonic()
+                return newly_open
+            return False
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# 进程内按站点共用的熔断器
+def get_breaker(host):
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                load_setting("breaker_threshold", DEFAULT_BREAKER_THRESHOLD),
+                load_setting("breaker_cooldown", DEFAULT_BREAKER_COOLDOWN),
+            )
+        return _breakers[host]
+
+class FetchGuard:
+    """
+    一期采集的请求保护：重试、时间预算、熔断，并记录每个页面的最终结果 {url: 类别}。
+    """
+
+    def __init__(self, budget_seconds=None, retries=None, backoff_base=None, backoff_max=None):
+        budget = budget_seconds if budget_seconds is not None else load_setting("harvest_budget_seconds", DEFAULT_BUDGET_SECONDS)
+        self.deadline = time.monotonic() + budget
+        self.retries = retries if retries is not None else load_setting("fetch_retries", DEFAULT_RETRIES)
+        self.backoff_base = backoff_base or load_setting("backoff_base", DEFAULT_BACKOFF_BASE)
+        self.backoff_max = backoff_max or load_setting("backoff_max", DEFAULT_BACKOFF_MAX)
+        self.outcomes = {}
+        self.history_urls = {}
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def record(self, url, kind):
+        with self._lock:
+            self.outcomes[url] = kind
+
+    # 一场比赛的赔率历史页面（用于判断初盘赔率失败的原因）
+    def link_history(self, match_id, url):
+        with self._lock:
+            self.history_urls.setdefault(match_id, []).append(url)
+
+    # 第 attempt 次失败后的等待秒数：上限为 base × 2^attempt 的随机值（full jitter）
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    # 请求前检查预算与熔断；不能请求时返回错误类别
+    def _blocked(self, url):
+        if self.remaining() <= 0:
+            return BUDGET
+        if not get_breaker(url_host(url)).allow():
+            return CIRCUIT_OPEN
+        return None
+
+    # 一次请求结束：更新熔断器，返回 (是否重试, 等待秒数)
+    def _after_failure(self, url, kind, attempt):
+        breaker = get_breaker(url_host(url))
+        if kind in RETRYABLE:
+            if breaker.record(False):
+                print(f"🔌 {url_host(url)} 连续失败，熔断 {breaker.cooldown} 秒")
+        else:
+            # 站点有响应（如 404）或与站点无关的错误，不计入熔断
+            breaker.record(True)
+        if kind not in RETRYABLE or attempt >= self.retries:
+            return False, 0.0
+        delay = self.backoff(attempt)
+        if delay >= self.remaining():
+            return False, 0.0
+        return True, delay
+
+    def _finish(self, url, result):
+        get_breaker(url_host(url)).record(True)
+        self.record(url, SUCCESS if result is not None else NO_DATA)
+        return result
+
+    def _fail(self, url, kind, cause):
+        self.record(url, kind)
+        raise FetchError(url, kind, cause)
+
+    # 带重试地执行 fetch()；返回 None 视为页面无数据（不重试）。最终失败抛出 FetchError
+    def call(self, url, fetch):
+        attempt = 0
+        while True:
+            blocked = self._blocked(url)
+            if blocked:
+                self._fail(url, blocked, None)
+            try:
+                return self._finish(url, fetch())
+            except Exception as e:
+                kind = classify_error(e)
+                retry, delay = self._after_failure(url, kind, attempt)
+                if not retry:
+                    self._fail(url, kind, e)
+                print(f"🔁 {kind}，{delay:.1f}s 后重试（第 {attempt + 1} 次）：{url}")
+                with span("retry_backoff", url=url, kind=kind):
+                    time.sleep(delay)
+                attempt += 1
+
+    # 异步版本：make_coro() 返回本次请求的协程
+    async def async_call(self, url, make_coro):
+        attempt = 0
+        while True:
+            blocked = self._blocked(url)
+            if blocked:
+                self._fail(url, blocked, None)
+            try:
+                return self._finish(url, await make_coro())
+            except Exception as e:
+                kind = classify_error(e)
+                retry, delay = self._after_failure(url, kind, attempt)
+                if not retry:
+                    self._fail(url, kind, e)
+                print(f"🔁 {kind}，{delay:.1f}s 后重试（第 {attempt + 1} 次）：{url}")
+                with span("retry_backoff", url=url, kind=kind):
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    # 某个页面失败的原因；没有请求过（读自缓存）或请求成功时返回 None
+    def failure(self, url):
+        kind = self.outcomes.get(url)
+        return None if kind in (None, SUCCESS) else kind
+
+    # 各类别的页面数
+    def summary(self):
+        counts = {}
+        for kind in self.outcomes.values():
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
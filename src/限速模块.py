@@ -0,0 +1,228 @@
+# 限速模块 ✅ 按站点的令牌桶限速，状态存在本地 SQLite 中，多线程、asyncio 与多个进程共用；遇到 429/5xx/超时自动降速
+#
+# 每个站点（sporttery、bf/vip/1x2.titan007 各自一个桶）一行：剩余令牌、当前速率、基准速率。
+# 取令牌在一个 BEGIN IMMEDIATE 事务里完成（跨进程互斥）：令牌不足时预支一个并返回需要等待的秒数，
+# 调用方自己 sleep，因此同一时刻排队的请求按预支顺序依次放行。
+# 降速/恢复采用“乘性减、加性增”：被限流时速率减半，之后每次成功回升基准速率的 5%。
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from 读取配置文件模块 import load_setting, site_url
+from 指标模块 import record_fetch
+from 追踪模块 import span
+
+# 各站点的基准速率（每秒请求数），按域名后缀匹配；配置 rate_limits 可覆盖或补充，例如 {"vip.titan007.com": 1}
+DEFAULT_RATES = {
+    "sporttery.cn": 4.0,
+    "titan007.com": 2.0,
+}
+FALLBACK_RATE = 2.0
+
+# 令牌桶容量（允许的突发请求数）
+DEFAULT_BURST = 2
+
+# 被限流后速率乘以 BACKOFF_FACTOR，最低降到基准速率的 MIN_RATE_FACTOR；每次成功回升基准速率的 RECOVER_STEP
+BACKOFF_FACTOR = 0.5
+MIN_RATE_FACTOR = 0.05
+RECOVER_STEP = 0.05
+
+# 429 没有 Retry-After 时暂停的秒数
+DEFAULT_PAUSE = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    host TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    rate REAL NOT NULL,
+    base_rate REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+def get_state_path():
+    default = os.path.join(os.path.abspath(os.path.join(os.getcwd(), os.pardir)), "足彩分析", "限速状态.sqlite")
+    return load_setting("rate_limit_path", default)
+
+def url_host(url):
+    return urlparse(url).hostname or url
+
+# 需要降速的响应：429、5xx
+def is_throttle_status(status):
+    return status == 429 or 500 <= status < 600
+
+class RateLimiter:
+    """
+    跨线程/进程共用的按站点令牌桶。acquire/async_acquire 在请求前调用，report 在请求结束后调用。
+    """
+
+    def __init__(self, path=None, rates=None, burst=None):
+        self.path = path or get_state_path()
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(rates if rates is not None else load_setting("rate_limits", {}))
+        self.burst = burst or load_setting("rate_limit_burst", DEFAULT_BURST)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    # 每个线程一个连接；多个进程之间靠 SQLite 的文件锁互斥
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    # 站点的基准速率：取最长的匹配后缀
+    def base_rate(self, host):
+        matches = [suffix for suffix in self.rates if host == suffix or host.endswith("." + suffix)]
+        return float(self.rates[max(matches, key=len)]) if matches else FALLBACK_RATE
+
+    # 在一个写事务中读取并更新某站点的桶：update(tokens, rate, base_rate, now) → (tokens, rate, 返回值)
+    def _transact(self, host, update):
+        conn = self._connect()
+        now = time.time()
+        base = self.base_rate(host)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, rate, base_rate, updated_at FROM buckets WHERE host = ?", (host,)).fetchone()
+            if row is None or row[2] != base:
+                # 新站点，或配置中的基准速率改过：按新基准重置
+                tokens, rate = float(self.burst), base
+            else:
+                tokens, rate, _, updated_at = row
+                tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * rate)
+            tokens, rate, result = update(tokens, rate, base, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, rate, base_rate, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (host, tokens, rate, base, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    # 取一个令牌，返回需要等待的秒数（令牌不足时预支，等待结束即可请求）
+    def reserve(self, url):
+        def take(tokens, rate, base, now):
+            tokens -= 1.0
+            return tokens, rate, 0.0 if tokens >= 0 else -tokens / rate
+        return self._transact(url_host(url), take)
+
+    def acquire(self, url):
+        wait = self.reserve(url)
+        if wait > 0:
+            with span("rate_limit_wait", url=url):
+                time.sleep(wait)
+        return wait
+
+    async def async_acquire(self, url):
+        wait = await asyncio.to_thread(self.reserve, url)
+        if wait > 0:
+            with span("rate_limit_wait", url=url):
+                await asyncio.sleep(wait)
+        return wait
+
+    # 报告请求结果：ok 为真时缓慢恢复速率；否则（429/5xx/超时）速率减半，retry_after 秒内不再放行
+    def report(self, url, ok, retry_after=None):
+        host = url_host(url)
+        if ok:
+            # 速率已在基准上时没有要改的（令牌按 updated_at 惰性补充），只读一下，不开写事务、不占写锁
+            base = self.base_rate(host)
+            row = self._connect().execute("SELECT rate, base_rate FROM buckets WHERE host = ?", (host,)).fetchone()
+            if row is None or row[1] != base:
+                # 新站点或基准改过：下次取令牌时按基准重置
+                return base
+            if row[0] >= base:
+                return row[0]
+
+        def adjust(tokens, rate, base, now):
+            if ok:
+                if rate >= base:
+                    return tokens, rate, rate
+                rate = min(base, rate + base * RECOVER_STEP)
+            else:
+                rate = max(base * MIN_RATE_FACTOR, rate * BACKOFF_FACTOR)
+                pause = retry_after if retry_after is not None else 0.0
+                tokens = min(tokens, 0.0) - pause * rate
+            return tokens, rate, rate
+
+        rate = self._transact(host, adjust)
+        if not ok:
+            print(f"🐢 {host} 降速至 {rate:.2f} 次/秒")
+        return rate
+
+    # 各站点当前状态：[(站点, 剩余令牌, 当前速率, 基准速率)]
+    def status(self):
+        rows = self._connect().execute("SELECT host, tokens, rate, base_rate, updated_at FROM buckets ORDER BY host").fetchall()
+        now = time.time()
+        return [
+            (host, min(float(self.burst), tokens + max(0.0, now - updated_at) * rate), rate, base)
+            for host, tokens, rate, base, updated_at in rows
+        ]
+
+# 解析 Retry-After 头（秒数）；没有或无法解析时返回 None
+def retry_after_seconds(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+# 进程内共用的限速器；配置 rate_limit_enabled 为 false 时返回 None（不限速）
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter() if load_setting("rate_limit_enabled", True) else False
+        return _limiter or None
+
+# 请求前取令牌；不限速时什么也不做
+def throttle(url):
+    limiter = get_limiter()
+    if limiter is not None:
+        limiter.acquire(url)
+
+async def async_throttle(url):
+    limiter = get_limiter()
+    if limiter is not None:
+        await limiter.async_acquire(url)
+
+# 请求后报告结果：status 为 HTTP 状态码，None 表示超时/连接失败
+def report_response(url, status, retry_after=None):
+    limiter = get_limiter()
+    if limiter is None:
+        return
+    if status is not None and not is_throttle_status(status):
+        limiter.report(url, True)
+    else:
+        pause = retry_after_seconds(retry_after)
+        if status == 429 and pause is None:
+            pause = DEFAULT_PAUSE
+        limiter.report(url, False, pause)
+
+# 限速的 requests.get：请求前取令牌，请求后按状态码/超时报告；返回 Response（不检查状态码）
+def limited_get(url, timeout=10, **kwargs):
+    throttle(url)
+    start = time.perf_counter()
+    try:
+        with span("http_get", url=url):
+            response = requests.get(site_url(url), timeout=timeout, **kwargs)
+    except (requests.Timeout, requests.ConnectionError) as e:
+        record_fetch(url, "requests", "timeout" if isinstance(e, requests.Timeout) else "error", time.perf_counter() - start)
+        report_response(url, None)
+        raise
+    record_fetch(url, "requests", response.status_code, time.perf_counter() - start)
+    report_response(url, response.status_code, response.headers.get("Retry-After"))
+    return response
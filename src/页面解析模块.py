@@ -0,0 +1,387 @@
+# 页面解析模块 ✅ 统一解析 007 的赛程页面、亚盘页面、欧赔列表页面与赔率历史页面
+#
+# 解析分两层：后端只负责把目标表格切出来并转成单元格（文本、是否隐藏、onclick），
+# 上层的公司筛选/取列逻辑所有后端共用。lxml 与 selectolax 只解析目标表格（或目标行），
+# bs4 保持原来的整页解析，作为对照。
+
+import re
+from bisect import bisect_right
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # 未安装 lxml
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # 未安装 selectolax
+    LexborHTMLParser = None
+
+from 读取配置文件模块 import load_setting
+from 指标模块 import instrument_parser
+from 追踪模块 import traced
+
+# 🎯 目标公司列表
+TARGET_COMPANIES = ["36", "Bet365", "Crown", "澳门", "澳彩"]
+
+# 公司在 TARGET_COMPANIES 中的优先级（越小越优先），不是目标公司时为 None
+def company_priority(company):
+    return next((k for k, key in enumerate(TARGET_COMPANIES) if key in company), None)
+
+# 盘口四个时间点
+SNAPSHOTS = ["初盘", "中盘", "临盘", "封盘"]
+
+# 每个时间点的赔率字段后缀（对应 oddslist 表格 cols[2..4] 与 cols[9..11]）
+ODDS_SUFFIXES = ["主胜赔率", "平局赔率", "客胜赔率", "主凯利", "平凯利", "客凯利"]
+
+# 可选的解析后端
+PARSERS = ["lxml", "selectolax", "bs4"]
+
+# 模糊匹配公司名（亚盘页面）
+def is_target_company(name):
+    for keyword in ["36", "Crown", "澳门", "澳彩"]:
+        if keyword in name:
+            return True
+    return False
+
+# 盘口文本 → 数值转换函数
+def convert_handicap(text):
+    text = text.replace(" ", "").replace("\xa0", "")
+
+    mapping = {
+        "平手": 0.0, "平": 0.0,
+        "平手/半球": -0.25, "半球": -0.5, "半球/一球": -0.75, "一球": -1.0,
+        "一球/球半": -1.25, "球半": -1.5, "球半/两球": -1.75, "两球": -2.0,
+        "两球/两球半": -2.25, "两球半": -2.5, "两球半/三球": -2.75, "三球": -3.0,
+        "三球/三球半": -3.25, "三球半": -3.5, "三球半/四球": -3.75, "四球": -4.0,
+        "四球/四球半": -4.25, "四球半": -4.5, "四球半/五球": -4.75, "五球": -5.0,
+
+        "受让平手/半球": 0.25, "受让半球": 0.5, "受让半球/一球": 0.75, "受让一球": 1.0,
+        "受让一球/球半": 1.25, "受让球半": 1.5, "受让球半/两球": 1.75, "受让两球": 2.0,
+        "受让两球/两球半": 2.25, "受让两球半": 2.5, "受让两球半/三球": 2.75, "受让三球": 3.0,
+        "受让三球/三球半": 3.25, "受让三球半": 3.5, "受让三球半/四球": 3.75, "受让四球": 4.0,
+        "受让四球/四球半": 4.25, "受让四球半": 4.5, "受让四球半/五球": 4.75, "受让五球": 5.0
+    }
+
+    return mapping.get(text, None)
+
+# 某个时间点的赔率字段名，例如 odds_fields("中盘") → ["中盘主胜赔率", ...]
+def odds_fields(snapshot):
+    return [snapshot + suffix for suffix in ODDS_SUFFIXES]
+
+# 默认解析后端：配置 html_parser 指定，否则按 lxml → selectolax → bs4 取第一个可用的
+def default_parser():
+    configured = load_setting("html_parser")
+    if configured:
+        return configured
+    if lxml_html is not None:
+        return "lxml"
+    if LexborHTMLParser is not None:
+        return "selectolax"
+    return "bs4"
+
+def _is_hidden(style):
+    return "display:none" in (style or "").replace(" ", "").lower()
+
+# ---------- 定位目标表格/行（纯字符串操作，不解析整页） ----------
+
+# 注释与 script/style 中的内容不是标签，定位时要跳过
+_OPAQUE = re.compile(r"<!--.*?-->|<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+def _opaque_spans(html):
+    return [m.span() for m in _OPAQUE.finditer(html)]
+
+def _inside(spans, pos):
+    i = bisect_right(spans, (pos, float("inf"))) - 1
+    return i >= 0 and spans[i][0] <= pos < spans[i][1]
+
+# 切出 id 为 table_id 的整个 <table>…</table>（处理嵌套表格）；找不到返回 None
+def slice_table(html, table_id):
+    spans = _opaque_spans(html)
+    start = None
+    for match in re.finditer(
+        r"<table\b[^>]*\bid\s*=\s*[\"']?" + re.escape(table_id) + r"[\"'\s>]", html, re.IGNORECASE
+    ):
+        if not _inside(spans, match.start()):
+            start = match.start()
+            break
+    if start is None:
+        return None
+
+    depth = 0
+    for tag in re.finditer(r"<(/?)table\b", html[start:], re.IGNORECASE):
+        if _inside(spans, start + tag.start()):
+            continue
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = start + tag.end()
+            close = html.find(">", end)
+            return html[start:close + 1 if close >= 0 else len(html)]
+    return html[start:]
+
+# 从 pos 往前找最近的 <tr 开头
+def _rfind_tr(html, pos):
+    while True:
+        pos = html.rfind("<tr", 0, pos)
+        if pos < 0 or html[pos + 3:pos + 4] in (" ", ">", "\t", "\n", "\r"):
+            return pos
+
+# ---------- 各后端：片段 → 行列表，每行为 [(文本, 是否隐藏, onclick), ...] 与整行源码 ----------
+
+_SKIP_TAGS = ("script", "style")
+
+def _lxml_text(el):
+    # 与 BeautifulSoup 的 get_text(strip=True) 一致：逐段 strip 后拼接，跳过注释与脚本
+    if len(el) == 0:
+        return (el.text or "").strip()
+    parts = []
+
+    def walk(node):
+        if isinstance(node.tag, str) and node.tag not in _SKIP_TAGS and node.text:
+            parts.append(node.text.strip())
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in _SKIP_TAGS:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail.strip())
+
+    walk(el)
+    return "".join(parts)
+
+def _rows_lxml(fragment, with_source=False):
+    root = lxml_html.fromstring(fragment)
+    rows = []
+    for tr in root.iter("tr"):
+        cells = [(_lxml_text(td), _is_hidden(td.get("style")), td.get("onclick", "")) for td in tr.iter("td")]
+        source = lxml_html.tostring(tr, encoding="unicode") if with_source else None
+        rows.append((cells, source))
+    return rows
+
+def _rows_selectolax(fragment, with_source=False):
+    tree = LexborHTMLParser(fragment)
+    tree.strip_tags(list(_SKIP_TAGS))
+    rows = []
+    for tr in tree.css("tr"):
+        cells = []
+        for td in tr.css("td"):
+            attrs = td.attributes
+            cells.append((td.text(deep=True, separator="", strip=True), _is_hidden(attrs.get("style")), attrs.get("onclick") or ""))
+        rows.append((cells, tr.html if with_source else None))
+    return rows
+
+def _rows_bs4(fragment, with_source=False):
+    soup = BeautifulSoup(fragment, "html.parser")
+    rows = []
+    for tr in soup.find_all("tr"):
+        cells = [(td.get_text(strip=True), _is_hidden(td.get("style")), td.get("onclick", "")) for td in tr.find_all("td")]
+        rows.append((cells, str(tr) if with_source else None))
+    return rows
+
+_BACKENDS = {"lxml": _rows_lxml, "selectolax": _rows_selectolax, "bs4": _rows_bs4}
+
+def _rows(fragment, parser, with_source=False):
+    if parser not in _BACKENDS:
+        raise ValueError(f"未知的解析后端：{parser}（可选：{'/'.join(PARSERS)}）")
+    return _BACKENDS[parser](fragment, with_source)
+
+# 目标表格的所有行；bs4 后端按原方式整页解析，其余后端只解析切出的表格。找不到表格返回 None
+def table_rows(html, table_id, parser=None):
+    parser = parser or default_parser()
+    if parser == "bs4":
+        table = BeautifulSoup(html, "html.parser").find("table", id=table_id)
+        return None if table is None else [cells for cells, _ in _rows_bs4(str(table))]
+
+    fragment = slice_table(html, table_id)
+    if fragment is None:
+        return None
+    return [cells for cells, _ in _rows(fragment, parser)]
+
+# ---------- 各页面的解析函数 ----------
+
+# 赛程页面中比赛列表所在的表格
+MATCH_TABLE_ID = "table_live"
+
+# 解析赛程页面（Next_{date}.htm）：[{联赛, 时间, 主队, 客队, 比赛ID}]，队名与时间为页面原文
+# 与其他页面一样只解析切出的比赛表格；bs4 后端、或页面改版找不到该表格时按原方式解析整页的所有行
+@traced
+@instrument_parser
+def parse_match_list_html(html, parser=None):
+    parser = parser or default_parser()
+    fragment = slice_table(html, MATCH_TABLE_ID) if parser != "bs4" else None
+    data = []
+    for cells, source in _rows(fragment or html, parser, with_source=True):
+        if len(cells) < 7:
+            continue
+        match = re.search(r"AsianOdds\((\d+)\)", source)
+        match_id = match.group(1) if match else ""
+        data.append({
+            "联赛": cells[1][0],
+            "时间": cells[2][0],
+            "主队": cells[3][0],
+            "客队": cells[5][0],
+            "比赛ID": match_id,
+        })
+    return data
+
+# 解析亚盘页面的每一家公司：[(公司, {"初盘": 盘口, "即时": 盘口})]，盘口为数值文本，无法识别时为 None
+# 初盘取 cols[3]，即时盘取 cols[6]，封盘后取 cols[9]
+@traced
+@instrument_parser
+def parse_asian_companies(html, parser=None):
+    rows = table_rows(html, "odds", parser)
+    if rows is None:
+        return None
+
+    companies = []
+    for cols in rows:
+        if len(cols) < 5:
+            continue
+
+        def visible(i):
+            text, hidden, _ = cols[i]
+            return "" if hidden else text
+
+        candidates = {}
+        if len(cols) > 3:
+            candidates["初盘"] = visible(3)
+        if len(cols) > 6:
+            live = visible(6)
+            if not live and len(cols) > 9:
+                # 封盘之后，网页对于中间三个td采用了display:none，所以需要从第9个元素中获取
+                live = visible(9)
+            candidates["即时"] = live
+
+        values = {}
+        for key, text in candidates.items():
+            value = convert_handicap(text)
+            values[key] = None if value is None else str(value)
+        companies.append((cols[0][0], values))
+    return companies
+
+# 解析亚盘页面：一次性取出目标公司的初盘与即时盘，目标公司没有时取第一家有数据的公司
+@traced
+def parse_asian_odds_html(html, parser=None):
+    companies = parse_asian_companies(html, parser)
+    if companies is None:
+        return None
+
+    picked = {}
+    fallback = {}
+    for company, values in companies:
+        target = is_target_company(company)
+        for key, value in values.items():
+            if value is None:
+                continue
+            if target and key not in picked:
+                picked[key] = value
+            if key not in fallback:
+                fallback[key] = value
+
+    return {key: picked.get(key, fallback.get(key)) for key in ("初盘", "即时")}
+
+# 解析欧赔列表页面的每一家公司：[(公司, [即时赔率 & 凯利值], 赔率历史链接或 None)]
+@traced
+@instrument_parser
+def parse_1x2_companies(html, parser=None):
+    rows = table_rows(html, "oddsList_tab", parser)
+    if rows is None:
+        return None
+
+    companies = []
+    for cols in rows:
+        if len(cols) < 12:
+            continue
+
+        history_url = None
+        # 遍历该行所有 td，寻找 onclick 属性，再从中提取 id/sid/cid
+        for _, _, onclick_raw in cols:
+            if "OddsHistory" in onclick_raw:
+                match = re.search(r"OddsHistory\('/OddsHistory\.aspx\?id=(\d+)&sid=(\d+)&cid=(\d+)", onclick_raw)
+                if match:
+                    oid, sid, cid = match.groups()
+                    history_url = f"https://1x2.titan007.com/OddsHistory.aspx?id={oid}&sid={sid}&cid={cid}&l=0"
+                break
+
+        companies.append((cols[1][0], [cols[i][0] for i in (2, 3, 4, 9, 10, 11)], history_url))
+    return companies
+
+# 解析欧赔列表页面：即时赔率 & 凯利值，以及目标公司的赔率历史链接
+@traced
+def parse_1x2_html(html, parser=None):
+    companies = parse_1x2_companies(html, parser)
+    if companies is None:
+        print("❌ 没找到 oddsList_tab 表格")
+        return None
+
+    live = None
+    fallback = None
+    history_urls = []
+
+    for company, data, history_url in companies:
+        is_target = company_priority(company) is not None
+
+        if is_target and live is None:
+            live = data
+        if fallback is None:
+            fallback = data
+        if is_target and history_url:
+            history_urls.append((company, history_url))
+
+    # 历史链接按目标公司的优先级排列，取初盘时依次尝试
+    history_urls.sort(key=lambda item: company_priority(item[0]))
+    return {"即时": live or fallback, "history_urls": history_urls}
+
+def _initial_row_values(cols):
+    if len(cols) >= 11:
+        return [cols[i][0] for i in (0, 1, 2, 7, 8, 9)]
+    return None
+
+# 解析赔率历史页面，取 (初盘) 那一行的赔率 & 凯利值
+@traced
+@instrument_parser
+def parse_initial_1x2_history(html, parser=None):
+    parser = parser or default_parser()
+
+    if parser != "bs4":
+        # 从页面末尾往前找含“(初盘)”的行，只解析这一行
+        pos = len(html)
+        while True:
+            pos = html.rfind("(初盘)", 0, pos)
+            if pos < 0:
+                break
+            start = _rfind_tr(html, pos)
+            end = html.find("</tr>", pos)
+            if start < 0 or end < 0:
+                break
+            rows = _rows("<table>" + html[start:end + 5] + "</table>", parser)
+            if rows and _initial_row_values(rows[0][0]):
+                return _initial_row_values(rows[0][0])
+        if "初盘" not in html:
+            return None
+
+    soup = BeautifulSoup(html, "html.parser")
+    for row in reversed(soup.select("table tr")):
+        if "(初盘)" in row.get_text():
+            values = _initial_row_values([(td.get_text(strip=True), False, "") for td in row.find_all("td")])
+            if values:
+                return values
+    return None
+
+# 解析赔率历史页面的全部变化记录：[(变化时间原文, [主胜, 平, 客胜, 主凯利, 平凯利, 客凯利])]，按页面顺序（新 → 旧）
+# 历史表格没有 id，整页解析后只保留赔率列为数值的行（导航、表头等行被排除）
+@traced
+@instrument_parser
+def parse_1x2_history(html, parser=None):
+    parser = parser or default_parser()
+    changes = []
+    for cols, _ in _rows(html, parser):
+        values = _initial_row_values(cols)
+        if not values:
+            continue
+        try:
+            [float(value) for value in values]
+        except ValueError:
+            continue
+        changes.append((cols[10][0], values))
+    return changes